@@ -3,17 +3,28 @@
 ADVANCED SORTING BENCHMARK TOOL with SESSION HISTORY
 """
 
-import csv
+import signal
+import threading
 import time
 import sys
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime
 
+import row_sorts
+from row_sorts import ALLOC_STATS, BY_KEY
+from sort_keys import KeyExpressionError, check_key, key_cost, key_for
+from sort_order import order_label
+
+# Everything else (dataset cache, run history, timing harness, checkpoints, estimates,
+# race, counts, percentiles, profiler) is imported by the menu action that uses it,
+# so the menu is up without paying for modules a session may never touch.
+
 # ============================================================================
-# SORTING ALGORITHMS WITH PROGRESS TRACKING
+# PROGRESS AND ALGORITHM MENU (the engines live in row_sorts.py)
 # ============================================================================
 
-def print_progress_bar(iteration, total, prefix='', suffix='', length=40, fill='█'):
+def print_progress_bar(iteration, total, prefix='', suffix='', length=40, fill='█'): # phase: callback
     """Terminal progress bar utility"""
     percent = ("{0:.1f}").format(100 * (iteration / float(total)))
     filled_length = int(length * iteration // total)
@@ -23,66 +34,55 @@ def print_progress_bar(iteration, total, prefix='', suffix='', length=40, fill='
     if iteration == total:
         print()
 
-def bubble_sort(data, key_func):
-    arr = data.copy()
-    n = len(arr)
-    for i in range(n):
-        swapped = False
-        if i % (max(1, n // 100)) == 0 or i == n - 1:
-            print_progress_bar(i + 1, n, prefix='Progress:', suffix='Complete', length=40)
-        for j in range(0, n - i - 1):
-            if key_func(arr[j]) > key_func(arr[j + 1]):
-                arr[j], arr[j + 1] = arr[j + 1], arr[j]
-                swapped = True
-        if not swapped:
-            print_progress_bar(n, n, prefix='Progress:', suffix='Complete', length=40)
-            break
-    return arr
-
-def insertion_sort(data, key_func):
-    arr = data.copy()
-    n = len(arr)
-    for i in range(1, n):
-        if i % (max(1, n // 100)) == 0 or i == n - 1:
-            print_progress_bar(i + 1, n, prefix='Progress:', suffix='Complete', length=40)
-        key_item = arr[i]
-        key_value = key_func(key_item)
-        j = i - 1
-        while j >= 0 and key_func(arr[j]) > key_value:
-            arr[j + 1] = arr[j]
-            j -= 1
-        arr[j + 1] = key_item
-    return arr
-
-def merge_sort(data, key_func):
-    arr = data.copy()
-    if len(arr) <= 1: return arr
-    def merge(left, right):
-        result = []
-        i = j = 0
-        while i < len(left) and j < len(right):
-            if key_func(left[i]) <= key_func(right[j]):
-                result.append(left[i]); i += 1
-            else:
-                result.append(right[j]); j += 1
-        result.extend(left[i:]); result.extend(right[j:])
-        return result
-    def msort(a):
-        if len(a) <= 1: return a
-        mid = len(a) // 2
-        return merge(msort(a[:mid]), msort(a[mid:]))
-    return msort(arr)
+def terminal_progress(done, total):
+    """progress(done, total) hook for the row engines: draws the terminal bar"""
+    print_progress_bar(done, total, prefix='Progress:', suffix='Complete', length=40)
+
+MENU = dict(zip('123456', BY_KEY)) # menu choice -> row engine key
+ALGORITHMS = {choice: BY_KEY[key] for choice, key in MENU.items()}
+RESUMABLE = {BY_KEY[key][0] for key in row_sorts.RESUMABLE} # Can be paused with Ctrl-C and resumed from a checkpoint
+BASELINES = {BY_KEY[fast][0]: BY_KEY[base][0] for fast, base in row_sorts.BASELINES.items()} # by display name
+
+def column_key(column):
+    """Compiled key for a menu column or a key expression (see sort_keys.py)"""
+    return key_for(column)
+
+@contextmanager
+def pausable(stop_event):
+    """First Ctrl-C sets stop_event (the sort checkpoints and returns), a second one aborts"""
+    if stop_event is None:
+        yield
+        return
+    def on_sigint(signum, frame):
+        if stop_event.is_set(): raise KeyboardInterrupt
+        stop_event.set()
+        print("\n⏸️  Pausing at the next safe point (Ctrl-C again to abort)...")
+    previous = signal.signal(signal.SIGINT, on_sigint)
+    try:
+        yield
+    finally:
+        signal.signal(signal.SIGINT, previous)
 
 # ============================================================================
 # MAIN APPLICATION CLASS
 # ============================================================================
 
 class BenchmarkApp:
-    def __init__(self, csv_path):
+    def __init__(self, csv_path, profile=False):
         self.csv_path = Path(csv_path)
+        self.profile = profile # --profile: one extra sampled run per sort, split into phases
         self.data = []
         self.last_sorted = None
         self.history = [] # Stores execution history
+        self._runs = None
+
+    @property
+    def runs(self):
+        """Persistent run database shared across sessions, opened on first use"""
+        if self._runs is None:
+            from run_history import RunHistory
+            self._runs = RunHistory()
+        return self._runs
 
     def add_to_history(self, action):
         """Timestamp and log an action"""
@@ -96,13 +96,12 @@ class BenchmarkApp:
         
         self.data = []
         try:
-            with open(self.csv_path, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for i, row in enumerate(reader):
-                    if limit and i >= limit: break
-                    clean_row = {k.replace('\ufeff', ''): v.strip() for k, v in row.items()}
-                    self.data.append(clean_row)
-            msg = f"Loaded {len(self.data):,} records from {self.csv_path.name}"
+            from dataset_cache import load_csv
+            start = time.perf_counter()
+            self.data, source = load_csv(self.csv_path, limit)
+            source = "from cache" if source == 'cache' else "parsed"
+            msg = (f"Loaded {len(self.data):,} records from {self.csv_path.name} "
+                   f"({source}, {time.perf_counter() - start:.2f}s)")
             print(f"✅ {msg}")
             self.add_to_history(msg)
         except Exception as e:
@@ -112,29 +111,266 @@ class BenchmarkApp:
         if not self.data:
             print("❌ No data loaded.")
             return
+        from sort_checkpoint import Checkpointer
+        from sort_estimate import admit, estimate, format_check, over_limits
+        from sort_verify import verify
+        from timing_harness import measure
 
-        print("\nAlgorithms: 1. Bubble | 2. Insertion | 3. Merge")
+        print("\nAlgorithms: 1. Bubble | 2. Insertion | 3. Merge | 4. Merge (buffered) | 5. Bubble (fast) "
+              "| 6. Insertion (fast)")
         algo_choice = input("Choice: ")
-        print("\nColumns: 1. ID | 2. FirstName | 3. LastName")
+        print("\nColumns: 1. ID | 2. FirstName | 3. LastName | 4. Key expression")
         col_choice = input("Choice: ")
         
         column = {'1': 'ID', '2': 'FirstName', '3': 'LastName'}.get(col_choice)
-        algo_info = {'1': ('Bubble', bubble_sort), '2': ('Insertion', insertion_sort), '3': ('Merge', merge_sort)}.get(algo_choice)
+        if col_choice == '4':
+            column = self.ask_key_expression()
+        algo_info = ALGORITHMS.get(algo_choice)
+        descending = input("\nOrder: 1. Ascending | 2. Descending (Press Enter for ascending): ") == '2'
 
         if algo_info and column:
             name, func = algo_info
-            key_func = lambda r: int(r['ID']) if column == 'ID' else r[column].lower()
+            repeats = input("Timed repeats (Press Enter for 3): ")
+            repeats = int(repeats) if repeats.isdigit() and int(repeats) > 0 else 3
+            # Predict the warmup + timed runs from this machine's history before committing to them
+            prediction = estimate(self.runs, 'console', name, len(self.data))
+            print(f"\n📐 Estimate: {prediction.summary(repeats + 1)}")
+            if not admit(over_limits(prediction, repeats + 1)):
+                self.add_to_history(f"Refused {name} sort of {len(self.data):,} rows (estimate over the limits)")
+                return
+            key_func = column_key(column)
+            ns, source = key_cost(column, self.data)
+            print(f"🔑 Key {column} -> {source}: {ns:.0f} ns/row (~{ns * len(self.data) / 1e9:.3f}s per pass)")
+            key_calls = 0
+            def counted_key(r):
+                nonlocal key_calls
+                key_calls += 1
+                return key_func(r)
+
+            def announce(i, total, phase):
+                label = "warmup" if phase == 'warmup' else f"repeat {i}/{total - 1}"
+                print(f"   ⏱️  {label}...")
+            
+            pause = {}
+            if name in RESUMABLE:
+                stop_event = threading.Event()
+                checkpointer = Checkpointer('console', name, column, self.csv_path, len(self.data),
+                                            self.fingerprint(), descending=descending)
+                pause = {'stop_event': stop_event, 'checkpointer': checkpointer}
+                print("   (Ctrl-C pauses at the next pass and saves a checkpoint)")
             
-            print(f"\n🚀 Running {name} Sort on {column}...")
-            start_time = time.perf_counter()
-            self.last_sorted = func(self.data, key_func)
-            duration = time.perf_counter() - start_time
+            # The warmup run shows progress and counts key calls; measured repeats
+            # run silently on a fresh copy made outside the timed region.
+            direction = "descending" if descending else "ascending"
+            print(f"\n🚀 Running {name} Sort on {column}, {direction} (1 warmup + {repeats} timed)...")
+            with pausable(pause.get('stop_event')):
+                stats, self.last_sorted = measure(
+                    lambda arr: func(arr, key_func, copy=False, descending=descending, **pause),
+                    setup=self.data.copy, repeats=repeats, warmup=1,
+                    warmup_run=lambda arr: func(arr, counted_key, terminal_progress, copy=False,
+                                                descending=descending, **pause),
+                    on_repeat=announce, memory=True, alloc_stats=ALLOC_STATS,
+                    should_stop=pause['stop_event'].is_set if pause else None)
+            if pause and pause['stop_event'].is_set():
+                path = pause['checkpointer'].saved_path
+                if path is None:
+                    print("\n⏸️  Stopped between runs; nothing to resume.")
+                    return
+                print(f"\n⏸️  Paused. Checkpoint saved to {path}")
+                self.add_to_history(f"Paused {name} sort on {column} (checkpoint {path.name})")
+                return
+            if pause:
+                pause['checkpointer'].discard() # Remove autosaves of the finished runs
             
-            result_msg = f"Sorted {len(self.data):,} rows using {name} (Time: {duration:.4f}s)"
+            result_msg = (f"Sorted {len(self.data):,} rows {direction} using {name} "
+                          f"(Time: {stats.median:.4f}s median of {stats.n})")
             print(f"✨ {result_msg}")
+            print(f"   {stats.summary()}")
+            print(f"   Memory (warmup run): {stats.memory_summary()}")
+            check = verify(self.data, self.last_sorted, key_func, descending, stability=True)
+            print(f"   Verified: {check.summary()}")
+            print(f"   Estimate: {format_check(prediction, stats.median)}")
             self.add_to_history(result_msg)
+            self.record_run(name, order_label(column, descending), stats, key_calls, prediction)
+            self.compare_variant(name, order_label(column, descending), stats, key_calls)
+            if self.profile:
+                self.profile_phases(name, column, func, key_func, descending)
             self.save_prompt()
 
+    def ask_key_expression(self):
+        """Prompt for a key expression such as `lower(LastName), -int(ID)`; None if it does not apply"""
+        text = input("Key expression (e.g. lower(LastName), -int(ID)): ").strip()
+        try:
+            check_key(text, self.data)
+        except KeyExpressionError as e:
+            print(f"❌ {e}")
+            return None
+        return text
+
+    def profile_phases(self, name, column, func, key_func, descending=False):
+        """Sort once more under the sampling profiler (not part of the timings above)"""
+        from phase_profiler import profile_call
+        print(f"\n🔬 Profiling {name} Sort phases (one extra run)...")
+        _, profiler = profile_call(func, self.data.copy(), key_func, terminal_progress, copy=False,
+                                    descending=descending)
+        path = profiler.save('console', name, order_label(column, descending))
+        print(f"   Phases: {profiler.summary()}")
+        print(f"   Flame graph stacks: {path}")
+
+    def fingerprint(self):
+        from run_history import dataset_fingerprint
+        try:
+            return dataset_fingerprint(self.csv_path)
+        except OSError:
+            return 'in-memory'
+
+    def resume_checkpoint(self):
+        """Continue a paused Bubble/Insertion sort from its last checkpoint"""
+        from sort_checkpoint import Checkpointer, list_checkpoints
+        from sort_verify import verify
+        saved = list_checkpoints(tool='console')
+        print("\n⏯️  CHECKPOINTS")
+        if not saved:
+            print("No paused sorts.")
+            return
+        for i, cp in enumerate(saved, 1):
+            done = cp['position'] / max(1, cp['size'])
+            print(f"{i}. {cp['algorithm']} on {order_label(cp['column'], cp.get('descending'))} | {cp['size']:,} rows | {done:.1%} done "
+                  f"| {cp['elapsed']:.1f}s so far | saved {cp['saved']}")
+        choice = input("Resume which (Enter to cancel): ")
+        if not choice.isdigit() or not 1 <= int(choice) <= len(saved):
+            return
+        checkpointer, arr, position = Checkpointer.resume(saved[int(choice) - 1]['path'])
+        name, column = checkpointer.meta['algorithm'], checkpointer.meta['column']
+        descending = checkpointer.meta.get('descending', False)
+        func = {n: f for n, f in ALGORITHMS.values()}[name]
+        stop_event = threading.Event()
+        print(f"\n▶️  Resuming {name} Sort on {column} at position {position:,} (Ctrl-C pauses again)...")
+        start = time.perf_counter()
+        with pausable(stop_event):
+            result = func(arr, column_key(column), terminal_progress, stop_event, copy=False,
+                          checkpointer=checkpointer, start=position, descending=descending)
+        if result is None:
+            print(f"\n⏸️  Paused again. Checkpoint saved to {checkpointer.saved_path}")
+            return
+        total = checkpointer.elapsed_before + time.perf_counter() - start
+        checkpointer.discard()
+        self.last_sorted = result
+        msg = f"Resumed and finished {name} sort of {len(result):,} rows (total sort time {total:.2f}s across sessions)"
+        print(f"✨ {msg}")
+        # The checkpoint holds no copy of the original input, so only the order can be checked
+        print(f"   Verified: {verify(None, result, column_key(column), descending).summary()}")
+        self.add_to_history(msg)
+        self.save_prompt()
+
+    def record_run(self, name, column, stats, key_calls, prediction=None):
+        """Persist the run (and what it was predicted to take) so regressions can be spotted across sessions"""
+        try:
+            self.runs.record('console', self.csv_path, len(self.data), name, stats.median,
+                             column=column, timings=stats.samples, key_calls=key_calls,
+                             peak_bytes=stats.memory['peak_bytes'] if stats.memory else None,
+                             predicted_seconds=prediction.seconds if prediction else None,
+                             predicted_bytes=int(prediction.peak_bytes) if prediction else None)
+        except Exception as e:
+            print(f"⚠️  Could not record run history: {e}")
+
+    def compare_variant(self, name, column, stats, key_calls):
+        """Show how a fast variant and its original compare on this data, from the latest recorded run"""
+        other = BASELINES.get(name) or next((fast for fast, base in BASELINES.items() if base == name), None)
+        if other is None:
+            return
+        try:
+            previous = self.runs.runs_for(self.fingerprint(), len(self.data), other, column, 'console', limit=1)
+        except Exception:
+            return
+        if not previous:
+            print(f"   (Run {other} on the same column to compare it with {name})")
+            return
+        times = {name: stats.median, other: previous[0]['seconds']}
+        fast, base = (name, other) if name in BASELINES else (other, name)
+        if times[fast] > 0:
+            print(f"   ⚡ {fast}: {times[base] / times[fast]:.2f}x faster than {base} "
+                  f"({times[fast]:.4f}s vs {times[base]:.4f}s median)")
+        if previous[0]['key_calls'] and key_calls:
+            print(f"   🔑 Key calls: {name} {key_calls:,} | {other} {previous[0]['key_calls']:,}")
+
+    def regression_report(self):
+        """Compare the latest run of each configuration against its rolling baseline"""
+        from run_history import format_report, regression_report
+        print("\n📈 REGRESSION REPORT")
+        print(format_report(regression_report(self.runs)))
+
+    def race(self):
+        """Run several algorithms at the same time on the loaded rows and rank them"""
+        if not self.data:
+            print("❌ No data loaded.")
+            return
+        print("\n🏁 RACE MODE")
+        print("Algorithms: " + " | ".join(f"{k}. {name}" for k, (name, _) in ALGORITHMS.items()))
+        picks = input("Choices separated by commas (Press Enter for all): ").replace(' ', '')
+        keys = [k for k in picks.split(',') if k in ALGORITHMS] if picks else list(ALGORITHMS)
+        racers = [(MENU[k], ALGORITHMS[k][0]) for k in dict.fromkeys(keys)]
+        print("\nColumns: 1. ID | 2. FirstName | 3. LastName")
+        column = {'1': 'ID', '2': 'FirstName', '3': 'LastName'}.get(input("Choice: "))
+        if not racers or not column:
+            print("❌ Invalid choice.")
+            return
+        from sort_race import Race, run_in_terminal
+        # Racers map the cached snapshot of the same rows instead of receiving a pickled copy
+        race = Race(racers, csv_path=self.csv_path, column=column, rows=len(self.data),
+                    baselines=row_sorts.BASELINES)
+        print(f"\nRacing {len(racers)} algorithm(s) on {len(self.data):,} rows by {column}...")
+        run_in_terminal(race)
+        winner = race.ranked()[0]
+        self.add_to_history(f"Race on {column} ({len(self.data):,} rows): {winner['name']} won "
+                            f"in {winner['seconds'] or 0:.4f}s")
+
+    def aggregate(self):
+        """Distinct values, duplicate groups and counts per key for one column"""
+        if not self.data:
+            print("❌ No data loaded.")
+            return
+        print("\nColumns: 1. ID | 2. FirstName | 3. LastName")
+        column = {'1': 'ID', '2': 'FirstName', '3': 'LastName'}.get(input("Choice: "))
+        if not column:
+            print("❌ Invalid choice.")
+            return
+        from sort_aggregate import aggregate, column_values
+        counts = aggregate(column_values(self.data, column), label=column)
+        print(f"\n📊 COUNTS BY {column.upper()} ({len(self.data):,} rows)")
+        print(counts.format())
+        self.add_to_history(f"Counted {column}: {counts.distinct:,} distinct, "
+                            f"{len(counts.duplicates()):,} duplicate groups ({counts.method}, {counts.seconds:.4f}s)")
+        self.save_prompt(counts)
+
+    def select_stats(self):
+        """Median, percentiles and rank-k values of one column or key expression, without a full sort"""
+        if not self.data:
+            print("❌ No data loaded.")
+            return
+        print("\nColumns: 1. ID | 2. FirstName | 3. LastName | 4. Key expression")
+        col_choice = input("Choice: ")
+        column = {'1': 'ID', '2': 'FirstName', '3': 'LastName'}.get(col_choice)
+        if col_choice == '4':
+            column = self.ask_key_expression()
+        if not column:
+            print("❌ Invalid choice.")
+            return
+        from sort_select import DEFAULT_PERCENTILES, key_values, order_statistics, parse_percentiles
+        default = ", ".join(map(str, DEFAULT_PERCENTILES))
+        percentiles = input(f"Percentiles (Press Enter for {default}): ") or default
+        ranks = input("Ranks too, 1 = smallest, -1 = largest (e.g. 1,-1; Enter for none): ")
+        try:
+            ranks = [int(k) for k in ranks.replace(' ', '').split(',') if k]
+            stats = order_statistics(key_values(self.data, column), parse_percentiles(percentiles), ranks, column)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return
+        print(f"\n📏 ORDER STATISTICS OF {column.upper()} ({len(self.data):,} rows)")
+        print(stats.format())
+        self.add_to_history(f"Order statistics of {column}: {len(stats.values())} value(s) in {stats.seconds:.4f}s "
+                            f"({stats.passes} partition passes)")
+
     def show_history(self):
         """Displays the session log"""
         print("\n📜 EXECUTION HISTORY")
@@ -145,27 +381,38 @@ class BenchmarkApp:
             print(entry)
         print("-" * 50)
 
-    def save_prompt(self):
+    def save_prompt(self, counts=None):
+        """Save the sorted rows, or the group counts of an aggregation (<column>,count lines)"""
         if input("\n💾 Save results to .txt? (y/n): ").lower() == 'y':
-            fname = f"sorted_{int(time.time())}.txt"
-            with open(fname, 'w') as f:
-                for row in self.last_sorted:
-                    f.write(f"{row['ID']}, {row['FirstName']}, {row['LastName']}\n")
+            if counts is not None:
+                fname = counts.write(f"counts_{counts.label}_{int(time.time())}.txt")
+            else:
+                fname = f"sorted_{int(time.time())}.txt"
+                with open(fname, 'w') as f:
+                    for row in self.last_sorted:
+                        f.write(f"{row['ID']}, {row['FirstName']}, {row['LastName']}\n")
             self.add_to_history(f"Saved results to {fname}")
             print(f"✅ Saved to {fname}")
 
     def menu(self):
         while True:
-            print("\n1. Load Data | 2. Run Sort | 3. View History | 4. Exit")
+            print("\n1. Load Data | 2. Run Sort | 3. View History | 4. Regression Report | 5. Resume Checkpoint "
+                  "| 6. Race Algorithms | 7. Count Values | 8. Percentiles | 9. Exit")
             c = input("\nAction: ")
             if c == '1': self.load_data()
             elif c == '2': self.run_sort()
             elif c == '3': self.show_history()
-            elif c == '4': break
+            elif c == '4': self.regression_report()
+            elif c == '5': self.resume_checkpoint()
+            elif c == '6': self.race()
+            elif c == '7': self.aggregate()
+            elif c == '8': self.select_stats()
+            elif c == '9': break
 
 if __name__ == "__main__":
     path = "generated_data.csv"
     if Path(path).exists():
-        BenchmarkApp(path).menu()
+        BenchmarkApp(path, profile='--profile' in sys.argv).menu()
     else:
         print(f"Error: {path} not found.")
+        print(f"Create one with: python datagen.py csv {path} --rows 100000 --seed 1")
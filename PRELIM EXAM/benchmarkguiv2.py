@@ -4,100 +4,89 @@ SORTING ALGORITHM BENCHMARK TOOL - STANDALONE GUI VERSION
 Features: 
 - Real-time Progress Bar (%) & Cancel Option
 - Save FULL sorted results to .txt
+- Ascending or descending order for every algorithm (stable either way)
 - Session History & Search Functionality
-- Automatic 'generated_data.csv' detection
+- Persistent run history with regression report
+- Warmup + repeated timing with median / 95% CI (progress I/O kept off the sort thread)
+- Live metrics panel (throughput, key calls, memory, ETA) with a run-vs-history chart
+- Optional phase profile (partition/merge/copy/callback/key_extract) saved as flame-graph stacks
+- Cancelled Bubble/Insertion sorts are checkpointed to disk and can be resumed later
+- Automatic 'generated_data.csv' detection (after the window is up)
 - Fully editable 'Rows to Load' field
+- Fast startup: helper modules load on first use (--startup-report prints the launch phases)
 """
 
-import csv
 import time
+_LAUNCHED = time.perf_counter()
+
 import tkinter as tk
-from tkinter import ttk, scrolledtext, messagebox, filedialog
+from tkinter import ttk, scrolledtext, messagebox
 from pathlib import Path
+import sys
 import threading
 from datetime import datetime
 
+from live_dashboard import LiveDashboard
+from row_sorts import ALLOC_STATS, BASELINES, BY_KEY, RESUMABLE
+from sort_keys import KeyExpressionError, check_key, key_cost, key_for
+from sort_order import order_label
+from startup_timer import StartupTimer
+
+# Loading data, timing, run history and checkpoints import their modules on first
+# use (tkinter.filedialog, dataset_cache, timing_harness, run_history, sort_checkpoint)
+# so none of that is paid before the window is interactive.
+
 # ============================================================================
-# SORTING ALGORITHMS (Updated with Progress Tracking & Cancellation)
+# SORTING ALGORITHMS (shared with the console tool, see row_sorts.py)
 # ============================================================================
 
-def bubble_sort(data, key_func, progress_callback, stop_event):
-    arr = data.copy()
-    n = len(arr)
-    for i in range(n):
-        if stop_event.is_set(): return None
-        # Update progress every iteration of the outer loop
-        progress_callback(int((i / n) * 100))
-        
-        swapped = False
-        for j in range(0, n - i - 1):
-            if key_func(arr[j]) > key_func(arr[j + 1]):
-                arr[j], arr[j + 1] = arr[j + 1], arr[j]
-                swapped = True
-        if not swapped: break
-    return arr
-
-def insertion_sort(data, key_func, progress_callback, stop_event):
-    arr = data.copy()
-    n = len(arr)
-    for i in range(1, n):
-        if stop_event.is_set(): return None
-        # Update progress periodically to keep GUI responsive
-        if i % (max(1, n // 100)) == 0:
-            progress_callback(int((i / n) * 100))
-            
-        key_item = arr[i]
-        key_value = key_func(key_item)
-        j = i - 1
-        while j >= 0 and key_func(arr[j]) > key_value:
-            arr[j + 1] = arr[j]
-            j -= 1
-        arr[j + 1] = key_item
-    return arr
-
-def merge_sort(data, key_func, progress_callback, stop_event):
-    arr = data.copy()
-    if len(arr) <= 1: return arr
-    
-    def merge(left, right):
-        result = []
-        i = j = 0
-        while i < len(left) and j < len(right):
-            if stop_event.is_set(): return []
-            if key_func(left[i]) <= key_func(right[j]):
-                result.append(left[i]); i += 1
-            else:
-                result.append(right[j]); j += 1
-        result.extend(left[i:]); result.extend(right[j:])
-        return result
-
-    def msort(a, depth=0):
-        if stop_event.is_set() or len(a) <= 1: return a
-        # Merge sort is fast, so we simulate progress based on recursion depth
-        if depth < 10: progress_callback(depth * 10)
-        mid = len(a) // 2
-        return merge(msort(a[:mid], depth+1), msort(a[mid:], depth+1))
-    
-    res = msort(arr)
-    progress_callback(100)
-    return res
+ALGORITHMS = {key: func for key, (_, func) in BY_KEY.items()}
+
+def column_key(column):
+    """Compiled key for a menu column or a key expression (see sort_keys.py)"""
+    return key_for(column)
 
 # ============================================================================
 # GUI APPLICATION
 # ============================================================================
 
 class BenchmarkGUI:
-    def __init__(self, root):
+    def __init__(self, root, startup=None):
         self.root = root
+        self.startup = startup or StartupTimer(enabled=False)
         self.csv_path = None
         self.data = []
         self.history = []
+        self._runs = None
         self.last_sorted_result = None
+        self.last_counts = None # Latest aggregation; Save exports it until the next sort
         self.stop_event = threading.Event()
+        self._progress = 0 # Written by the sort thread, polled by the Tk loop
+        self._live = {} # Key-call counter and current run index, same arrangement
+        self._prediction = None # Estimate for the sort being started, recorded with its run
+        self._status = "System Idle"
+        self._running = False
         
         self.setup_window()
         self.create_widgets()
-        self.prompt_csv_file() # Original logic to detect file in folder
+        self.startup.mark("main widgets")
+        # Everything else waits until the main loop is idle, i.e. the window is up
+        self.root.after_idle(self._finish_startup)
+
+    def _finish_startup(self):
+        self.startup.mark("window interactive")
+        self.create_secondary_widgets()
+        self.startup.mark("secondary panels")
+        self.startup.report()
+        threading.Thread(target=self._detect_csv, daemon=True).start()
+
+    @property
+    def runs(self):
+        """Persistent run database, opened on first use"""
+        if self._runs is None:
+            from run_history import RunHistory
+            self._runs = RunHistory()
+        return self._runs
     
     def setup_window(self):
         self.root.title("Sorting Algorithm Benchmark Tool")
@@ -108,14 +97,20 @@ class BenchmarkGUI:
         timestamp = datetime.now().strftime("%H:%M:%S")
         self.history.append(f"[{timestamp}] {msg}")
 
-    def prompt_csv_file(self):
+    def _detect_csv(self):
+        """Look for generated_data.csv off the Tk thread (slow on network home folders)"""
+        found = Path("generated_data.csv").exists()
+        self.root.after(0, self.prompt_csv_file, found)
+
+    def prompt_csv_file(self, found=True):
         """Original feature: Detect if generated_data.csv exists"""
         default_path = Path("generated_data.csv")
-        if default_path.exists():
+        if found and default_path.exists():
             if messagebox.askyesno("File Found", "Use 'generated_data.csv' found in folder?"):
                 self.csv_path = default_path
                 return
         
+        from tkinter import filedialog
         file_path = filedialog.askopenfilename(filetypes=[("CSV", "*.csv")])
         if file_path: self.csv_path = Path(file_path)
 
@@ -146,26 +141,34 @@ class BenchmarkGUI:
         f2 = tk.LabelFrame(left_panel, text=" 2. Sort Settings ", bg='white', font=('Arial', 10, 'bold'))
         f2.pack(fill='x', padx=10, pady=5)
         self.algo_var = tk.StringVar(value="merge")
-        for t, v in [("Bubble Sort", "bubble"), ("Insertion Sort", "insertion"), ("Merge Sort", "merge")]:
+        for t, v in [("Bubble Sort", "bubble"), ("Insertion Sort", "insertion"), ("Merge Sort", "merge"),
+                     ("Merge Sort (buffered)", "merge_buffered"), ("Bubble Sort (fast)", "bubble_fast"),
+                     ("Insertion Sort (fast)", "insertion_fast")]:
             tk.Radiobutton(f2, text=t, variable=self.algo_var, value=v, bg='white').pack(anchor='w', padx=5)
         
         self.col_var = tk.StringVar(value="ID")
         tk.OptionMenu(f2, self.col_var, "ID", "FirstName", "LastName").pack(fill='x', padx=10, pady=5)
+        tk.Label(f2, text="Key expression (overrides the column):", bg='white').pack(anchor='w', padx=10)
+        self.key_var = tk.StringVar()
+        tk.Entry(f2, textvariable=self.key_var).pack(fill='x', padx=10, pady=(0, 5))
+        self.order_var = tk.StringVar(value="Ascending")
+        tk.OptionMenu(f2, self.order_var, "Ascending", "Descending").pack(fill='x', padx=10, pady=(0, 5))
+        tk.Label(f2, text="Timed repeats (after 1 warmup):", bg='white').pack(anchor='w', padx=10)
+        self.repeats_var = tk.StringVar(value="3")
+        tk.Spinbox(f2, from_=1, to=50, textvariable=self.repeats_var, width=5).pack(anchor='w', padx=10, pady=(0, 5))
+        self.profile_var = tk.BooleanVar(value='--profile' in sys.argv)
+        tk.Checkbutton(f2, text="Profile phases (one extra run)", variable=self.profile_var,
+                       bg='white').pack(anchor='w', padx=5)
         
         self.run_btn = tk.Button(f2, text="▶ RUN SORT", command=self.run_benchmark, bg='#27ae60', fg='white', font=('Arial', 11, 'bold'))
         self.run_btn.pack(fill='x', padx=10, pady=10)
         
         self.cancel_btn = tk.Button(f2, text="🛑 CANCEL SORT", command=self.cancel_sort, bg='#e74c3c', fg='white', state='disabled')
         self.cancel_btn.pack(fill='x', padx=10, pady=5)
-
-        # 3. Features
-        f3 = tk.LabelFrame(left_panel, text=" 3. Search & History ", bg='white', font=('Arial', 10, 'bold'))
-        f3.pack(fill='x', padx=10, pady=5)
-        self.search_var = tk.StringVar()
-        tk.Entry(f3, textvariable=self.search_var).pack(fill='x', padx=10, pady=5)
-        tk.Button(f3, text="Search in Data", command=self.perform_search).pack(fill='x', padx=10, pady=2)
-        tk.Button(left_panel, text="View Session History", command=self.show_history).pack(fill='x', padx=10, pady=10)
-        tk.Button(left_panel, text="Clear Results", command=self.clear_results, bg='#95a5a6', fg='white').pack(fill='x', padx=10)
+        
+        self.resume_btn = tk.Button(f2, text="⏯ RESUME CHECKPOINT", command=self.resume_sort, bg='#8e44ad', fg='white')
+        self.resume_btn.pack(fill='x', padx=10, pady=(0, 10))
+        self.left_panel = left_panel
 
         # Right Panel (Output)
         right_panel = tk.Frame(main_frame, bg='white', relief='ridge', bd=1)
@@ -190,9 +193,27 @@ class BenchmarkGUI:
         self.prog_bar = ttk.Progressbar(right_panel, mode='determinate')
         self.prog_bar.pack(fill='x', padx=10, pady=(0, 10))
 
+        self.dashboard = LiveDashboard(right_panel)
+        self.dashboard.pack(fill='x', padx=10)
+
         self.results_text = scrolledtext.ScrolledText(right_panel, font=('Consolas', 10), state='disabled', bg='#1e1e1e', fg='#d4d4d4')
         self.results_text.pack(fill='both', expand=True, padx=10, pady=10)
 
+    def create_secondary_widgets(self):
+        """Search & history controls, built once the main window is already showing"""
+        left_panel = self.left_panel
+        # 3. Features
+        f3 = tk.LabelFrame(left_panel, text=" 3. Search & History ", bg='white', font=('Arial', 10, 'bold'))
+        f3.pack(fill='x', padx=10, pady=5)
+        self.search_var = tk.StringVar()
+        tk.Entry(f3, textvariable=self.search_var).pack(fill='x', padx=10, pady=5)
+        tk.Button(f3, text="Search in Data", command=self.perform_search).pack(fill='x', padx=10, pady=2)
+        tk.Button(f3, text="Count Values (column)", command=self.count_values).pack(fill='x', padx=10, pady=2)
+        tk.Button(f3, text="Median / Percentiles (column)", command=self.select_stats).pack(fill='x', padx=10, pady=2)
+        tk.Button(left_panel, text="View Session History", command=self.show_history).pack(fill='x', padx=10, pady=(10, 2))
+        tk.Button(left_panel, text="Regression Report", command=self.show_regressions).pack(fill='x', padx=10, pady=(2, 10))
+        tk.Button(left_panel, text="Clear Results", command=self.clear_results, bg='#95a5a6', fg='white').pack(fill='x', padx=10)
+
     # ============================================================================
     # LOGIC METHODS
     # ============================================================================
@@ -201,49 +222,195 @@ class BenchmarkGUI:
         if not self.csv_path: return messagebox.showerror("Error", "No CSV file selected.")
         try:
             num = int(self.rows_var.get())
-            self.data = []
-            with open(self.csv_path, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for i, row in enumerate(reader):
-                    if i >= num: break
-                    self.data.append({k.replace('\ufeff', ''): v.strip() for k, v in row.items()})
+            from dataset_cache import load_csv
+            start = time.perf_counter()
+            self.data, source = load_csv(self.csv_path, num)
             self.data_status.config(text=f"✓ {len(self.data):,} rows loaded", fg='green')
-            self.log(f"Loaded {len(self.data):,} rows from {self.csv_path.name}")
+            self.log(f"Loaded {len(self.data):,} rows from {self.csv_path.name} "
+                     f"({'from cache' if source == 'cache' else 'parsed'}, {time.perf_counter() - start:.2f}s)")
             self.add_history(f"Loaded {len(self.data)} rows.")
         except Exception as e:
             messagebox.showerror("Error", f"Check row count: {e}")
 
     def run_benchmark(self):
         if not self.data: return messagebox.showwarning("Warning", "Load data first!")
+        from sort_estimate import estimate, over_limits
+        col = self.key_var.get().strip() or self.col_var.get()
+        try:
+            check_key(col, self.data)
+        except KeyExpressionError as e:
+            return messagebox.showerror("Key expression", str(e))
+        repeats = max(1, int(self.repeats_var.get()) if self.repeats_var.get().isdigit() else 3)
+        prediction = estimate(self.runs, 'gui', self.algo_var.get(), len(self.data))
+        problems = over_limits(prediction, repeats + 1)
+        if problems and not messagebox.askyesno("Over the limits", "\n\n".join(problems) + "\n\nRun it anyway?"):
+            self.log(f"\n⛔ Not started: {'; '.join(problems)}")
+            return
+        self.log(f"\n📐 Estimate: {prediction.summary(repeats + 1)}")
+        ns, source = key_cost(col, self.data)
+        self.log(f"🔑 Key {col} -> {source}: {ns:.0f} ns/row (~{ns * len(self.data) / 1e9:.3f}s per pass)")
+        self._prediction = prediction
         self.stop_event.clear()
+        self.last_counts = None
         self.save_btn.config(state='disabled')
         self.run_btn.config(state='disabled')
+        self.resume_btn.config(state='disabled')
         self.cancel_btn.config(state='normal')
         self.prog_bar['value'] = 0
         
         algo = self.algo_var.get()
-        col = self.col_var.get()
-        threading.Thread(target=self._worker, args=(algo, col), daemon=True).start()
-
-    def _worker(self, algo_key, col_key):
-        self.root.after(0, self.prog_label.config, {"text": f"Sorting with {algo_key}..."})
-        key_func = lambda r: int(r['ID']) if col_key == 'ID' else r[col_key].lower()
-        algo_func = {'bubble': bubble_sort, 'insertion': insertion_sort, 'merge': merge_sort}[algo_key]
+        descending = self.order_var.get() == "Descending"
+        self._running = True
+        self._live = {'key_calls': 0, 'run': 0, 'run_started': time.perf_counter()}
+        self.dashboard.start(len(self.data), repeats + 1) # + the warmup
+        self._poll_progress()
+        threading.Thread(target=self._worker, args=(algo, col, repeats, self.profile_var.get(), descending),
+                         daemon=True).start()
+
+    def _worker(self, algo_key, col_key, repeats, profile=False, descending=False):
+        from run_history import dataset_fingerprint
+        from sort_checkpoint import Checkpointer
+        from sort_verify import verify
+        from timing_harness import measure
+        self._status = f"Sorting with {algo_key}..."
+        key_func = column_key(col_key)
+        algo_func = ALGORITHMS[algo_key]
+        pause = {}
+        if algo_key in RESUMABLE:
+            try:
+                fingerprint = dataset_fingerprint(self.csv_path)
+            except OSError:
+                fingerprint = 'in-memory'
+            pause['checkpointer'] = Checkpointer('gui', algo_key, col_key, self.csv_path, len(self.data), fingerprint,
+                                                 descending=descending)
+        live = self._live
+        key_calls = 0
+        def counted_key(r):
+            live['key_calls'] += 1
+            return key_func(r)
+
+        def announce(i, total, phase):
+            nonlocal key_calls
+            step = "warmup" if phase == 'warmup' else f"repeat {i}/{total - 1}"
+            self._status = f"Sorting with {algo_key} ({step})..."
+            if phase != 'warmup' and live['key_calls'] is not None:
+                key_calls, live['key_calls'] = live['key_calls'], None # Only the warmup is counted
+            live['run'], live['run_started'] = i, time.perf_counter()
         
-        start_time = time.perf_counter()
-        sorted_data = algo_func(self.data, key_func, self._update_prog_ui, self.stop_event)
-        duration = time.perf_counter() - start_time
+        # Warmup counts key calls; every run sorts a copy made outside the timed region
+        stats, sorted_data = measure(
+            lambda arr: algo_func(arr, key_func, self._set_progress, self.stop_event, copy=False,
+                                  descending=descending, **pause),
+            setup=self.data.copy, repeats=repeats, warmup=1,
+            warmup_run=lambda arr: algo_func(arr, counted_key, self._set_progress, self.stop_event, copy=False,
+                                             descending=descending, **pause),
+            on_repeat=announce, should_stop=self.stop_event.is_set, memory=True, alloc_stats=ALLOC_STATS)
         
-        if self.stop_event.is_set():
-            self.root.after(0, self.log, "❌ Sort cancelled by user.")
+        if self.stop_event.is_set() or stats is None:
+            saved = pause['checkpointer'].saved_path if pause else None
+            if saved:
+                self.root.after(0, self.log, f"⏸️ Sort paused. Checkpoint saved to {saved}\n   Use RESUME CHECKPOINT to continue it later.")
+                self.add_history(f"Paused {algo_key} on {col_key} ({saved.name})")
+            else:
+                self.root.after(0, self.log, "❌ Sort cancelled by user.")
         else:
-            self.last_sorted_result = {'data': sorted_data, 'algo': algo_key, 'col': col_key, 'time': duration}
+            if pause:
+                pause['checkpointer'].discard()
+            previous, variant = [], None
+            try:
+                self.runs.record('gui', self.csv_path, len(self.data), algo_key, stats.median,
+                                 column=order_label(col_key, descending), timings=stats.samples, key_calls=key_calls,
+                                 peak_bytes=stats.memory['peak_bytes'] if stats.memory else None,
+                                 predicted_seconds=self._prediction.seconds,
+                                 predicted_bytes=int(self._prediction.peak_bytes))
+                # Earlier runs of this configuration (oldest first) for the dashboard overlay
+                runs = self.runs.runs_for(dataset_fingerprint(self.csv_path), len(self.data), algo_key,
+                                          order_label(col_key, descending), 'gui', limit=11)
+                previous = [r['seconds'] for r in reversed(runs[1:])]
+                # Latest run of the paired original (or fast variant) for the speedup line
+                other = BASELINES.get(algo_key) or next((f for f, b in BASELINES.items() if b == algo_key), None)
+                if other:
+                    paired = self.runs.runs_for(dataset_fingerprint(self.csv_path), len(self.data), other,
+                                                order_label(col_key, descending), 'gui', limit=1)
+                    variant = (other, paired[0]['seconds'] if paired else None)
+            except Exception as e:
+                self.root.after(0, self.log, f"⚠️ Could not record run history: {e}")
+            self._status = "Verifying result..."
+            check = verify(self.data, sorted_data, key_func, descending, stability=True) # on this thread, after timing
+            phases = None
+            if profile:
+                from phase_profiler import profile_call
+                self._status = "Profiling phases (extra run)..."
+                _, profiler = profile_call(algo_func, self.data.copy(), key_func, self._set_progress,
+                                           self.stop_event, copy=False, descending=descending)
+                phases = (profiler.summary(), profiler.save('gui', algo_key, order_label(col_key, descending)))
+            self.last_sorted_result = {'data': sorted_data, 'algo': algo_key, 'col': col_key, 'descending': descending,
+                                       'time': stats.median, 'stats': stats, 'previous': previous,
+                                       'verified': check.summary(), 'phases': phases, 'variant': variant,
+                                       'prediction': self._prediction}
             self.root.after(0, self._finish_ui)
         
+        self._running = False
+        self.root.after(0, self._reset_ui)
+
+    def resume_sort(self):
+        """Pick a saved checkpoint and finish that sort in the background"""
+        from tkinter import filedialog
+        from sort_checkpoint import CHECKPOINT_DIR
+        path = filedialog.askopenfilename(initialdir=str(CHECKPOINT_DIR), filetypes=[("Sort checkpoint", "*.ckpt")])
+        if not path: return
+        self.stop_event.clear()
+        self.last_counts = None
+        self.save_btn.config(state='disabled')
+        self.run_btn.config(state='disabled')
+        self.resume_btn.config(state='disabled')
+        self.cancel_btn.config(state='normal')
+        self._running = True
+        self._poll_progress()
+        threading.Thread(target=self._resume_worker, args=(path,), daemon=True).start()
+
+    def _resume_worker(self, path):
+        from sort_checkpoint import Checkpointer
+        from sort_verify import verify
+        try:
+            checkpointer, arr, position = Checkpointer.resume(path)
+        except Exception as e:
+            self.root.after(0, self.log, f"❌ Could not read checkpoint: {e}")
+        else:
+            algo_key, col_key = checkpointer.meta['algorithm'], checkpointer.meta['column']
+            descending = checkpointer.meta.get('descending', False)
+            self._live = {'key_calls': None, 'run': 0, 'run_started': time.perf_counter(),
+                          'progress_start': int(position / max(1, len(arr)) * 100)}
+            self.root.after(0, self.dashboard.start, len(arr), 1)
+            self._status = f"Resuming {algo_key} at {position:,}/{len(arr):,}..."
+            start_time = time.perf_counter()
+            sorted_data = ALGORITHMS[algo_key](arr, column_key(col_key), self._set_progress, self.stop_event,
+                                               copy=False, checkpointer=checkpointer, start=position,
+                                               descending=descending)
+            if sorted_data is None:
+                self.root.after(0, self.log, f"⏸️ Paused again. Checkpoint saved to {checkpointer.saved_path}")
+            else:
+                checkpointer.discard()
+                total = checkpointer.elapsed_before + time.perf_counter() - start_time
+                # The checkpoint keeps no copy of the input, so only the order can be checked
+                check = verify(None, sorted_data, column_key(col_key), descending)
+                self.last_sorted_result = {'data': sorted_data, 'algo': algo_key, 'col': col_key, 'descending': descending,
+                                           'time': total, 'stats': None, 'verified': check.summary()}
+                self.root.after(0, self._finish_ui)
+        self._running = False
         self.root.after(0, self._reset_ui)
 
-    def _update_prog_ui(self, val):
-        self.root.after(0, self._set_bar, val)
+    def _set_progress(self, done, total): # phase: callback
+        """Progress callback for the sort thread: a plain store of the percentage, no Tk calls"""
+        self._progress = 100 * done // total if total else 100
+
+    def _poll_progress(self):
+        """Refresh the bar from the main loop while a sort is running"""
+        self._set_bar(self._progress)
+        self.prog_label.config(text=self._status)
+        self.dashboard.sample(self._progress, self._live)
+        if self._running:
+            self.root.after(100, self._poll_progress)
 
     def _set_bar(self, val):
         self.prog_bar['value'] = val
@@ -251,15 +418,42 @@ class BenchmarkGUI:
 
     def _finish_ui(self):
         res = self.last_sorted_result
+        self._set_bar(100)
         self.save_btn.config(state='normal')
-        self.log(f"\n✨ SORT COMPLETE: {res['algo'].upper()}\nTime: {res['time']:.4f}s | Column: {res['col']}\nPreview (Top 5):")
+        if res['stats']:
+            timing = f"{res['stats'].summary()}\nMemory (warmup run): {res['stats'].memory_summary()}"
+            self.dashboard.finish(res['time'], res['previous'])
+        else:
+            timing = "Resumed from checkpoint (time is the total across sessions)"
+        self.log(f"\n✨ SORT COMPLETE: {res['algo'].upper()}\nTime: {res['time']:.4f}s | Column: {res['col']} "
+                 f"({'descending' if res['descending'] else 'ascending'})\n{timing}\n"
+                 f"Verified: {res['verified']}")
+        if res.get('prediction'):
+            from sort_estimate import format_check
+            self.log(f"Estimate: {format_check(res['prediction'], res['time'])}")
+        if res.get('phases'):
+            summary, path = res['phases']
+            self.log(f"Phases (extra profiled run): {summary}\nFlame graph stacks: {path}")
+        if res.get('variant'):
+            other, seconds = res['variant']
+            fast, base = (res['algo'], other) if res['algo'] in BASELINES else (other, res['algo'])
+            times = {res['algo']: res['time'], other: seconds}
+            if seconds is None:
+                self.log(f"(Run {other} on the same column to compare it with {res['algo']})")
+            elif times[fast] > 0:
+                self.log(f"⚡ {fast}: {times[base] / times[fast]:.2f}x faster than {base} "
+                         f"({times[fast]:.4f}s vs {times[base]:.4f}s median)")
+        self.log("Preview (Top 5):")
         for row in res['data'][:5]:
             self.log(f"-> {row['ID']} | {row['FirstName']} {row['LastName']}")
         self.add_history(f"Sorted {len(res['data'])} rows in {res['time']:.2f}s")
 
     def _reset_ui(self):
+        self.dashboard.stop()
         self.run_btn.config(state='normal')
+        self.resume_btn.config(state='normal')
         self.cancel_btn.config(state='disabled')
+        self._status = "System Idle"
         self.prog_label.config(text="System Idle")
 
     def cancel_sort(self):
@@ -267,17 +461,21 @@ class BenchmarkGUI:
         self.cancel_btn.config(state='disabled')
 
     def save_to_txt(self):
-        """Restored: Saves every sorted row to a text file"""
+        """Restored: Saves every sorted row (or the latest value counts) to a text file"""
+        if self.last_counts:
+            return self._save_counts()
         if not self.last_sorted_result: return
         res = self.last_sorted_result
         filename = f"sorted_{res['algo']}_{res['col']}.txt"
+        from tkinter import filedialog
         path = filedialog.asksaveasfilename(defaultextension=".txt", initialfile=filename)
         
         if path:
             try:
                 with open(path, 'w', encoding='utf-8') as f:
                     f.write(f"SORTED DATA EXPORT - {res['algo'].upper()}\n")
-                    f.write(f"Column: {res['col']} | Rows: {len(res['data'])}\n" + "="*50 + "\n")
+                    order = 'descending' if res['descending'] else 'ascending'
+                    f.write(f"Column: {res['col']} ({order}) | Rows: {len(res['data'])}\n" + "="*50 + "\n")
                     for r in res['data']:
                         f.write(f"{r['ID']:<10} {r['FirstName']:<20} {r['LastName']}\n")
                 messagebox.showinfo("Saved", f"Results exported to {Path(path).name}")
@@ -285,6 +483,44 @@ class BenchmarkGUI:
             except Exception as e:
                 messagebox.showerror("Export Error", str(e))
 
+    def _save_counts(self):
+        counts = self.last_counts
+        from tkinter import filedialog
+        path = filedialog.asksaveasfilename(defaultextension=".txt", initialfile=f"counts_{counts.label}.txt")
+        if path:
+            try:
+                counts.write(path)
+                messagebox.showinfo("Saved", f"Counts exported to {Path(path).name}")
+                self.add_history(f"Exported {counts.label} counts to {Path(path).name}")
+            except Exception as e:
+                messagebox.showerror("Export Error", str(e))
+
+    def count_values(self):
+        """Distinct values, duplicate groups and counts per key for the selected column"""
+        if not self.data: return messagebox.showwarning("Warning", "Load data first!")
+        from sort_aggregate import aggregate, column_values
+        column = self.col_var.get()
+        self.last_counts = aggregate(column_values(self.data, column), label=column)
+        self.log(f"\n📊 COUNTS BY {column.upper()} ({len(self.data):,} rows)\n{self.last_counts.format()}")
+        self.add_history(f"Counted {column}: {self.last_counts.distinct:,} distinct values")
+        self.save_btn.config(state='normal')
+
+    def select_stats(self):
+        """Median, percentiles and min/max of the selected column or key expression, without a full sort"""
+        if not self.data: return messagebox.showwarning("Warning", "Load data first!")
+        from tkinter import simpledialog
+        from sort_select import DEFAULT_PERCENTILES, key_values, order_statistics, parse_percentiles
+        column = self.key_var.get().strip() or self.col_var.get()
+        text = simpledialog.askstring("Percentiles", f"Percentiles of {column} (comma-separated):",
+                                      initialvalue=", ".join(map(str, DEFAULT_PERCENTILES)), parent=self.root)
+        if text is None: return
+        try:
+            stats = order_statistics(key_values(self.data, column), parse_percentiles(text), (1, -1), column)
+        except ValueError as e:
+            return messagebox.showerror("Percentiles", str(e))
+        self.log(f"\n📏 ORDER STATISTICS OF {column.upper()} ({len(self.data):,} rows)\n{stats.format()}")
+        self.add_history(f"Order statistics of {column} in {stats.seconds:.4f}s")
+
     def perform_search(self):
         term = self.search_var.get().lower()
         if not self.data or not term: return
@@ -300,6 +536,11 @@ class BenchmarkGUI:
         txt.insert(tk.END, "\n".join(self.history) if self.history else "No history yet.")
         txt.config(state='disabled')
 
+    def show_regressions(self):
+        """Latest run of each configuration against its rolling baseline"""
+        from run_history import format_report, regression_report
+        self.log("\n📈 REGRESSION REPORT\n" + format_report(regression_report(self.runs)))
+
     def log(self, text):
         self.results_text.config(state='normal')
         self.results_text.insert(tk.END, text + "\n")
@@ -316,6 +557,9 @@ class BenchmarkGUI:
         messagebox.showinfo("Reset", "Display cleared.")
 
 if __name__ == "__main__":
+    startup = StartupTimer(_LAUNCHED)
+    startup.mark("imports")
     root = tk.Tk()
-    BenchmarkGUI(root)
+    startup.mark("Tk root window")
+    BenchmarkGUI(root, startup)
     root.mainloop()
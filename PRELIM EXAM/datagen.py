@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+SYNTHETIC DATASET GENERATOR - seeded, streaming, any size
+
+Writes the two input formats used in this repo without building the data in memory:
+  csv  -> ID,FirstName,LastName rows like generated_data.csv
+  ints -> one integer per line like PRELIM-LAB-WORK-*/dataset.txt
+
+Usage:
+    python datagen.py csv generated_data.csv --rows 1000000 --names zipf --seed 7
+    python datagen.py ints dataset.txt --rows 19998 --low 1 --high 9998 --duplicates 0.5
+"""
+
+import argparse
+import random
+import sys
+import time
+
+CHUNK_ROWS = 65536
+WRITE_BUFFER = 1 << 22
+FEISTEL_ROUNDS = 4
+MASK64 = (1 << 64) - 1
+
+# ============================================================================
+# NAME VOCABULARY
+# ============================================================================
+
+_FIRST = ("James Mary John Patricia Robert Jennifer Michael Linda William Elizabeth David Barbara "
+          "Richard Susan Joseph Jessica Thomas Sarah Charles Karen Daniel Nancy Matthew Lisa "
+          "Anthony Betty Mark Margaret Donald Sandra Steven Ashley Paul Kimberly Andrew Emily "
+          "Joshua Donna Kenneth Michelle Kevin Dorothy Brian Carol George Amanda Edward Melissa "
+          "Ronald Deborah Timothy Stephanie Jason Rebecca Jeffrey Sharon Ryan Laura Jacob Cynthia "
+          "Gary Kathleen Nicholas Amy Eric Shirley Jonathan Angela Stephen Helen Larry Anna "
+          "Justin Brenda Scott Pamela Brandon Nicole Benjamin Emma Samuel Samantha Gregory Katherine "
+          "Frank Christine Alexander Debra Raymond Rachel Patrick Catherine Jack Carolyn Dennis Janet").split()
+_LAST = ("Smith Johnson Williams Brown Jones Garcia Miller Davis Rodriguez Martinez Hernandez Lopez "
+         "Gonzalez Wilson Anderson Thomas Taylor Moore Jackson Martin Lee Perez Thompson White "
+         "Harris Sanchez Clark Ramirez Lewis Robinson Walker Young Allen King Wright Scott Torres "
+         "Nguyen Hill Flores Green Adams Nelson Baker Hall Rivera Campbell Mitchell Carter Roberts "
+         "Santos Reyes Cruz Bautista Ocampo Mendoza Aquino Ramos Villanueva Castillo Andaya Dela "
+         "Garcia Torres Flores Navarro Domingo Salazar Soriano Manalo Pascual").split()
+_SYLLABLES = "ka lo mi ra sen to vi da nel qu or an be lu ti ro sa fe gi mo".split()
+
+
+def name_vocabulary(base, size, rng):
+    """Deterministic vocabulary: the base names, then synthetic ones up to `size`"""
+    vocab = list(dict.fromkeys(base))
+    seen = set(vocab)
+    while len(vocab) < size:
+        name = "".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+        if name not in seen:
+            seen.add(name)
+            vocab.append(name)
+    return vocab
+
+
+def zipf_cum_weights(n, s):
+    """Cumulative Zipf(s) weights for ranks 1..n"""
+    total, cum = 0.0, []
+    for k in range(1, n + 1):
+        total += 1.0 / k ** s
+        cum.append(total)
+    return cum
+
+# ============================================================================
+# STREAMING COLUMN GENERATORS
+# ============================================================================
+
+def feistel_permutation(n, rng, rounds=FEISTEL_ROUNDS):
+    """
+    Keyed pseudo-random permutation of 0..n-1, computed one index at a time.
+
+    A balanced Feistel network over the smallest even-bit domain covering n is a
+    permutation of that domain; values that land outside 0..n-1 are fed through
+    again (cycle walking) until they land inside, fewer than 4 tries on average.
+    """
+    half = max(1, ((n - 1).bit_length() + 1) // 2)
+    mask, shift = (1 << half) - 1, 64 - half
+    keys = [rng.getrandbits(64) for _ in range(rounds)]
+
+    def permute(x):
+        while True:
+            left, right = x >> half, x & mask
+            for key in keys:
+                # Round function: the top bits of a multiplicative hash (the low bits of a
+                # product only depend on the low bits of its input, too regular for small n)
+                h = ((right + key) * 0x9E3779B97F4A7C15) & MASK64
+                left, right = right, left ^ (h >> shift)
+            x = (left << half) | right
+            if x < n:
+                return x
+    return permute
+
+
+def shuffled_ids(n, rng):
+    """Yield chunks of a pseudo-random permutation of 1..n in O(1) memory (Feistel network)"""
+    permute = feistel_permutation(n, rng)
+    for start in range(0, n, CHUNK_ROWS):
+        yield [permute(k) + 1 for k in range(start, min(start + CHUNK_ROWS, n))]
+
+
+def sequential_ids(n, rng):
+    for start in range(1, n + 1, CHUNK_ROWS):
+        yield list(range(start, min(start + CHUNK_ROWS, n + 1)))
+
+
+def random_ids(n, rng, high=None):
+    high = high or n
+    for start in range(0, n, CHUNK_ROWS):
+        yield [rng.randint(1, high) for _ in range(min(CHUNK_ROWS, n - start))]
+
+
+def add_duplicates(chunk, rate, rng):
+    """Overwrite about `rate` of the chunk with copies of other values from the same chunk"""
+    if rate <= 0 or len(chunk) < 2:
+        return chunk
+    size = len(chunk)
+    for pos in rng.sample(range(size), int(size * min(rate, 1.0))):
+        chunk[pos] = chunk[rng.randrange(size)]
+    return chunk
+
+
+def presort_runs(chunk, run, descending=False, key=None):
+    """Sort consecutive blocks of `run` items so the output contains presorted runs"""
+    if run <= 1:
+        return chunk
+    for start in range(0, len(chunk), run):
+        chunk[start:start + run] = sorted(chunk[start:start + run], key=key, reverse=descending)
+    return chunk
+
+# ============================================================================
+# WRITERS
+# ============================================================================
+
+def write_ints(path, rows, seed=None, low=1, high=9998, dist='uniform', zipf_s=1.1,
+               duplicates=0.0, presorted_run=0, descending_runs=False):
+    rng = random.Random(seed)
+    population = range(low, high + 1)
+    cum = None
+    if dist == 'zipf':
+        # Rank 1 is the most frequent value; shuffle ranks so it is not always `low`
+        population = list(population)
+        rng.shuffle(population)
+        cum = zipf_cum_weights(len(population), zipf_s)
+    written = 0
+    with open(path, 'w', encoding='utf-8', newline='\n', buffering=WRITE_BUFFER) as f:
+        while written < rows:
+            k = min(CHUNK_ROWS, rows - written)
+            chunk = rng.choices(population, cum_weights=cum, k=k)
+            add_duplicates(chunk, duplicates, rng)
+            presort_runs(chunk, presorted_run, descending_runs)
+            f.write("\n".join(map(str, chunk)))
+            f.write("\n")
+            written += k
+    return written
+
+
+def write_csv(path, rows, seed=None, names='uniform', zipf_s=1.1, vocab_size=5000,
+              ids='shuffled', duplicates=0.0, presorted_run=0, descending_runs=False):
+    rng = random.Random(seed)
+    vocab_rng = random.Random(0)  # vocabulary is the same for every seed
+    first = name_vocabulary(_FIRST, vocab_size // 2, vocab_rng)
+    last = name_vocabulary(_LAST, vocab_size, vocab_rng)
+    first_cum = zipf_cum_weights(len(first), zipf_s) if names == 'zipf' else None
+    last_cum = zipf_cum_weights(len(last), zipf_s) if names == 'zipf' else None
+    id_chunks = {'shuffled': shuffled_ids, 'sequential': sequential_ids, 'random': random_ids}[ids](rows, rng)
+    written = 0
+    with open(path, 'w', encoding='utf-8', newline='\n', buffering=WRITE_BUFFER) as f:
+        f.write("ID,FirstName,LastName\n")
+        for id_chunk in id_chunks:
+            k = len(id_chunk)
+            firsts = rng.choices(first, cum_weights=first_cum, k=k)
+            lasts = rng.choices(last, cum_weights=last_cum, k=k)
+            chunk = list(zip(id_chunk, firsts, lasts))
+            add_duplicates(chunk, duplicates, rng)
+            presort_runs(chunk, presorted_run, descending_runs, key=lambda r: r[0])
+            f.write("\n".join(f"{i},{fn},{ln}" for i, fn, ln in chunk))
+            f.write("\n")
+            written += k
+    return written
+
+# ============================================================================
+# COMMAND LINE
+# ============================================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate reproducible benchmark inputs")
+    sub = parser.add_subparsers(dest='kind', required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('output')
+    common.add_argument('--rows', type=int, required=True)
+    common.add_argument('--seed', type=int, default=None, help="same seed, same file")
+    common.add_argument('--zipf-s', type=float, default=1.1, help="Zipf exponent for skewed distributions")
+    common.add_argument('--duplicates', type=float, default=0.0,
+                        help="fraction of rows replaced by copies of other rows (0..1)")
+    common.add_argument('--presorted-run', type=int, default=0, help="length of presorted runs (0 = none)")
+    common.add_argument('--descending-runs', action='store_true', help="presorted runs go largest first")
+
+    ints = sub.add_parser('ints', parents=[common], help="one integer per line (dataset.txt)")
+    ints.add_argument('--low', type=int, default=1)
+    ints.add_argument('--high', type=int, default=9998)
+    ints.add_argument('--dist', choices=['uniform', 'zipf'], default='uniform')
+
+    csv_p = sub.add_parser('csv', parents=[common], help="ID,FirstName,LastName (generated_data.csv)")
+    csv_p.add_argument('--names', choices=['uniform', 'zipf'], default='uniform')
+    csv_p.add_argument('--vocab-size', type=int, default=5000, help="distinct last names (first names: half)")
+    csv_p.add_argument('--ids', choices=['shuffled', 'sequential', 'random'], default='shuffled',
+                       help="unique shuffled, unique ascending, or random with repeats")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    if args.kind == 'ints':
+        rows = write_ints(args.output, args.rows, args.seed, args.low, args.high, args.dist, args.zipf_s,
+                          args.duplicates, args.presorted_run, args.descending_runs)
+    else:
+        rows = write_csv(args.output, args.rows, args.seed, args.names, args.zipf_s, args.vocab_size,
+                         args.ids, args.duplicates, args.presorted_run, args.descending_runs)
+    elapsed = time.perf_counter() - start
+    with open(args.output, 'rb') as f:
+        size = f.seek(0, 2)
+    print(f"Wrote {rows:,} rows ({size / 1e6:.1f} MB) to {args.output} in {elapsed:.2f}s "
+          f"({rows / elapsed:,.0f} rows/s, {size / 1e6 / elapsed:.1f} MB/s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
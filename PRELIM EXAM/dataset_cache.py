@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""
+DATASET CACHE - parsed-dataset snapshots shared across runs and processes
+
+The first load of a CSV or integer file parses it as usual and writes a compact
+binary snapshot to ~/.sortbench/cache. Later loads (from any tool or process)
+memory-map the snapshot instead of re-parsing. Snapshots are keyed on the source
+path, mtime, size and row limit; stale ones are removed when the source changes
+and the cache is kept under a size cap by evicting the least recently used files.
+Large CSV files are parsed on several processes (newline-aligned byte ranges, one per
+task) and stitched back together in file order.
+
+Usage:
+    python dataset_cache.py list
+    python dataset_cache.py warm generated_data.csv [--rows N]
+    python dataset_cache.py clear
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import mmap
+import multiprocessing
+import os
+import struct
+import sys
+import time
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from run_history import STATE_DIR
+
+CACHE_DIR = STATE_DIR / "cache"
+# Total snapshot size kept on disk; SORTBENCH_CACHE_MB=0 turns the cache off
+CACHE_LIMIT_BYTES = int(float(os.environ.get("SORTBENCH_CACHE_MB", 2048)) * 1024 * 1024)
+# Processes used to parse large CSV files; SORTBENCH_PARSE_WORKERS=1 keeps parsing serial
+PARSE_WORKERS = int(os.environ.get("SORTBENCH_PARSE_WORKERS", 0)) or os.cpu_count() or 1
+PARALLEL_MIN_BYTES = 32 * 1024 * 1024 # below this a serial parse beats starting the workers
+CHUNK_BYTES = 16 * 1024 * 1024 # upper bound on one worker task's byte range
+MAGIC = b"SBSNAP1\n"
+_HEADER_LEN = struct.Struct("<I")
+
+# ============================================================================
+# PARSERS (the uncached path, identical to what the tools always did)
+# ============================================================================
+
+def parse_csv(path, limit=None):
+    rows = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for i, row in enumerate(csv.DictReader(f)):
+            if limit and i >= limit: break
+            rows.append({k.replace('\ufeff', ''): v.strip() for k, v in row.items()})
+    return rows
+
+
+def parse_ints(path, limit=None):
+    with open(path, 'r') as f:
+        data = [int(line.strip()) for line in f if line.strip()]
+    return data[:limit] if limit else data
+
+# ============================================================================
+# PARALLEL CSV PARSER
+# ============================================================================
+
+def _csv_ranges(path, chunk_bytes):
+    """Header line and (start, end) byte ranges after it, each ending on a line boundary"""
+    with open(path, 'rb') as f:
+        header = f.readline()
+        size = os.fstat(f.fileno()).st_size
+        ranges, start = [], f.tell()
+        while start < size:
+            f.seek(min(start + chunk_bytes, size))
+            f.readline() # finish the line the boundary fell in
+            end = min(f.tell(), size)
+            ranges.append((start, end))
+            start = end
+    return header, ranges
+
+
+def _parse_range(path, start, end, width):
+    """
+    Parse one byte range into `width` columns, each a '\\0'-joined UTF-8 blob (one bytes
+    object per column pickles far faster than the strings themselves). Returns
+    (rows, blobs), or None when the range needs the full csv module: quotes can hide
+    newlines (so ranges may not split there) and rows of the wrong width or values
+    containing NUL must behave exactly as parse_csv does.
+    """
+    with open(path, 'rb') as f:
+        f.seek(start)
+        raw = f.read(end - start)
+    if b'"' in raw or b'\0' in raw:
+        return None
+    # '\r' is left on the last value and stripped with the rest; a bare '\r' line ending
+    # shows up as a wrong-width row and takes the csv module path
+    rows = [line.split(',') for line in raw.decode('utf-8').split('\n') if line]
+    if any(len(row) != width for row in rows):
+        return None
+    if not rows:
+        return 0, [b''] * width
+    return len(rows), ["\0".join([v.strip() for v in column]).encode('utf-8') for column in zip(*rows)]
+
+
+def _parsed_in_order(pool, path, ranges, width, window):
+    """_parse_range results in file order, with at most `window` ranges in flight (this
+    bounds memory and the work wasted past a row limit)"""
+    in_flight = deque()
+    for start, end in ranges:
+        in_flight.append(pool.submit(_parse_range, path, start, end, width))
+        if len(in_flight) >= window:
+            yield in_flight.popleft().result()
+    while in_flight:
+        yield in_flight.popleft().result()
+
+
+def _prefix_bytes(path, limit):
+    """Rough size of the first `limit` lines, from the average line length of the first 64 KB"""
+    with open(path, 'rb') as f:
+        sample = f.read(1 << 16)
+    return limit * len(sample) // max(1, sample.count(b'\n'))
+
+
+def parse_csv_parallel(path, limit=None, workers=None):
+    """
+    parse_csv spread over `workers` processes, same rows in the same order.
+
+    Small files, a single worker and files the fast path cannot split safely
+    (quoted fields, ragged rows) are parsed serially by parse_csv instead.
+    """
+    workers = workers or PARSE_WORKERS
+    size = os.path.getsize(path)
+    if limit:
+        size = min(size, _prefix_bytes(path, limit)) # the bytes that will actually be needed
+    if workers < 2 or size < PARALLEL_MIN_BYTES:
+        return parse_csv(path, limit)
+    # A few ranges per worker so one slow range does not leave the others idle
+    header, ranges = _csv_ranges(path, max(1 << 20, min(CHUNK_BYTES, size // (workers * 4) + 1)))
+    text = header.decode('utf-8').rstrip('\r\n')
+    if '"' in text or not text:
+        return parse_csv(path, limit)
+    names = [name.replace('\ufeff', '') for name in text.split(',')]
+    build = _row_builder(names)
+    rows = []
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+        for part in _parsed_in_order(pool, str(path), ranges, len(names), 2 * workers):
+            if part is None:
+                pool.shutdown(cancel_futures=True)
+                return parse_csv(path, limit)
+            count, blobs = part
+            if count:
+                rows.extend(build([str(blob, 'utf-8').split('\0') for blob in blobs]))
+            if limit and len(rows) >= limit:
+                pool.shutdown(cancel_futures=True) # the rest of the file is not needed
+                del rows[limit:]
+                break
+    return rows
+
+# ============================================================================
+# SNAPSHOT FILES
+# ============================================================================
+
+def _source_id(path):
+    return hashlib.blake2b(str(path).encode(), digest_size=8).hexdigest()
+
+
+def snapshot_path(path, kind, limit=None, directory=None):
+    """Snapshot file for the current version of `path`: <source>-<version>-<limit>.<kind>.snap"""
+    path = Path(path).resolve()
+    st = path.stat()
+    version = hashlib.blake2b(f"{st.st_mtime_ns}:{st.st_size}".encode(), digest_size=6).hexdigest()
+    directory = Path(directory) if directory else CACHE_DIR
+    return directory / f"{_source_id(path)}-{version}-{limit or 'all'}.{kind}.snap"
+
+
+def _align(n):
+    return (n + 7) & ~7
+
+
+def _write_snapshot(snap, header, sections):
+    """Atomically write the header and the 8-byte aligned sections; returns the file size"""
+    layout, offset = [], 0
+    for s in sections:
+        layout.append([offset, len(s)]) # relative to the first section
+        offset = _align(offset + len(s))
+    raw = json.dumps(dict(header, sections=layout)).encode()
+    base = _align(len(MAGIC) + _HEADER_LEN.size + len(raw))
+    snap.parent.mkdir(parents=True, exist_ok=True)
+    tmp = snap.with_name(f"{snap.name}.{os.getpid()}.tmp")
+    with open(tmp, 'wb') as f:
+        f.write(MAGIC)
+        f.write(_HEADER_LEN.pack(len(raw)))
+        f.write(raw)
+        for (start, _), s in zip(layout, sections):
+            f.write(b"\0" * (base + start - f.tell()))
+            f.write(s)
+        size = f.tell()
+    os.replace(tmp, snap) # Readers in other processes see either nothing or the whole file
+    return size
+
+
+def _read_header(mm):
+    if mm[:len(MAGIC)] != MAGIC:
+        raise ValueError("not a dataset snapshot")
+    (length,) = _HEADER_LEN.unpack_from(mm, len(MAGIC))
+    start = len(MAGIC) + _HEADER_LEN.size
+    header = json.loads(bytes(mm[start:start + length]))
+    base = _align(start + length)
+    header['sections'] = [(base + offset, size) for offset, size in header['sections']]
+    return header
+
+
+def _row_builder(names):
+    """Compile `columns -> [row dicts]` for these column names; a dict display per row
+    is about three times faster than dict(zip(names, values))"""
+    args = ", ".join(f"c{i}" for i in range(len(names)))
+    fields = ", ".join(f"{name!r}: c{i}" for i, name in enumerate(names))
+    return eval(f"lambda columns: [{{{fields}}} for {args}, in zip(*columns)]")
+
+
+def _read_snapshot(snap, limit):
+    with open(snap, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        header = _read_header(mm)
+        rows = header['rows'] if not limit else min(limit, header['rows'])
+        if header['kind'] == 'ints':
+            (start, length), = header['sections']
+            with memoryview(mm)[start:start + rows * 8] as view:
+                return view.cast('q').tolist()
+        columns = []
+        for start, length in header['sections']:
+            # Each column is one '\0'-joined UTF-8 blob: one decode and one split per column
+            text = str(mm[start:start + length], 'utf-8') if rows else ''
+            if rows < header['rows']:
+                columns.append(text.split('\0', rows)[:rows]) # stop splitting after the prefix
+            else:
+                columns.append(text.split('\0') if rows else [])
+        if not header['columns']:
+            return []
+        return _row_builder(header['columns'])(columns)
+
+
+def _store(snap, path, kind, limit, data):
+    header = {'kind': kind, 'source': str(path), 'limit': limit, 'rows': len(data),
+              'created': time.time()}
+    if kind == 'ints':
+        sections = [array('q', data).tobytes()]
+    else:
+        names = list(data[0]) if data else []
+        sections = []
+        for name in names:
+            blob = "\0".join([row[name] for row in data]).encode('utf-8')
+            if blob.count(b"\0") != len(data) - 1:
+                raise ValueError("values contain NUL characters")
+            sections.append(blob)
+        header['columns'] = names
+    return _write_snapshot(snap, header, sections)
+
+# ============================================================================
+# CACHE MAINTENANCE
+# ============================================================================
+
+def _remove_stale(snap):
+    """Delete snapshots of older versions of the same source file"""
+    source, version = snap.name.split('-')[:2]
+    for other in snap.parent.glob(f"{source}-*.snap"):
+        if other.name.split('-')[1] != version:
+            try:
+                other.unlink()
+            except OSError:
+                pass
+
+
+def evict(limit_bytes=CACHE_LIMIT_BYTES, directory=None, keep=None):
+    """Delete least recently used snapshots until the cache fits in `limit_bytes`"""
+    directory = Path(directory) if directory else CACHE_DIR
+    entries = []
+    for snap in directory.glob("*.snap"):
+        try:
+            st = snap.stat()
+        except OSError:
+            continue
+        entries.append((st.st_mtime, st.st_size, snap))
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, snap in sorted(entries, key=lambda e: e[0]):
+        if total <= limit_bytes:
+            break
+        if keep and snap == keep:
+            continue
+        try:
+            snap.unlink()
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+    return removed
+
+
+def cached_load(path, kind, limit=None, directory=None):
+    """
+    Load a dataset through the snapshot cache.
+
+    kind  -- 'csv' (list of row dicts) or 'ints' (list of ints)
+    limit -- keep only the first `limit` rows (None or 0 = all)
+
+    Returns (data, source) where source is 'cache' or 'parsed'.
+    """
+    parse = parse_ints if kind == 'ints' else parse_csv_parallel
+    if CACHE_LIMIT_BYTES <= 0:
+        return parse(path, limit), 'parsed'
+    path = Path(path).resolve()
+    candidates = [snapshot_path(path, kind, limit, directory)]
+    if limit:
+        candidates.append(snapshot_path(path, kind, None, directory)) # a full snapshot can serve any prefix
+    for snap in candidates:
+        try:
+            data = _read_snapshot(snap, limit)
+        except (OSError, ValueError):
+            continue
+        try:
+            os.utime(snap) # mtime doubles as the LRU timestamp
+        except OSError:
+            pass # evicted meanwhile, or a read-only cache: the data is already loaded
+        return data, 'cache'
+
+    data = parse(path, limit)
+    snap = candidates[0]
+    try:
+        _store(snap, path, kind, limit, data)
+        _remove_stale(snap)
+        evict(directory=directory, keep=snap)
+    except (OSError, ValueError, OverflowError) as e:
+        print(f"⚠️  Dataset cache not written: {e}", file=sys.stderr)
+    return data, 'parsed'
+
+
+def load_csv(path, limit=None):
+    return cached_load(path, 'csv', limit)
+
+
+def load_ints(path, limit=None):
+    return cached_load(path, 'ints', limit)
+
+# ============================================================================
+# COMMAND LINE
+# ============================================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect or manage the parsed-dataset cache")
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('list', help="show cached snapshots, most recently used first")
+    warm = sub.add_parser('warm', help="parse a dataset now so later loads hit the cache")
+    warm.add_argument('dataset')
+    warm.add_argument('--rows', type=int, default=None)
+    sub.add_parser('clear', help="delete every snapshot")
+    args = parser.parse_args(argv)
+
+    if args.command == 'warm':
+        kind = 'csv' if args.dataset.lower().endswith('.csv') else 'ints'
+        start = time.perf_counter()
+        data, source = cached_load(args.dataset, kind, args.rows)
+        print(f"{len(data):,} rows ({source}) in {time.perf_counter() - start:.2f}s")
+        return 0
+    snaps = sorted(CACHE_DIR.glob("*.snap"), key=lambda p: p.stat().st_mtime, reverse=True)
+    if args.command == 'clear':
+        for snap in snaps:
+            snap.unlink()
+        print(f"Removed {len(snaps)} snapshot(s) from {CACHE_DIR}")
+        return 0
+    total = 0
+    for snap in snaps:
+        with open(snap, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            header = _read_header(mm)
+        size = snap.stat().st_size
+        total += size
+        print(f"{header['kind']:<5} {header['rows']:>12,} rows {size / 1e6:>9.1f} MB  {header['source']}")
+    print(f"{len(snaps)} snapshot(s), {total / 1e6:.1f} MB of {CACHE_LIMIT_BYTES / 1e6:.0f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
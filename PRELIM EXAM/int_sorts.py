@@ -0,0 +1,338 @@
+"""
+INTEGER SORT ENGINES - shared by the PRELIM-LAB-WORK tools
+
+Each function sorts a list of integers in place in DESCENDING order and returns it
+(descending=False sorts ascending through the same code, see sort_order.py).
+The caller owns the copy, so timing harnesses can keep it outside the timed region.
+An optional progress(done, total) callback is called about 100 times per sort.
+Quick and merge sorts insertion-sort partitions up to `cutoff` elements; the defaults
+come from this machine's calibration (sort_tuning.py).
+"""
+
+from bisect import bisect_right
+from random import randrange
+
+from sort_order import ordered_ints
+from sort_tuning import cutoff_for
+
+# ============================================================================
+# SORTING ALGORITHMS
+# ============================================================================
+
+ALLOC_STATS = {'lists': 0} # Lists created by the merge sorts (read around a run for allocation counts)
+
+@ordered_ints
+def bubble_sort(arr, progress=None):
+    n = len(arr)
+    step = max(1, n // 100)
+    for i in range(n - 1):
+        if progress and i % step == 0:
+            progress(i, n)
+        swapped = False
+        for j in range(0, n - i - 1):
+            if arr[j] < arr[j + 1]:
+                arr[j], arr[j + 1] = arr[j + 1], arr[j]
+                swapped = True
+        if not swapped:
+            break
+    return arr
+
+@ordered_ints
+def selection_sort(arr, progress=None):
+    n = len(arr)
+    step = max(1, n // 100)
+    for i in range(n - 1):
+        if progress and i % step == 0:
+            progress(i, n)
+        max_idx = i
+        for j in range(i + 1, n):
+            if arr[j] > arr[max_idx]:
+                max_idx = j
+        if max_idx != i:
+            arr[i], arr[max_idx] = arr[max_idx], arr[i]
+    return arr
+
+@ordered_ints
+def insertion_sort(arr, progress=None):
+    n = len(arr)
+    step = max(1, n // 100)
+    for i in range(1, n):
+        if progress and i % step == 0:
+            progress(i, n)
+        key = arr[i]
+        j = i - 1
+        while j >= 0 and arr[j] < key:
+            arr[j + 1] = arr[j]
+            j -= 1
+        arr[j + 1] = key
+    return arr
+
+QUICK_CUTOFF = cutoff_for('ints', 'quick')
+
+@ordered_ints
+def quick_sort(arr, progress=None, cutoff=QUICK_CUTOFF):
+    n = len(arr)
+    step = max(1, n // 100)
+    placed = 0 # Elements already in their final position
+    reported = 0
+    stack = [(0, n - 1)]
+    while stack: # phase: stack
+        if progress and placed - reported >= step:
+            reported = placed
+            progress(placed, n)
+        low, high = stack.pop()
+        if high - low < cutoff: # phase: insertion
+            for i in range(low + 1, high + 1):
+                key = arr[i]
+                j = i - 1
+                while j >= low and arr[j] < key:
+                    arr[j + 1] = arr[j]
+                    j -= 1
+                arr[j + 1] = key
+            placed += max(0, high - low + 1)
+            continue
+        placed += 1 # the pivot
+        # Random pivot, moved to arr[high]: no input order (sorted, reversed, the lab's
+        # dataset.txt pattern) makes every partition lopsided, so it stays n log n
+        r = randrange(low, high + 1)
+        arr[r], arr[high] = arr[high], arr[r]
+        pivot = arr[high]
+        i = low - 1
+        for j in range(low, high): # phase: partition
+            if arr[j] > pivot:
+                i += 1
+                arr[i], arr[j] = arr[j], arr[i]
+        arr[i + 1], arr[high] = arr[high], arr[i + 1] # phase: partition
+        pi = i + 1
+        stack.append((low, pi - 1))
+        stack.append((pi + 1, high))
+    return arr
+
+MERGE_CUTOFF = cutoff_for('ints', 'merge')
+
+@ordered_ints
+def merge_sort(arr, progress=None, cutoff=MERGE_CUTOFF):
+    n = len(arr)
+    width = max(1, cutoff)
+    for lo in range(0, n, width): # phase: insertion
+        hi = min(lo + width, n)
+        for i in range(lo + 1, hi):
+            key = arr[i]
+            j = i - 1
+            while j >= lo and arr[j] < key:
+                arr[j + 1] = arr[j]
+                j -= 1
+            arr[j + 1] = key
+    passes, run = 0, width
+    while run < n:
+        passes += 1
+        run *= 2
+    done = 0
+    while width < n:
+        if progress:
+            progress(done, passes)
+        done += 1
+        ALLOC_STATS['lists'] += 2 * -(-n // (width * 2)) # the L and R slices of every merge in this pass
+        for i in range(0, n, width * 2):
+            left = i
+            mid = min(i + width, n)
+            right = min(i + width * 2, n)
+            L = arr[left:mid] # phase: copy
+            R = arr[mid:right] # phase: copy
+            l_idx = r_idx = 0
+            k = left
+            while l_idx < len(L) and r_idx < len(R): # phase: merge
+                if L[l_idx] >= R[r_idx]:
+                    arr[k] = L[l_idx]
+                    l_idx += 1
+                else:
+                    arr[k] = R[r_idx]
+                    r_idx += 1
+                k += 1
+            while l_idx < len(L): # phase: copy
+                arr[k] = L[l_idx]
+                l_idx += 1
+                k += 1
+            while r_idx < len(R): # phase: copy
+                arr[k] = R[r_idx]
+                r_idx += 1
+                k += 1
+        width *= 2
+    return arr
+
+INSERTION_CUTOFF = cutoff_for('ints', 'merge_buffered') # Runs up to this length are insertion-sorted before merging
+
+@ordered_ints
+def merge_sort_buffered(arr, cutoff=INSERTION_CUTOFF, progress=None):
+    """Bottom-up merge that ping-pongs between arr and ONE buffer allocated up front"""
+    n = len(arr)
+    if n <= 1:
+        return arr
+    run = max(1, cutoff)
+    for lo in range(0, n, run): # phase: insertion
+        hi = min(lo + run, n)
+        for i in range(lo + 1, hi):
+            key = arr[i]
+            j = i - 1
+            while j >= lo and arr[j] < key:
+                arr[j + 1] = arr[j]
+                j -= 1
+            arr[j + 1] = key
+    buf = [0] * n
+    ALLOC_STATS['lists'] += 1
+    passes, width = 0, run
+    while width < n:
+        passes += 1
+        width *= 2
+    # Start from the buffer on an odd pass count so the last pass lands in arr
+    if passes % 2:
+        for t in range(n): # phase: copy
+            buf[t] = arr[t]
+        src, dst = buf, arr
+    else:
+        src, dst = arr, buf
+    width = run
+    done = 0
+    while width < n: # phase: merge
+        if progress:
+            progress(done, passes)
+        done += 1
+        for lo in range(0, n, 2 * width):
+            mid = min(lo + width, n)
+            hi = min(lo + 2 * width, n)
+            i, j, k = lo, mid, lo
+            if mid < hi:
+                a, b = src[i], src[j]
+                while True:
+                    if a >= b:
+                        dst[k] = a
+                        i += 1
+                        k += 1
+                        if i == mid:
+                            break
+                        a = src[i]
+                    else:
+                        dst[k] = b
+                        j += 1
+                        k += 1
+                        if j == hi:
+                            break
+                        b = src[j]
+            while i < mid: # phase: copy
+                dst[k] = src[i]
+                i += 1
+                k += 1
+            while j < hi: # phase: copy
+                dst[k] = src[j]
+                j += 1
+                k += 1
+        src, dst = dst, src
+        width *= 2
+    return arr
+
+# ============================================================================
+# FAST QUADRATIC VARIANTS (same algorithms with the pure-Python overhead trimmed)
+# ============================================================================
+
+@ordered_ints
+def bubble_sort_fast(arr, progress=None):
+    """Cocktail shaker: values come from a slice of the pass (no indexing to read), the
+    moving item is carried in a local (one write per step) and each pass ends where the
+    previous one made its last swap"""
+    n = len(arr)
+    step = max(1, n // 200) # passes between progress reports
+    lo, hi = 0, n - 1
+    passes = 0
+    while lo < hi:
+        if progress and passes % step == 0:
+            progress(n - (hi - lo + 1), n)
+        passes += 1
+        # Forward: the smallest item of arr[lo..hi] sinks to hi (writes trail the reads,
+        # so the slice still matches arr where it is read)
+        x, last = arr[lo], lo
+        for j, y in enumerate(arr[lo + 1:hi + 1], lo):
+            if x < y:
+                arr[j] = y
+                last = j
+            else:
+                arr[j] = x
+                x = y
+        arr[hi] = x
+        hi = last
+        # Backward: the largest item of arr[lo..hi] rises to lo
+        x, last = arr[hi], hi
+        for j, y in zip(range(hi, lo, -1), reversed(arr[lo:hi])):
+            if y < x:
+                arr[j] = y
+                last = j
+            else:
+                arr[j] = x
+                x = y
+        arr[lo] = x
+        lo = last
+    return arr
+
+@ordered_ints
+def selection_sort_fast(arr, progress=None):
+    """One scan per pass finds both the largest and the smallest value, so each pass
+    places two items and the passes are halved; list.index (C) then finds where they are"""
+    n = len(arr)
+    step = max(1, n // 200)
+    lo, hi = 0, n - 1
+    while lo < hi:
+        if progress and lo % step == 0:
+            progress(2 * lo, n)
+        big = small = arr[lo]
+        for v in arr[lo + 1:hi + 1]:
+            if v > big:
+                big = v
+            elif v < small:
+                small = v
+        if big == small: # everything left is equal
+            break
+        big_at = arr.index(big, lo, hi + 1)
+        arr[big_at] = arr[lo]
+        arr[lo] = big
+        small_at = arr.index(small, lo + 1, hi + 1) # looked up after the move above
+        arr[small_at] = arr[hi]
+        arr[hi] = small
+        lo += 1
+        hi -= 1
+    return arr
+
+@ordered_ints
+def insertion_sort_fast(arr, progress=None):
+    """Binary insertion: bisect finds each item's slot and list.insert shifts the tail
+    with one C-level memmove instead of a Python loop"""
+    n = len(arr)
+    step = max(1, n // 100)
+    out = [] # ascending; reversed at the end (equal ints need no stable order)
+    ALLOC_STATS['lists'] += 1
+    insert = out.insert
+    for i, x in enumerate(arr):
+        if progress and i % step == 0:
+            progress(i, n)
+        insert(bisect_right(out, x), x)
+    out.reverse()
+    arr[:] = out
+    return arr
+
+# ============================================================================
+# REGISTRY
+# ============================================================================
+
+# (key, display name, menu description, function) - menus are built from this list
+ALGORITHMS = [
+    ("bubble", "Bubble Sort", "Simple comparison-based sorting", bubble_sort),
+    ("selection", "Selection Sort", "Finds minimum/maximum iteratively", selection_sort),
+    ("insertion", "Insertion Sort", "Builds sorted array one item at a time", insertion_sort),
+    ("quick", "Quick Sort", "Efficient divide-and-conquer algorithm", quick_sort),
+    ("merge", "Merge Sort", "Stable divide-and-conquer algorithm", merge_sort),
+    ("merge_buffered", "Merge (Buffered)", "One reusable buffer, insertion-sorted runs", merge_sort_buffered),
+    ("bubble_fast", "Bubble (fast)", "Cocktail shaker with local-variable loops", bubble_sort_fast),
+    ("selection_fast", "Selection (fast)", "Largest and smallest found in one scan", selection_sort_fast),
+    ("insertion_fast", "Insertion (fast)", "Binary search + C-level list insert", insertion_sort_fast),
+]
+
+BY_KEY = {key: (name, func) for key, name, _, func in ALGORITHMS}
+BASELINES = {'bubble_fast': 'bubble', 'selection_fast': 'selection', 'insertion_fast': 'insertion'} # variant -> original
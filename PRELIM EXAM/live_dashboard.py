@@ -0,0 +1,200 @@
+"""
+LIVE DASHBOARD - metrics panel that samples a running sort from the Tk main loop
+
+The sort thread only stores plain values (progress %, key-function calls); the
+panel reads them when the GUI polls, so sampling never touches the sort thread.
+Labels refresh at most every LABEL_INTERVAL seconds and the sparkline at most
+every CHART_INTERVAL seconds. When the run finishes, the chart is replaced by
+the run time next to previous runs of the same configuration.
+"""
+
+import os
+import sys
+import time
+import tkinter as tk
+import tracemalloc
+from collections import deque
+
+LABEL_INTERVAL = 0.25
+CHART_INTERVAL = 0.5
+CHART_POINTS = 120
+RATE_WINDOW = 1.0 # Rates are averaged over the last second (progress only moves in whole percents)
+
+
+def current_rss():
+    """Resident set size of this process in bytes (None when the platform offers no cheap way)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class Counters(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                        ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                        ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+        counters = Counters()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return counters.WorkingSetSize
+    return None
+
+
+def _rate(value):
+    if value is None:
+        return "—"
+    for unit, size in (("G", 1e9), ("M", 1e6), ("k", 1e3)):
+        if value >= size:
+            return f"{value / size:.1f}{unit}/s"
+    return f"{value:.0f}/s"
+
+
+def _duration(seconds):
+    if seconds is None:
+        return "—"
+    if seconds >= 60:
+        return f"{int(seconds // 60)}m {seconds % 60:04.1f}s"
+    return f"{seconds:.1f}s"
+
+
+class LiveDashboard:
+    FIELDS = [("elements", "Elements/s"), ("key_calls", "Key calls/s"), ("rss", "RSS"),
+              ("traced", "Traced (tracemalloc)"), ("elapsed", "Elapsed"), ("remaining", "Remaining")]
+
+    def __init__(self, parent, bg='white'):
+        self.frame = tk.LabelFrame(parent, text=" Live Metrics ", bg=bg, font=('Arial', 9, 'bold'))
+        self.values = {}
+        for col, (key, title) in enumerate(self.FIELDS):
+            tk.Label(self.frame, text=title, bg=bg, fg='#7f8c8d', font=('Arial', 8)).grid(row=0, column=col, padx=6)
+            self.values[key] = tk.Label(self.frame, text="—", bg=bg, font=('Consolas', 10, 'bold'))
+            self.values[key].grid(row=1, column=col, padx=6)
+            self.frame.columnconfigure(col, weight=1)
+        self.chart = tk.Canvas(self.frame, height=70, bg='#1e1e1e', highlightthickness=0)
+        self.chart.grid(row=2, column=0, columnspan=len(self.FIELDS), sticky='ew', padx=6, pady=(4, 6))
+        self.caption = tk.Label(self.frame, text="Elements/s over time", bg=bg, fg='#7f8c8d', font=('Arial', 8))
+        self.caption.grid(row=3, column=0, columnspan=len(self.FIELDS), sticky='w', padx=6)
+        self._line = None
+        self.active = False
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+
+    # -- live sampling --------------------------------------------------------
+
+    def start(self, items, runs):
+        """A new measurement of `runs` sorts over `items` elements is starting"""
+        self.items = items
+        self.runs = runs
+        self.started = time.perf_counter()
+        self.points = deque(maxlen=CHART_POINTS)
+        self._window = deque() # (time, progress, key calls) samples of the current run
+        self._run = None
+        self._next_label = self._next_chart = 0.0
+        self.chart.delete('all')
+        self._line = None
+        self.caption.config(text="Elements/s over time")
+        self.active = True
+
+    def sample(self, progress, live):
+        """Called from the GUI's progress poll with the sort thread's latest progress (%) and
+        its shared dict {'key_calls': n or None, 'run': index, 'run_started': perf_counter,
+        optionally 'progress_start': % already done when a resumed sort began}"""
+        if not self.active:
+            return
+        now = time.perf_counter()
+        calls, run = live.get('key_calls'), live.get('run', 0)
+        if run != self._run:
+            self._run = run
+            self._window.clear()
+        self._window.append((now, progress, calls))
+        while len(self._window) > 2 and now - self._window[0][0] > RATE_WINDOW:
+            self._window.popleft()
+        then, old_progress, old_calls = self._window[0]
+        dt = now - then
+        if dt <= 0:
+            return # First sample of a run: no interval to measure yet
+        elements = max(0, progress - old_progress) / 100 * self.items / dt
+        key_calls = (calls - old_calls) / dt if calls is not None and old_calls is not None else None
+        self.points.append(elements)
+        if now >= self._next_label:
+            self._next_label = now + LABEL_INTERVAL
+            self._update_labels(now, progress, live, elements, key_calls)
+        if now >= self._next_chart:
+            self._next_chart = now + CHART_INTERVAL
+            self._draw_sparkline()
+
+    def _update_labels(self, now, progress, live, elements, key_calls):
+        rss = current_rss()
+        traced = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+        run_elapsed = now - live.get('run_started', self.started)
+        remaining = None
+        done = progress - live.get('progress_start', 0) # Resumed sorts start part of the way in
+        if done > 0:
+            run_left = run_elapsed * (100 - progress) / done
+            run_total = run_elapsed * 100 / done
+            remaining = run_left + run_total * max(0, self.runs - live.get('run', 0) - 1)
+        self.values['elements'].config(text=_rate(elements))
+        # Key-function calls, not comparisons: the fast engines call it once per row up front
+        self.values['key_calls'].config(text=_rate(key_calls) if key_calls is not None else "warmup only")
+        self.values['rss'].config(text=f"{rss / 1e6:.0f} MB" if rss else "—")
+        self.values['traced'].config(text=f"{traced / 1e6:.1f} MB" if traced is not None else "off")
+        self.values['elapsed'].config(text=_duration(now - self.started))
+        self.values['remaining'].config(text=_duration(remaining))
+
+    def _draw_sparkline(self):
+        width = max(self.chart.winfo_width(), 2 * CHART_POINTS)
+        height = int(self.chart['height'])
+        top = max(self.points) or 1.0
+        step = width / (CHART_POINTS - 1)
+        coords = []
+        for i, value in enumerate(self.points):
+            coords += [i * step, height - 4 - (height - 8) * value / top]
+        if len(coords) < 4:
+            return
+        if self._line is None:
+            self._line = self.chart.create_line(*coords, fill='#2ecc71', width=2)
+        else:
+            self.chart.coords(self._line, *coords) # Move the existing line instead of redrawing
+        self.caption.config(text=f"Elements/s over time (peak {_rate(top)})")
+
+    # -- end of run -----------------------------------------------------------
+
+    def stop(self):
+        self.active = False
+
+    def finish(self, seconds, previous):
+        """Replace the sparkline with this run's time against earlier runs (oldest first)"""
+        import statistics
+        self.active = False
+        self.values['remaining'].config(text="0.0s")
+        self.chart.delete('all')
+        self._line = None
+        times = list(previous) + [seconds]
+        width = max(self.chart.winfo_width(), 200)
+        height = int(self.chart['height'])
+        top = max(times) or 1.0
+        slot = width / max(len(times), 1)
+        bar = min(slot * 0.6, 40)
+        baseline = statistics.median(previous) if previous else None
+        for i, value in enumerate(times):
+            x = slot * i + (slot - bar) / 2
+            y = height - 4 - (height - 12) * value / top
+            current = i == len(times) - 1
+            colour = '#7f8c8d'
+            if current:
+                colour = '#e74c3c' if baseline and value > baseline * 1.15 else '#2ecc71'
+            self.chart.create_rectangle(x, y, x + bar, height - 4, fill=colour, outline='')
+        if baseline:
+            y = height - 4 - (height - 12) * baseline / top
+            self.chart.create_line(0, y, width, y, fill='#f1c40f', dash=(4, 2))
+            change = (seconds - baseline) / baseline
+            self.caption.config(text=f"This run {seconds:.4f}s vs median {baseline:.4f}s of "
+                                     f"{len(previous)} previous run(s) ({change:+.1%}, dashed line)")
+        else:
+            self.caption.config(text=f"This run {seconds:.4f}s (first run of this configuration)")
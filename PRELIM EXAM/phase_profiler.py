@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+PHASE PROFILER - sampling profiler that splits a sort's time into named phases
+
+A background thread samples the sorting thread's stack every few hundred microseconds
+(sys._current_frames, so GUI worker threads work too and the sort code runs unchanged).
+Each sample is attributed to a phase from `# phase: name` comments in the sort source:
+
+    def merge(left, right): # phase: merge          -> the whole function
+    while i < mid: # phase: copy                    -> the loop and its body
+    return lambda r: r[column].lower() # phase: key_extract   -> that line
+
+The innermost frame on a tagged line decides the phase; anything else is 'other'.
+Every profiled run writes a folded-stack file ('frame;frame;[phase] count' per line)
+to ~/.sortbench/profiles, which flamegraph.pl, speedscope and inferno read directly.
+
+Usage:
+    python phase_profiler.py ~/.sortbench/profiles/console-Merge-LastName-20240101-120000.folded
+"""
+
+import argparse
+import dis
+import linecache
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+from run_history import STATE_DIR
+
+PROFILE_DIR = STATE_DIR / "profiles"
+INTERVAL = 0.0005 # seconds between samples
+_TAG = re.compile(r"#\s*phase:\s*([\w-]+)")
+_line_phases = {} # filename -> {line number: phase}
+_entries = {} # code object -> offset of its RESUME instruction
+
+# ============================================================================
+# PHASE TAGS
+# ============================================================================
+
+def phases_for(filename):
+    """Line -> phase table of a source file, built from its `# phase:` comments once"""
+    table = _line_phases.get(filename)
+    if table is not None:
+        return table
+    table = {}
+    blocks = [] # (indent, phase) of the tagged blocks enclosing the current line
+    for lineno, line in enumerate(linecache.getlines(filename), 1):
+        stripped = line.strip()
+        if not stripped or stripped.startswith('#'):
+            continue
+        indent = len(line) - len(line.lstrip())
+        while blocks and indent <= blocks[-1][0]:
+            blocks.pop()
+        match = _TAG.search(line)
+        if match:
+            table[lineno] = match.group(1)
+            if line[:match.start()].rstrip().endswith(':'): # def/for/while header: tags the body
+                blocks.append((indent, match.group(1)))
+        elif blocks:
+            table[lineno] = blocks[-1][1]
+    _line_phases[filename] = table
+    return table
+
+# ============================================================================
+# SAMPLER
+# ============================================================================
+
+def _entry_offset(code):
+    offset = _entries.get(code)
+    if offset is None:
+        offset = next((i.offset for i in dis.get_instructions(code) if i.opname == 'RESUME'), -1)
+        _entries[code] = offset
+    return offset
+
+
+def _line_of(frame):
+    """Current line; 3.11+ leaves it None on some jumps, which belong to the line before"""
+    lineno = frame.f_lineno
+    if lineno is None:
+        for start, end, line in frame.f_code.co_lines():
+            if line is not None:
+                lineno = line
+            if start <= frame.f_lasti < end:
+                break
+    return lineno
+
+
+class PhaseProfiler:
+    def __init__(self, interval=INTERVAL):
+        self.interval = interval
+        self.stacks = Counter() # folded stack -> samples
+        self.phases = Counter() # phase -> samples
+        self.seconds = 0.0
+        self._root = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def samples(self):
+        return sum(self.phases.values())
+
+    def start(self, thread_id=None, root=None):
+        """Sample `thread_id` (default: the calling thread); frames from `root` up are left out"""
+        self._target = thread_id or threading.get_ident()
+        self._root = root
+        self._switch = sys.getswitchinterval()
+        # The sampler needs the GIL to take a sample, so hand it over as often as we sample
+        sys.setswitchinterval(min(self._switch, self.interval))
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.seconds = time.perf_counter() - self._started
+        self._stop.set()
+        self._thread.join()
+        sys.setswitchinterval(self._switch)
+
+    def _run(self):
+        current_frames = sys._current_frames
+        while not self._stop.wait(self.interval):
+            frame = current_frames().get(self._target)
+            if frame is not None:
+                self._sample(frame)
+
+    def _sample(self, frame):
+        # A thread only lets go of the GIL at checkpoints such as function entry. A frame
+        # still on its entry instruction has run nothing yet, so the time since the last
+        # checkpoint was spent in its caller: charge the sample there.
+        if frame.f_back is not None and frame.f_lasti <= _entry_offset(frame.f_code):
+            frame = frame.f_back
+        names, phase = [], None
+        while frame is not None and frame is not self._root:
+            code = frame.f_code
+            if phase is None:
+                phase = phases_for(code.co_filename).get(_line_of(frame))
+            names.append(code.co_name)
+            frame = frame.f_back
+        phase = phase or 'other'
+        names.reverse()
+        names.append(f"[{phase}]")
+        self.stacks[";".join(names)] += 1
+        self.phases[phase] += 1
+
+    # -- output ---------------------------------------------------------------
+
+    def summary(self):
+        """One line, largest phase first: 'merge 48% | key_extract 35% | ... (2,310 samples)'"""
+        total = self.samples or 1
+        parts = [f"{phase} {count / total:.0%}" for phase, count in self.phases.most_common()]
+        return " | ".join(parts) + f" ({self.samples:,} samples over {self.seconds:.2f}s)"
+
+    def write(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        return path
+
+    def save(self, tool, *labels):
+        """Write the folded stacks to PROFILE_DIR/<tool>-<labels>-<timestamp>.folded"""
+        name = "-".join([tool, *(re.sub(r"[^\w]+", "_", str(l)) for l in labels), time.strftime("%Y%m%d-%H%M%S")])
+        return self.write(PROFILE_DIR / f"{name}.folded")
+
+
+def profile_call(func, *args, interval=INTERVAL, **kwargs):
+    """Run func(*args, **kwargs) under the profiler; returns (result, profiler)"""
+    profiler = PhaseProfiler(interval)
+    profiler.start(root=sys._getframe())
+    try:
+        result = func(*args, **kwargs)
+    finally:
+        profiler.stop()
+    return result, profiler
+
+# ============================================================================
+# REPORTS
+# ============================================================================
+
+def read_folded(path):
+    """Phase -> samples of a saved folded-stack file"""
+    phases = Counter()
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            stack, _, count = line.rstrip().rpartition(' ')
+            leaf = stack.rsplit(';', 1)[-1]
+            phases[leaf[1:-1] if leaf.startswith('[') else 'other'] += int(count)
+    return phases
+
+
+def format_phases(phases, seconds=None):
+    total = sum(phases.values()) or 1
+    lines = [f"{'PHASE':<14}{'SAMPLES':>10}{'SHARE':>9}" + (f"{'~TIME':>11}" if seconds else "")]
+    for phase, count in phases.most_common():
+        line = f"{phase:<14}{count:>10,}{count / total:>9.1%}"
+        if seconds:
+            line += f"{seconds * count / total:>10.3f}s"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Phase breakdown of a saved sort profile")
+    parser.add_argument('profile', nargs='?', help="a .folded file (default: the most recent one)")
+    args = parser.parse_args(argv)
+    path = args.profile
+    if path is None:
+        saved = sorted(PROFILE_DIR.glob("*.folded"), key=lambda p: p.stat().st_mtime)
+        if not saved:
+            print(f"No profiles in {PROFILE_DIR}")
+            return 1
+        path = saved[-1]
+    print(path)
+    print(format_phases(read_folded(path)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,275 @@
+"""
+ROW SORT ENGINES - shared by benchmarkconsolev2.py, benchmarkguiv2.py and the CSV tools
+
+Each function sorts a list of CSV rows (dicts) by key_func, ascending and stable, and
+returns the sorted list (descending=True reverses around the same code, see
+sort_order.py). copy=False sorts the caller's list in place, so timing harnesses can
+keep the copy outside the timed region.
+
+The tools plug in through two hooks, the same for every engine:
+  progress(done, total)  called about 100 times per sort (terminal bar, GUI store, job stream)
+  stop_event             when set, the sort stops at its next safe point and returns None;
+                         Bubble and Insertion first save a checkpoint (see sort_checkpoint.py)
+Merge sorts insertion-sort partitions up to `cutoff` rows; the defaults come from this
+machine's calibration (sort_tuning.py).
+"""
+
+from bisect import bisect_right
+from functools import lru_cache
+
+from sort_order import ordered_keys
+from sort_tuning import cutoff_for
+
+# ============================================================================
+# SORTING ALGORITHMS
+# ============================================================================
+
+ALLOC_STATS = {'lists': 0} # Lists created by the merge sorts (read around a run for allocation counts)
+
+
+class _Stopped(Exception):
+    """Unwinds a recursive sort when stop_event is set"""
+
+
+@ordered_keys
+def bubble_sort(data, key_func, progress=None, stop_event=None, copy=True, checkpointer=None, start=0):
+    """Resumable: when stop_event is set it checkpoints at the next pass boundary and returns None"""
+    arr = data.copy() if copy else data
+    n = len(arr)
+    step = max(1, n // 100)
+    if checkpointer: checkpointer.begin()
+    for i in range(start, n):
+        if stop_event is not None and stop_event.is_set():
+            if checkpointer: checkpointer.save(arr, i)
+            return None
+        if checkpointer: checkpointer.tick(arr, i)
+        if progress and i % step == 0:
+            progress(i, n)
+        swapped = False
+        for j in range(0, n - i - 1):
+            if key_func(arr[j]) > key_func(arr[j + 1]):
+                arr[j], arr[j + 1] = arr[j + 1], arr[j]
+                swapped = True
+        if not swapped:
+            break
+    if progress and n:
+        progress(n, n)
+    return arr
+
+@ordered_keys
+def insertion_sort(data, key_func, progress=None, stop_event=None, copy=True, checkpointer=None, start=1):
+    """Resumable: arr[:i] is sorted at every outer boundary, so (arr, i) is a complete checkpoint"""
+    arr = data.copy() if copy else data
+    n = len(arr)
+    step = max(1, n // 100)
+    if checkpointer: checkpointer.begin()
+    for i in range(max(1, start), n):
+        if stop_event is not None and stop_event.is_set():
+            if checkpointer: checkpointer.save(arr, i)
+            return None
+        if checkpointer: checkpointer.tick(arr, i)
+        if progress and i % step == 0:
+            progress(i, n)
+        key_item = arr[i]
+        key_value = key_func(key_item)
+        j = i - 1
+        while j >= 0 and key_func(arr[j]) > key_value:
+            arr[j + 1] = arr[j]
+            j -= 1
+        arr[j + 1] = key_item
+    if progress and n:
+        progress(n, n)
+    return arr
+
+def binary_insertion_sort(items, key_func): # phase: insertion
+    """Stable sort of a short list: one key call per item and C-level inserts, returns a new list (2 lists)"""
+    keys, result = [], []
+    for item in items:
+        item_key = key_func(item)
+        pos = bisect_right(keys, item_key) # after equal keys (stable)
+        keys.insert(pos, item_key)
+        result.insert(pos, item)
+    return result
+
+MERGE_CUTOFF = cutoff_for('rows', 'merge') # Partitions up to this length are binary-insertion-sorted
+
+@lru_cache(maxsize=256)
+def merge_sort_lists(n, cutoff):
+    """Lists merge_sort creates for n rows: 2 slices and 3 merge lists per split, 2 per leaf"""
+    if n <= 1: return 0
+    if n <= cutoff: return 2
+    return 5 + merge_sort_lists(n // 2, cutoff) + merge_sort_lists(n - n // 2, cutoff)
+
+@ordered_keys
+def merge_sort(data, key_func, progress=None, stop_event=None, copy=True, cutoff=MERGE_CUTOFF):
+    arr = data.copy() if copy else data
+    n = len(arr)
+    if n <= 1: return arr
+    sorted_rows, step = 0, max(1, n // 100) # rows in finished leaf partitions, for progress
+    def merge(left, right): # phase: merge
+        result = []
+        i = j = 0
+        while i < len(left) and j < len(right):
+            if key_func(left[i]) <= key_func(right[j]):
+                result.append(left[i]); i += 1
+            else:
+                result.append(right[j]); j += 1
+        result.extend(left[i:]); result.extend(right[j:]) # phase: copy
+        return result
+    def msort(a): # phase: partition
+        nonlocal sorted_rows
+        if stop_event is not None and stop_event.is_set():
+            raise _Stopped
+        if len(a) <= 1: return a
+        if len(a) <= cutoff:
+            a = binary_insertion_sort(a, key_func)
+            if progress:
+                before, sorted_rows = sorted_rows, sorted_rows + len(a)
+                if sorted_rows // step != before // step:
+                    progress(sorted_rows, n)
+            return a
+        mid = len(a) // 2
+        return merge(msort(a[:mid]), msort(a[mid:])) # phase: copy
+    try:
+        result = msort(arr)
+    except _Stopped:
+        return None
+    ALLOC_STATS['lists'] += merge_sort_lists(n, cutoff) # counted once, not in every merge
+    if progress and n:
+        progress(n, n)
+    return result
+
+INSERTION_CUTOFF = cutoff_for('rows', 'merge_buffered') # Runs up to this length are binary-insertion-sorted before merging
+
+@ordered_keys
+def merge_sort_buffered(data, key_func, progress=None, stop_event=None, copy=True, cutoff=INSERTION_CUTOFF):
+    """Bottom-up merge sort that ping-pongs between the list and ONE buffer allocated up front"""
+    arr = data.copy() if copy else data
+    n = len(arr)
+    if n <= 1: return arr
+    run = max(1, cutoff)
+    if run > 1:
+        for lo in range(0, n, run):
+            arr[lo:lo + run] = binary_insertion_sort(arr[lo:lo + run], key_func)
+    buf = [None] * n
+    ALLOC_STATS['lists'] += 1 + (2 * -(-n // run) if run > 1 else 0) # the buffer + 2 per insertion-sorted run
+    passes, width = 0, run
+    while width < n:
+        passes += 1
+        width *= 2
+    # Start from the buffer on an odd pass count so the last pass lands in arr
+    if passes % 2:
+        for t in range(n): buf[t] = arr[t] # phase: copy
+        src, dst = buf, arr
+    else:
+        src, dst = arr, buf
+    width = run
+    done = 0
+    while width < n: # phase: merge
+        if stop_event is not None and stop_event.is_set():
+            return None
+        for lo in range(0, n, 2 * width):
+            mid = min(lo + width, n)
+            hi = min(lo + 2 * width, n)
+            i, j, k = lo, mid, lo
+            if mid < hi:
+                ki, kj = key_func(src[i]), key_func(src[j])
+                while True:
+                    if kj < ki: # Strict: equal keys take the left item (stable)
+                        dst[k] = src[j]; j += 1; k += 1
+                        if j == hi: break
+                        kj = key_func(src[j])
+                    else:
+                        dst[k] = src[i]; i += 1; k += 1
+                        if i == mid: break
+                        ki = key_func(src[i])
+            while i < mid: # phase: copy
+                dst[k] = src[i]; i += 1; k += 1
+            while j < hi: # phase: copy
+                dst[k] = src[j]; j += 1; k += 1
+        src, dst = dst, src
+        width *= 2
+        done += 1
+        if progress:
+            progress(done, passes)
+    return arr
+
+@ordered_keys
+def bubble_sort_fast(data, key_func, progress=None, stop_event=None, copy=True):
+    """Cocktail shaker over precomputed keys: one key call per row, the moving row carried
+    in locals, passes shrunk to the last swap. Strict comparisons keep it stable."""
+    arr = data.copy() if copy else data
+    n = len(arr)
+    keys = [key_func(r) for r in arr]
+    ALLOC_STATS['lists'] += 1
+    lo, hi = 0, n - 1
+    step, passes = max(1, n // 200), 0
+    while lo < hi:
+        if stop_event is not None and stop_event.is_set():
+            return None
+        if progress and passes % step == 0:
+            progress(n - (hi - lo + 1), n)
+        passes += 1
+        # Forward: the largest key of [lo, hi] moves to hi; writes trail the reads
+        x, xk, last = arr[lo], keys[lo], lo
+        for j, yk in enumerate(keys[lo + 1:hi + 1], lo):
+            if yk < xk:
+                keys[j] = yk; arr[j] = arr[j + 1]; last = j
+            else:
+                keys[j] = xk; arr[j] = x; xk = yk; x = arr[j + 1]
+        keys[hi] = xk; arr[hi] = x
+        hi = last
+        # Backward: the smallest key of [lo, hi] moves to lo
+        x, xk, last = arr[hi], keys[hi], hi
+        for j, yk in zip(range(hi, lo, -1), reversed(keys[lo:hi])):
+            if xk < yk:
+                keys[j] = yk; arr[j] = arr[j - 1]; last = j
+            else:
+                keys[j] = xk; arr[j] = x; xk = yk; x = arr[j - 1]
+        keys[lo] = xk; arr[lo] = x
+        lo = last
+    if progress and n:
+        progress(n, n)
+    return arr
+
+@ordered_keys
+def insertion_sort_fast(data, key_func, progress=None, stop_event=None, copy=True):
+    """Binary insertion: one key call per row, bisect for the slot, list.insert (C memmove)
+    to shift; bisect_right puts equal keys after the earlier rows, so it is stable"""
+    arr = data.copy() if copy else data
+    n = len(arr)
+    keys, result = [], []
+    ALLOC_STATS['lists'] += 2
+    step = max(1, n // 100)
+    for i, item in enumerate(arr):
+        if i % step == 0:
+            if stop_event is not None and stop_event.is_set():
+                return None
+            if progress:
+                progress(i, n)
+        item_key = key_func(item)
+        pos = bisect_right(keys, item_key)
+        keys.insert(pos, item_key)
+        result.insert(pos, item)
+    arr[:] = result
+    if progress and n:
+        progress(n, n)
+    return arr
+
+# ============================================================================
+# REGISTRY
+# ============================================================================
+
+# (key, display name, function) - the console numbers its menu 1-6 in this order
+ALGORITHMS = [
+    ("bubble", "Bubble", bubble_sort),
+    ("insertion", "Insertion", insertion_sort),
+    ("merge", "Merge", merge_sort),
+    ("merge_buffered", "MergeBuffered", merge_sort_buffered),
+    ("bubble_fast", "BubbleFast", bubble_sort_fast),
+    ("insertion_fast", "InsertionFast", insertion_sort_fast),
+]
+
+BY_KEY = {key: (name, func) for key, name, func in ALGORITHMS}
+RESUMABLE = {'bubble', 'insertion'} # Stopping these saves a checkpoint that can be resumed
+BASELINES = {'bubble_fast': 'bubble', 'insertion_fast': 'insertion'} # fast variant -> the original it speeds up
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+BENCHMARK RUN HISTORY - persistent SQLite store with regression detection
+
+Every sort run by the benchmark tools is appended to a local SQLite file
+together with the dataset fingerprint, timings, op counts and host info.
+
+Usage:
+    python run_history.py report [--db PATH] [--window 5] [--threshold 0.15]
+    python run_history.py list   [--db PATH] [--limit 20]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# ============================================================================
+# STORAGE
+# ============================================================================
+
+STATE_DIR = Path(os.environ.get("SORTBENCH_HOME", Path.home() / ".sortbench"))
+DEFAULT_DB = STATE_DIR / "history.db"
+
+# (name, type) - new columns are appended here and added to old files on open
+COLUMNS = [
+    ("created", "TEXT NOT NULL"),
+    ("tool", "TEXT NOT NULL"),
+    ("dataset", "TEXT"),
+    ("fingerprint", "TEXT NOT NULL"),
+    ("size", "INTEGER NOT NULL"),
+    ("algorithm", "TEXT NOT NULL"),
+    ("sort_column", "TEXT"),
+    ("seconds", "REAL NOT NULL"),
+    ("timings", "TEXT"),
+    ("key_calls", "INTEGER"),
+    ("peak_bytes", "INTEGER"),
+    ("python_version", "TEXT"),
+    ("python_impl", "TEXT"),
+    ("host", "TEXT"),
+    ("platform", "TEXT"),
+    ("cpu_count", "INTEGER"),
+    ("predicted_seconds", "REAL"),
+    ("predicted_bytes", "INTEGER"),
+]
+
+_fingerprints = {}
+
+
+def dataset_fingerprint(path):
+    """Content hash of a dataset file (memoised on path, size and mtime)"""
+    path = Path(path).resolve()
+    st = path.stat()
+    memo_key = (str(path), st.st_size, st.st_mtime_ns)
+    if memo_key not in _fingerprints:
+        h = hashlib.blake2b(digest_size=16)
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                h.update(chunk)
+        _fingerprints[memo_key] = h.hexdigest()
+    return _fingerprints[memo_key]
+
+
+def host_info():
+    """Interpreter and machine details stored alongside every run"""
+    return {
+        'python_version': platform.python_version(),
+        'python_impl': platform.python_implementation(),
+        'host': platform.node(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+class RunHistory:
+    def __init__(self, db_path=None):
+        self.db_path = Path(db_path) if db_path else DEFAULT_DB
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self._ensure_schema()
+
+    def _ensure_schema(self):
+        cols = ", ".join(f"{name} {kind}" for name, kind in COLUMNS)
+        with self.conn:
+            self.conn.execute(f"CREATE TABLE IF NOT EXISTS runs (id INTEGER PRIMARY KEY AUTOINCREMENT, {cols})")
+            existing = {r['name'] for r in self.conn.execute("PRAGMA table_info(runs)")}
+            for name, kind in COLUMNS:
+                if name not in existing:
+                    # ALTER TABLE cannot add NOT NULL columns without a default
+                    self.conn.execute(f"ALTER TABLE runs ADD COLUMN {name} {kind.replace(' NOT NULL', '')}")
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS runs_config ON runs (fingerprint, size, algorithm, sort_column, tool)")
+
+    def record(self, tool, dataset, size, algorithm, seconds, column=None, timings=None, key_calls=None, **extra):
+        """Append one run; returns the new row id"""
+        row = {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'tool': tool,
+            'dataset': str(dataset) if dataset else None,
+            'fingerprint': dataset_fingerprint(dataset) if dataset else 'in-memory',
+            'size': size,
+            'algorithm': algorithm,
+            'sort_column': column,
+            'seconds': seconds,
+            'timings': json.dumps(timings if timings is not None else [seconds]),
+            'key_calls': key_calls,
+        }
+        row.update(host_info())
+        row.update(extra)
+        names = ", ".join(row)
+        marks = ", ".join("?" for _ in row)
+        with self.conn:
+            cur = self.conn.execute(f"INSERT INTO runs ({names}) VALUES ({marks})", list(row.values()))
+        return cur.lastrowid
+
+    def recent(self, limit=20):
+        return self.conn.execute("SELECT * FROM runs ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+
+    def configs(self):
+        """Distinct (fingerprint, size, algorithm, column, tool) configurations"""
+        return self.conn.execute(
+            "SELECT DISTINCT fingerprint, size, algorithm, sort_column, tool FROM runs").fetchall()
+
+    def runs_by_tools(self, tools=None, min_size=0, limit=2000):
+        """Newest runs of some tools (None = all) with at least min_size elements"""
+        sql = "SELECT * FROM runs WHERE size >= ?"
+        params = [min_size]
+        if tools:
+            sql += f" AND tool IN ({', '.join('?' for _ in tools)})"
+            params.extend(tools)
+        return self.conn.execute(sql + " ORDER BY id DESC LIMIT ?", params + [limit]).fetchall()
+
+    def runs_for(self, fingerprint, size, algorithm, column, tool, limit=None):
+        """Runs of one configuration, newest first"""
+        sql = ("SELECT * FROM runs WHERE fingerprint = ? AND size = ? AND algorithm = ? "
+               "AND sort_column IS ? AND tool = ? ORDER BY id DESC")
+        params = [fingerprint, size, algorithm, column, tool]
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self.conn.execute(sql, params).fetchall()
+
+    def close(self):
+        self.conn.close()
+
+# ============================================================================
+# REGRESSION DETECTION
+# ============================================================================
+
+def regression_report(history, window=5, threshold=0.15):
+    """Compare each configuration's latest run with the median of the previous `window` runs"""
+    findings = []
+    for cfg in history.configs():
+        runs = history.runs_for(*cfg, limit=window + 1)
+        if len(runs) < 2:
+            continue
+        latest, previous = runs[0], runs[1:]
+        baseline = statistics.median(r['seconds'] for r in previous)
+        change = (latest['seconds'] - baseline) / baseline if baseline > 0 else 0.0
+        findings.append({
+            'tool': cfg['tool'],
+            'algorithm': cfg['algorithm'],
+            'column': cfg['sort_column'],
+            'size': cfg['size'],
+            'fingerprint': cfg['fingerprint'],
+            'latest': latest['seconds'],
+            'baseline': baseline,
+            'change': change,
+            'runs': len(previous),
+            'regressed': change > threshold,
+            'python_changed': latest['python_version'] != previous[0]['python_version'],
+            'python_version': latest['python_version'],
+        })
+    findings.sort(key=lambda f: f['change'], reverse=True)
+    return findings
+
+
+def format_report(findings, threshold=0.15):
+    lines = [f"{'':2}{'TOOL':<10}{'ALGORITHM':<12}{'COLUMN':<11}{'ROWS':>10}{'BASELINE':>12}{'LATEST':>12}{'CHANGE':>9}"]
+    lines.append("-" * 78)
+    if not findings:
+        lines.append("Not enough runs yet (need at least two per configuration).")
+    for f in findings:
+        flag = "!!" if f['regressed'] else "  "
+        note = f"  (python -> {f['python_version']})" if f['python_changed'] else ""
+        lines.append(f"{flag}{f['tool']:<10}{f['algorithm']:<12}{str(f['column'] or '-'):<11}{f['size']:>10,}"
+                     f"{f['baseline']:>11.4f}s{f['latest']:>11.4f}s{f['change']:>+8.1%}{note}")
+    regressions = sum(f['regressed'] for f in findings)
+    lines.append("-" * 78)
+    lines.append(f"{regressions} regression(s) beyond +{threshold:.0%} against the rolling baseline.")
+    return "\n".join(lines)
+
+# ============================================================================
+# COMMAND LINE
+# ============================================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query the benchmark run history")
+    parser.add_argument('--db', default=None, help=f"history file (default: {DEFAULT_DB})")
+    # --db is accepted after the command too; SUPPRESS keeps a missing one from resetting the top-level value
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--db', default=argparse.SUPPRESS, help=f"history file (default: {DEFAULT_DB})")
+    sub = parser.add_subparsers(dest='command', required=True)
+    rep = sub.add_parser('report', parents=[common], help="flag slowdowns against a rolling baseline")
+    rep.add_argument('--window', type=int, default=5, help="number of previous runs in the baseline")
+    rep.add_argument('--threshold', type=float, default=0.15, help="relative slowdown that counts as a regression")
+    lst = sub.add_parser('list', parents=[common], help="show the most recent runs")
+    lst.add_argument('--limit', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    history = RunHistory(args.db)
+    try:
+        if args.command == 'report':
+            findings = regression_report(history, args.window, args.threshold)
+            print(format_report(findings, args.threshold))
+            return 1 if any(f['regressed'] for f in findings) else 0
+        for r in history.recent(args.limit):
+            print(f"[{r['created']}] {r['tool']:<10} {r['algorithm']:<10} {str(r['sort_column'] or '-'):<10} "
+                  f"{r['size']:>10,} rows {r['seconds']:.4f}s  py{r['python_version']}  {r['host']}")
+        return 0
+    finally:
+        history.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
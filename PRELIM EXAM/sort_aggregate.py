@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+SORT AGGREGATE - distinct values, duplicate groups and counts per key
+
+Two ways to count the values of a dataset (or of one CSV column):
+
+  hash    Counter over the values, then sort the d distinct ones: O(n + d log d).
+  sorted  Sort the values, then one pass that jumps from group to group with
+          bisect: O(n log n) on shuffled input, close to O(n) on input that is
+          already in order (either direction), which Timsort only has to scan.
+
+Which one wins depends on the data more than on n. On 1M shuffled values with a few
+thousand distinct ones (last names, the lab's 1-9998 ints) hash counting is about 5x
+faster; on unique shuffled values, or anything already in order, sorting is faster.
+'auto' therefore times both on a contiguous slice from the middle (which keeps the
+input's order and duplicate structure) and runs the faster one.
+
+Usage:
+    python sort_aggregate.py ../PRELIM-LAB-WORK-1/dataset.txt
+    python sort_aggregate.py generated_data.csv --column LastName --top 20 --output lastname_counts.csv
+"""
+
+import argparse
+import csv
+import heapq
+import sys
+import time
+from bisect import bisect_right
+from collections import Counter
+from operator import itemgetter
+from pathlib import Path
+
+METHODS = ('auto', 'hash', 'sorted')
+TRIAL = 20000 # values both methods are timed on when picking one
+TRIAL_ROUNDS = 3 # best of, alternating, so a cold first call does not decide
+
+# ============================================================================
+# COUNTING
+# ============================================================================
+
+def column_values(rows, column):
+    """One CSV column as a list; IDs are compared as numbers, like the sort engines do"""
+    if column == 'ID':
+        return [int(r['ID']) for r in rows]
+    return [r[column] for r in rows]
+
+
+def choose_method(values, trial=TRIAL):
+    """('hash' | 'sorted', reason) from timing both on a slice of the values"""
+    n = len(values)
+    if n < 2 * trial:
+        return 'hash', "small input, not worth a trial"
+    start = n // 2 - trial // 2
+    piece = values[start:start + trial]
+    times = {'hash': float('inf'), 'sorted': float('inf')}
+    for _ in range(TRIAL_ROUNDS):
+        for method, count in (('hash', count_hash), ('sorted', count_sorted)):
+            t = time.perf_counter()
+            count(piece)
+            times[method] = min(times[method], time.perf_counter() - t)
+    best, other = sorted(times, key=times.get)
+    return best, f"{times[other] / max(times[best], 1e-9):.1f}x faster than {other} on a {trial:,}-value trial"
+
+
+def count_hash(values):
+    return sorted(Counter(values).items())
+
+
+def count_sorted(values):
+    ordered = sorted(values)
+    groups, i, n = [], 0, len(ordered)
+    while i < n:
+        value = ordered[i]
+        j = bisect_right(ordered, value, i) # end of this value's run
+        groups.append((value, j - i))
+        i = j
+    return groups
+
+
+class Aggregation:
+    def __init__(self, groups, total, method, reason, seconds, label='value'):
+        self.groups = groups # (value, count) in ascending value order
+        self.total = total
+        self.method = method
+        self.reason = reason
+        self.seconds = seconds
+        self.label = label
+
+    @property
+    def distinct(self):
+        return len(self.groups)
+
+    def duplicates(self):
+        """(value, count) of the values that occur more than once"""
+        return [g for g in self.groups if g[1] > 1]
+
+    def top(self, n=10):
+        """Largest groups, ties in value order"""
+        return heapq.nlargest(n, self.groups, key=itemgetter(1))
+
+    def group_sizes(self):
+        """group size -> number of groups of that size"""
+        return sorted(Counter(count for _, count in self.groups).items())
+
+    def format(self, top=10):
+        dups = self.duplicates()
+        repeated = sum(count for _, count in dups)
+        lines = [f"  Records            : {self.total:,}",
+                 f"  Distinct {self.label:<10}: {self.distinct:,}",
+                 f"  Duplicate groups   : {len(dups):,} ({repeated:,} records; "
+                 f"{self.total - self.distinct:,} beyond the first of each)",
+                 f"  Counted by         : {self.method} in {self.seconds:.4f}s ({self.reason})"]
+        sizes = self.group_sizes()
+        if sizes:
+            shown = sizes if len(sizes) <= 8 else sizes[:7] + [sizes[-1]]
+            text = ", ".join(f"{size}x: {groups:,}" for size, groups in shown)
+            lines.append(f"  Group sizes        : {text}" + (" (largest last)" if len(sizes) > 8 else ""))
+        if self.groups and top:
+            lines.append(f"\n  {'COUNT':>8}  {self.label.upper()}")
+            lines.extend(f"  {count:>8,}  {value}" for value, count in self.top(top))
+        return "\n".join(lines)
+
+    def write(self, path, by_count=False):
+        """CSV of every group: <label>,count - by value, or largest first"""
+        groups = sorted(self.groups, key=itemgetter(1), reverse=True) if by_count else self.groups
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow([self.label, 'count'])
+            writer.writerows(groups)
+        return path
+
+
+def aggregate(values, method='auto', label='value'):
+    """Count the values with the chosen (or the likely faster) method"""
+    if method not in METHODS:
+        raise ValueError(f"unknown method {method!r} (choose from {', '.join(METHODS)})")
+    start = time.perf_counter()
+    if method == 'auto':
+        method, reason = choose_method(values)
+    else:
+        reason = "chosen"
+    groups = count_hash(values) if method == 'hash' else count_sorted(values)
+    return Aggregation(groups, len(values), method, reason, time.perf_counter() - start, label)
+
+# ============================================================================
+# COMMAND LINE
+# ============================================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Distinct values, duplicate groups and counts per key")
+    parser.add_argument('dataset', help="integers one per line, or a CSV with a header")
+    parser.add_argument('--column', default='LastName', help="CSV column to count (default: LastName)")
+    parser.add_argument('--method', choices=METHODS, default='auto', help="counting strategy (default: auto)")
+    parser.add_argument('--top', type=int, default=10, help="largest groups to print (default: 10)")
+    parser.add_argument('--output', help="write every group as CSV (<column>,count)")
+    parser.add_argument('--by-count', action='store_true', help="order the output largest group first")
+    args = parser.parse_args(argv)
+
+    from dataset_cache import load_csv, load_ints
+    try:
+        if Path(args.dataset).suffix.lower() == '.csv':
+            rows, _ = load_csv(args.dataset)
+            if rows and args.column not in rows[0]:
+                parser.error(f"no column {args.column!r} (columns: {', '.join(rows[0])})")
+            values, label = column_values(rows, args.column), args.column
+        else:
+            (values, _), label = load_ints(args.dataset), 'value'
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 2
+    result = aggregate(values, args.method, label)
+    print(f"📊 {args.dataset}")
+    print(result.format(args.top))
+    if args.output:
+        print(f"\n💾 {result.distinct:,} groups written to {result.write(args.output, args.by_count)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+SORT BATCH - sort a directory (or glob) of .txt/.csv datasets on a process pool
+
+Files are scheduled largest first so one big shard does not start last and hold up
+the batch. Each worker parses its file, sorts it, verifies the result and streams it
+to the output directory under the same name (written to a temporary file and renamed,
+so a half-written output never looks finished). Integer files are written one value
+per line; CSV files keep their header and columns.
+
+Usage:
+    python sort_batch.py shards/ --output sorted/ [--workers 4]
+    python sort_batch.py "shards/*.csv" --output sorted/ --column LastName --algorithm merge_buffered
+"""
+
+import argparse
+import csv
+import glob
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from operator import itemgetter
+from pathlib import Path
+
+SUFFIXES = ('.txt', '.csv')
+
+# ============================================================================
+# WORKER (runs in the pool processes)
+# ============================================================================
+
+def _engine(kind, algorithm):
+    """(display name, sort(data, descending) -> sorted list, key) for the dataset kind"""
+    wanted = algorithm.lower().replace('-', '_')
+    if kind == 'ints':
+        from int_sorts import BY_KEY
+        if wanted not in BY_KEY:
+            raise ValueError(f"unknown algorithm {algorithm!r} for integer files (choose from {', '.join(BY_KEY)})")
+        name, func = BY_KEY[wanted]
+        return name, lambda data, descending: func(data, descending=descending), None
+    from row_sorts import BY_KEY
+    from sort_keys import key_for
+    for name, func in BY_KEY.values():
+        if name.lower() == wanted.replace('_', ''):
+            return name, func, key_for
+    raise ValueError(f"unknown algorithm {algorithm!r} for CSV files "
+                     f"(choose from {', '.join(n for n, _ in BY_KEY.values())})")
+
+
+def _write(path, kind, data):
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, 'w', encoding='utf-8', newline='') as f:
+        if kind == 'ints':
+            f.writelines(f"{x}\n" for x in data)
+        elif data:
+            fields = list(data[0])
+            writer = csv.writer(f)
+            writer.writerow(fields)
+            writer.writerows(map(itemgetter(*fields), data))
+    os.replace(tmp, path)
+
+
+def sort_file(source, output, options):
+    """Parse, sort, verify and write one file; returns its timings"""
+    from dataset_cache import parse_csv, parse_ints
+    from sort_verify import multiset_hash, verify
+    kind = 'csv' if source.suffix.lower() == '.csv' else 'ints'
+    name, func, column_key = _engine(kind, options['algorithm'])
+    descending = options['descending']
+    if descending is None:
+        descending = kind == 'ints' # each engine family's own default order
+
+    start = time.perf_counter()
+    data = parse_csv(source) if kind == 'csv' else parse_ints(source)
+    loaded = time.perf_counter()
+    key = column_key(options['column']) if column_key else None
+    if key and data and options['column'] not in data[0]:
+        raise ValueError(f"no column {options['column']!r}")
+    expected = multiset_hash(data) # the sort may work in place
+    hashed = time.perf_counter()
+    if key:
+        result = func(data, key, copy=False, descending=descending)
+    else:
+        result = func(data, descending)
+    sorted_at = time.perf_counter()
+    check = verify(None, result, key, descending, expected=expected)
+    if not check.ok:
+        raise RuntimeError(f"{name} produced a wrong result: {check.summary()}")
+    verified = time.perf_counter()
+    _write(output, kind, result)
+    return {'source': str(source), 'output': str(output), 'algorithm': name, 'rows': len(result),
+            'bytes': source.stat().st_size, 'load': loaded - start, 'sort': sorted_at - hashed,
+            'verify': verified - sorted_at + hashed - loaded, 'write': time.perf_counter() - verified,
+            'pid': os.getpid()}
+
+# ============================================================================
+# BATCH
+# ============================================================================
+
+def find_inputs(patterns):
+    """The .txt/.csv files named by directories or glob patterns, without duplicates"""
+    found = {}
+    for pattern in patterns:
+        path = Path(pattern)
+        matches = path.iterdir() if path.is_dir() else map(Path, glob.glob(pattern, recursive=True))
+        for p in matches:
+            if p.suffix.lower() in SUFFIXES and p.is_file():
+                found.setdefault(p.resolve(), p)
+    return list(found.values())
+
+
+def plan(inputs, output_dir):
+    """(source, output, size) largest first; clashing file names get their folder as a prefix,
+    then a counter until they are unique"""
+    jobs = sorted(((p, p.stat().st_size) for p in inputs), key=lambda j: j[1], reverse=True)
+    taken, planned = set(), []
+    for source, size in jobs:
+        name = source.name
+        if name in taken:
+            name = f"{source.parent.name}-{source.name}"
+            count = 1
+            while name in taken:
+                count += 1
+                name = f"{source.parent.name}-{source.stem}-{count}{source.suffix}"
+        taken.add(name)
+        planned.append((source, output_dir / name, size))
+    return planned
+
+
+class BatchSummary:
+    def __init__(self):
+        self.done = []
+        self.failed = []
+        self.started = time.perf_counter()
+        self.wall = 0.0
+
+    def finish(self):
+        self.wall = time.perf_counter() - self.started
+
+    def format(self):
+        rows = sum(r['rows'] for r in self.done)
+        size = sum(r['bytes'] for r in self.done)
+        wall = self.wall or 1e-9
+        busy = sum(r['load'] + r['sort'] + r['verify'] + r['write'] for r in self.done)
+        lines = ["=" * 70,
+                 f"Sorted {len(self.done):,} file(s), {rows:,} rows, {size / 1e6:.1f} MB in {self.wall:.2f}s"
+                 + (f"  ({len(self.failed)} failed)" if self.failed else ""),
+                 f"Throughput: {len(self.done) / wall:.2f} files/s | {rows / wall:,.0f} rows/s | {size / 1e6 / wall:.2f} MB/s"]
+        if self.done:
+            phases = {p: sum(r[p] for r in self.done) for p in ('load', 'sort', 'verify', 'write')}
+            lines.append("Worker time: " + " | ".join(f"{p} {s:.2f}s" for p, s in phases.items())
+                         + f" (busy {busy:.2f}s across workers = {busy / wall:.1f}x the wall time)")
+        for source, error in self.failed:
+            lines.append(f"❌ {source}: {error}")
+        return "\n".join(lines)
+
+
+def run_batch(planned, options, workers=None, on_result=None):
+    """Sort every planned file on a process pool; returns a BatchSummary"""
+    summary = BatchSummary()
+    # spawn: workers start clean instead of inheriting this process's loaded data
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+        futures = {pool.submit(sort_file, source, output, options): source for source, output, _ in planned}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                summary.failed.append((futures[future], f"{type(e).__name__}: {e}"))
+                result = None
+            else:
+                summary.done.append(result)
+            if on_result:
+                on_result(futures[future], result, summary)
+    summary.finish()
+    return summary
+
+# ============================================================================
+# COMMAND LINE
+# ============================================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sort a directory or glob of datasets in parallel")
+    parser.add_argument('inputs', nargs='+', help="directories and/or glob patterns of .txt/.csv files")
+    parser.add_argument('--output', required=True, help="directory for the sorted files")
+    parser.add_argument('--algorithm', default='merge_buffered', help="engine for every file (default: merge_buffered)")
+    parser.add_argument('--column', default='ID', choices=['ID', 'FirstName', 'LastName'], help="CSV sort column")
+    parser.add_argument('--order', choices=['ascending', 'descending'], default=None,
+                        help="default: descending for integer files, ascending for CSV files")
+    parser.add_argument('--workers', type=int, default=None, help="pool size (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    inputs = find_inputs(args.inputs)
+    if not inputs:
+        parser.error("no .txt/.csv files matched")
+    output_dir = Path(args.output)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    if any(p.resolve().parent == output_dir.resolve() for p in inputs):
+        parser.error("the output directory must differ from the input directories")
+    planned = plan(inputs, output_dir)
+    options = {'algorithm': args.algorithm, 'column': args.column,
+               'descending': None if args.order is None else args.order == 'descending'}
+    workers = args.workers or os.cpu_count() or 1
+    print(f"📦 {len(planned)} file(s), {sum(s for _, _, s in planned) / 1e6:.1f} MB, "
+          f"{min(workers, len(planned))} worker(s), largest first")
+
+    def report(source, result, summary):
+        count = f"[{len(summary.done) + len(summary.failed)}/{len(planned)}]"
+        if result is None:
+            print(f"{count} ❌ {source.name}: {summary.failed[-1][1]}")
+        else:
+            print(f"{count} ✓ {source.name:<30} {result['rows']:>10,} rows  {result['algorithm']:<16} "
+                  f"load {result['load']:.2f}s  sort {result['sort']:.2f}s  write {result['write']:.2f}s")
+    summary = run_batch(planned, options, workers, report)
+    print(summary.format())
+    return 1 if summary.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
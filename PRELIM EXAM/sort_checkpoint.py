@@ -0,0 +1,114 @@
+"""
+SORT CHECKPOINTS - pause, persist and resume long-running quadratic sorts
+
+The resumable sorts call Checkpointer.tick() at every outer-loop boundary (the only
+points where the array plus one loop index fully describe the state). tick() saves
+periodically, and save() is called when a stop is requested, so cancel latency is
+bounded by a single outer pass.
+"""
+
+import os
+import pickle
+import re
+import time
+from datetime import datetime
+from pathlib import Path
+
+from run_history import STATE_DIR
+
+CHECKPOINT_DIR = STATE_DIR / "checkpoints"
+AUTOSAVE_SECONDS = 60.0
+
+
+class Checkpointer:
+    def __init__(self, tool, algorithm, column, dataset, size, fingerprint='in-memory',
+                 directory=None, interval=AUTOSAVE_SECONDS, descending=False):
+        self.meta = {
+            'tool': tool, 'algorithm': algorithm, 'column': column,
+            'dataset': str(dataset) if dataset else None,
+            'size': size, 'fingerprint': fingerprint,
+            'descending': descending, # Descending checkpoints hold the reversed input (see sort_order.py)
+        }
+        self.directory = Path(directory) if directory else CHECKPOINT_DIR
+        self.interval = interval
+        self.elapsed_before = 0.0 # Sort time already spent in earlier sessions
+        self._started = time.perf_counter()
+        self._next_save = time.monotonic() + interval
+        self.saved_path = None
+
+    @property
+    def path(self):
+        m = self.meta
+        order = "-desc" if m.get('descending') else ""
+        column = re.sub(r"[^\w]+", "_", str(m['column'])).strip('_') # key expressions hold ( ) , / and spaces
+        name = f"{m['tool']}-{m['algorithm']}-{column}{order}-{m['fingerprint'][:8]}-{m['size']}.ckpt"
+        return self.directory / name.lower()
+
+    def begin(self):
+        """Called when a sort (re)starts so `elapsed` only counts this run"""
+        self._started = time.perf_counter()
+        self._next_save = time.monotonic() + self.interval
+
+    def tick(self, arr, position):
+        """Called at every outer-loop boundary; saves when the autosave interval has passed"""
+        if time.monotonic() >= self._next_save:
+            self.save(arr, position)
+
+    def save(self, arr, position):
+        """Atomically write the array and the next outer-loop index"""
+        header = dict(self.meta)
+        header.update({
+            'position': position,
+            'elapsed': self.elapsed_before + time.perf_counter() - self._started,
+            'saved': datetime.now().isoformat(timespec='seconds'),
+        })
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix('.tmp')
+        with open(tmp, 'wb') as f:
+            # Header first so listings can skip the (large) array
+            pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(arr, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self.path)
+        self.saved_path = self.path
+        self._next_save = time.monotonic() + self.interval
+        return self.path
+
+    def discard(self):
+        """Remove the checkpoint once the sort has completed"""
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+    @classmethod
+    def resume(cls, path, interval=AUTOSAVE_SECONDS):
+        """Load a checkpoint; returns (checkpointer, data, position)"""
+        state = load_checkpoint(path)
+        cp = cls(state['tool'], state['algorithm'], state['column'], state['dataset'], state['size'],
+                 state['fingerprint'], Path(path).parent, interval, state.get('descending', False))
+        cp.elapsed_before = state['elapsed']
+        return cp, state['data'], state['position']
+
+
+def load_checkpoint(path, with_data=True):
+    with open(path, 'rb') as f:
+        state = pickle.load(f)
+        if with_data:
+            state['data'] = pickle.load(f)
+    return state
+
+
+def list_checkpoints(directory=None, tool=None):
+    """Checkpoint summaries (without the array), newest first"""
+    directory = Path(directory) if directory else CHECKPOINT_DIR
+    found = []
+    for path in sorted(directory.glob("*.ckpt"), key=lambda p: p.stat().st_mtime, reverse=True):
+        try:
+            state = load_checkpoint(path, with_data=False)
+        except Exception:
+            continue
+        if tool and state['tool'] != tool:
+            continue
+        state['path'] = path
+        found.append(state)
+    return found
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+SORT DIFF - what changed between two versions of a dataset, in one merge-join pass
+
+Both inputs are sorted by the key (external merge sort: sorted runs of --run-rows
+records on disk, then one streaming merge), and the sorted copies are kept in
+~/.sortbench/sorted so the next comparison against the same file version skips that
+step. A single linear pass over the two sorted streams then reports rows added,
+removed and changed per key, with counts for duplicates. Nothing is held in memory
+beyond one run while sorting and one key's rows while joining, so the inputs can be
+larger than RAM.
+
+CSV files are keyed on a column (a key whose rows differ is 'changed'); integer files
+are compared as multisets of values.
+
+Usage:
+    python sort_diff.py ../PRELIM-LAB-WORK-1/dataset.txt ../PRELIM-LAB-WORK-2/dataset.txt
+    python sort_diff.py old/generated_data.csv generated_data.csv --key ID --output changes.txt
+"""
+
+import argparse
+import csv
+import hashlib
+import heapq
+import os
+import re
+import sys
+import tempfile
+import time
+from collections import Counter
+from itertools import groupby, islice
+from pathlib import Path
+
+from run_history import STATE_DIR
+
+SORTED_DIR = STATE_DIR / "sorted"
+RUN_ROWS = 1_000_000 # records sorted in memory at a time
+_END = object()
+
+# ============================================================================
+# RECORD FILES
+# ============================================================================
+
+def read_columns(path):
+    """Column names of a CSV file, None for an integer file"""
+    if Path(path).suffix.lower() != '.csv':
+        return None
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        return [name.replace('﻿', '') for name in next(csv.reader(f), [])]
+
+
+def stream_records(path, columns):
+    """Records of a dataset file, one at a time: tuples of stripped CSV values, or ints"""
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if columns is None:
+            for line in f:
+                if line.strip():
+                    yield int(line)
+            return
+        reader = csv.reader(f)
+        next(reader, None)
+        for row in reader:
+            if not row:
+                continue
+            if len(row) != len(columns):
+                raise ValueError(f"{path}, line {reader.line_num}: {len(row)} fields, expected {len(columns)}")
+            yield tuple(v.strip() for v in row)
+
+
+def _write_records(path, records, columns):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        if columns is None:
+            f.writelines(f"{x}\n" for x in records)
+        else:
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            writer.writerows(records)
+
+# ============================================================================
+# EXTERNAL SORT (with the sorted copy cached per file version)
+# ============================================================================
+
+def sorted_path(path, column):
+    """Cached sorted copy of the current version of `path`: <source>-<version>-<key>.sorted"""
+    path = Path(path).resolve()
+    st = path.stat()
+    source = hashlib.blake2b(str(path).encode(), digest_size=8).hexdigest()
+    version = hashlib.blake2b(f"{st.st_mtime_ns}:{st.st_size}".encode(), digest_size=6).hexdigest()
+    key = re.sub(r"[^\w]+", "_", column).strip('_') if column else 'value' # no '-' or path characters
+    return SORTED_DIR / f"{source}-{version}-{key}.sorted"
+
+
+def sort_key(columns, column):
+    """Records sort by the key column first, then by the whole row, so every key's rows
+    are contiguous and in the same order in both files"""
+    if columns is None:
+        return None
+    index = columns.index(column)
+    return lambda row: (row[index], row)
+
+
+def external_sort(path, columns, column, run_rows=RUN_ROWS, use_cache=True):
+    """
+    Sort a dataset file by `column` into SORTED_DIR (or reuse the copy made earlier).
+
+    Returns (sorted file, runs written), with runs=None when the cached copy was used.
+    """
+    target = sorted_path(path, column)
+    if use_cache and target.exists():
+        os.utime(target)
+        return target, None
+    key = sort_key(columns, column)
+    SORTED_DIR.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=SORTED_DIR) as tmp:
+        runs = []
+        records = stream_records(path, columns)
+        while True:
+            chunk = list(islice(records, run_rows))
+            if not chunk and runs:
+                break
+            chunk.sort(key=key)
+            run = Path(tmp) / f"run{len(runs)}"
+            _write_records(run, chunk, columns)
+            runs.append(run)
+            if len(chunk) < run_rows:
+                break
+        if len(runs) > 1:
+            merged = Path(tmp) / "merged"
+            _write_records(merged, heapq.merge(*(stream_records(r, columns) for r in runs), key=key), columns)
+        else:
+            merged = runs[0]
+        os.replace(merged, target) # same folder, so readers never see a partial file
+    source, _, key = target.name.split('-', 2)
+    for stale in SORTED_DIR.glob(f"{source}-*.sorted"):
+        if stale != target and stale.name.split('-', 2)[2] == key:
+            stale.unlink(missing_ok=True) # older versions of the same input and key
+    return target, len(runs)
+
+# ============================================================================
+# MERGE-JOIN
+# ============================================================================
+
+class DiffReport:
+    def __init__(self, show=10):
+        self.show = show
+        self.counts = Counter() # change -> records
+        self.sizes = [0, 0] # records in the old and the new file
+        self.examples = {'added': [], 'removed': [], 'changed': []}
+
+    def add(self, change, old, new, count):
+        self.counts[change] += count
+        if change != 'same' and len(self.examples[change]) < self.show:
+            self.examples[change].append((old, new, count))
+
+    @property
+    def identical(self):
+        return not (self.counts['added'] or self.counts['removed'] or self.counts['changed'])
+
+    def format(self):
+        lines = [f"  + added     {self.counts['added']:>12,}",
+                 f"  - removed   {self.counts['removed']:>12,}",
+                 f"  ~ changed   {self.counts['changed']:>12,}",
+                 f"  = unchanged {self.counts['same']:>12,}"]
+        for change in ('added', 'removed', 'changed'):
+            if self.examples[change]:
+                shown = len(self.examples[change])
+                more = " (first {:,})".format(shown) if self.counts[change] > shown else ""
+                lines.append(f"\n{change.capitalize()}{more}:")
+                lines.extend("  " + format_change(change, *example) for example in self.examples[change])
+        return "\n".join(lines)
+
+
+def _text(record):
+    return ",".join(record) if isinstance(record, tuple) else str(record)
+
+
+def format_change(change, old, new, count):
+    times = f" (x{count})" if count > 1 else ""
+    if change == 'added':
+        return f"+ {_text(new)}{times}"
+    if change == 'removed':
+        return f"- {_text(old)}{times}"
+    return f"~ {_text(old)} -> {_text(new)}{times}"
+
+
+def _counted(rows):
+    """(row, count) for the rows of one key, which arrive sorted (so duplicates are adjacent)"""
+    if len(rows) == 1: # the usual case: skip the Counter
+        return ((rows[0], 1),)
+    return ((row, len(list(group))) for row, group in groupby(rows))
+
+
+def _key_changes(old_rows, new_rows):
+    """(change, old, new, count) for the rows of one key in both files"""
+    if old_rows == new_rows: # both sides are sorted, so equal lists mean nothing changed
+        yield 'same', None, None, len(old_rows)
+        return
+    old, new = Counter(old_rows), Counter(new_rows)
+    same = old & new
+    removed, added = sorted((old - new).elements()), sorted((new - old).elements())
+    if same:
+        yield 'same', None, None, sum(same.values())
+    # Leftover rows on both sides of a key are edits of each other, paired in sorted order
+    pairs = min(len(removed), len(added))
+    for row, count in Counter(zip(removed[:pairs], added[:pairs])).items():
+        yield 'changed', row[0], row[1], count
+    for row, count in Counter(removed[pairs:]).items():
+        yield 'removed', row, None, count
+    for row, count in Counter(added[pairs:]).items():
+        yield 'added', None, row, count
+
+
+def merge_join(old, new, group_key):
+    """One pass over two streams sorted by group_key; yields (change, old, new, count)"""
+    old_groups, new_groups = groupby(old, group_key), groupby(new, group_key)
+    ko, vo = next(old_groups, (_END, None))
+    kn, vn = next(new_groups, (_END, None))
+    while ko is not _END or kn is not _END:
+        if kn is _END or (ko is not _END and ko < kn):
+            for row, count in _counted(list(vo)):
+                yield 'removed', row, None, count
+            ko, vo = next(old_groups, (_END, None))
+        elif ko is _END or kn < ko:
+            for row, count in _counted(list(vn)):
+                yield 'added', None, row, count
+            kn, vn = next(new_groups, (_END, None))
+        else:
+            yield from _key_changes(list(vo), list(vn))
+            ko, vo = next(old_groups, (_END, None))
+            kn, vn = next(new_groups, (_END, None))
+
+
+def compare(old_path, new_path, column='ID', run_rows=RUN_ROWS, use_cache=True, show=10, on_change=None, report=print):
+    """Sort both files (or reuse their sorted copies) and merge-join them; returns a DiffReport"""
+    columns = read_columns(old_path)
+    if columns != read_columns(new_path):
+        raise ValueError(f"the files have different columns: {columns} vs {read_columns(new_path)}")
+    if columns is not None and column not in columns:
+        raise ValueError(f"no column {column!r} (columns: {', '.join(columns)})")
+    column = column if columns is not None else None
+    sorted_files = []
+    for path in (old_path, new_path):
+        start = time.perf_counter()
+        target, runs = external_sort(path, columns, column, run_rows, use_cache)
+        how = "cached sorted copy" if runs is None else f"sorted in {time.perf_counter() - start:.2f}s ({runs} run(s))"
+        report(f"  {path}: {how}")
+        sorted_files.append(target)
+
+    diff = DiffReport(show)
+    sizes = diff.sizes
+
+    def counted(records, side):
+        for record in records:
+            sizes[side] += 1
+            yield record
+    index = columns.index(column) if columns is not None else None
+    group_key = (lambda row: row[index]) if index is not None else None
+    old = counted(stream_records(sorted_files[0], columns), 0)
+    new = counted(stream_records(sorted_files[1], columns), 1)
+    for change, old_row, new_row, count in merge_join(old, new, group_key):
+        diff.add(change, old_row, new_row, count)
+        if on_change and change != 'same':
+            on_change(change, old_row, new_row, count)
+    return diff
+
+# ============================================================================
+# COMMAND LINE
+# ============================================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report added, removed and changed rows between two datasets")
+    parser.add_argument('old', help="the earlier version (.csv or integer .txt)")
+    parser.add_argument('new', help="the later version, same format")
+    parser.add_argument('--key', default='ID', help="CSV column that identifies a row (default: ID)")
+    parser.add_argument('--show', type=int, default=10, help="examples printed per kind of change (default: 10)")
+    parser.add_argument('--output', help="write every difference to this file")
+    parser.add_argument('--run-rows', type=int, default=RUN_ROWS,
+                        help=f"records sorted in memory at a time (default: {RUN_ROWS:,})")
+    parser.add_argument('--no-cache', action='store_true', help="sort both files again even if a sorted copy exists")
+    args = parser.parse_args(argv)
+
+    print(f"🔍 Comparing {args.old} -> {args.new}")
+    start = time.perf_counter()
+    out = open(args.output, 'w', encoding='utf-8') if args.output else None
+    try:
+        on_change = (lambda *change: out.write(format_change(*change) + "\n")) if out else None
+        diff = compare(args.old, args.new, args.key, max(1, args.run_rows), not args.no_cache, args.show, on_change)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 2
+    finally:
+        if out:
+            out.close()
+    old_rows, new_rows = diff.sizes
+    by = f" by {args.key}" if read_columns(args.old) is not None else ""
+    print(f"\n{old_rows:,} -> {new_rows:,} records{by} ({time.perf_counter() - start:.2f}s)")
+    print(diff.format())
+    if out:
+        print(f"\n💾 All differences written to {args.output}")
+    if diff.identical:
+        print("\n✓ No differences")
+    return 0 if diff.identical else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
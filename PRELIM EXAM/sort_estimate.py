@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+SORT ESTIMATE - predicted run time and peak memory of a sort, before it starts
+
+Each algorithm has a complexity model (n² or n log n). Its constant is calibrated
+from the run history of this machine: the recorded runs closest in size to the one
+being planned give seconds / f(n) and peak bytes / n, and the medians of those are
+scaled to the new size. Algorithms with no history yet use the built-in constants
+below (measured on a modest laptop, so treat them as rough).
+
+The tools compare the estimate with the limits (SORTBENCH_MAX_SECONDS, default 600,
+and SORTBENCH_MAX_MEMORY_MB, default 2048) before starting a sort. Over a limit they
+ask for confirmation, or refuse when nobody is there to answer (stdin is not a
+terminal, the sort service). Every run stores its prediction next to the measured
+time, so `accuracy` shows how far off the estimates have been.
+
+Usage:
+    python sort_estimate.py estimate Bubble 100000 [--tool console]
+    python sort_estimate.py accuracy
+"""
+
+import argparse
+import math
+import os
+import statistics
+import sys
+
+# normalised algorithm name -> complexity model
+MODELS = {
+    'bubble': 'n^2', 'selection': 'n^2', 'insertion': 'n^2',
+    'bubblefast': 'n^2', 'selectionfast': 'n^2', 'insertionfast': 'n^2',
+    'quick': 'n log n', 'merge': 'n log n', 'mergebuffered': 'n log n',
+}
+# kind -> algorithm -> (seconds per f(n), extra peak bytes per element) when uncalibrated
+DEFAULTS = {
+    'ints': {'bubble': (4e-8, 1), 'selection': (2e-8, 1), 'insertion': (2e-8, 1),
+             'bubblefast': (2e-8, 9), 'selectionfast': (1e-8, 9), 'insertionfast': (2e-10, 17),
+             'quick': (7e-8, 1), 'merge': (1.5e-7, 9), 'mergebuffered': (9e-8, 9)},
+    'rows': {'bubble': (1.5e-7, 1), 'selection': (1e-7, 1), 'insertion': (5e-8, 1),
+             'bubblefast': (4e-8, 80), 'selectionfast': (4e-8, 80), 'insertionfast': (3e-10, 90),
+             'quick': (4e-7, 9), 'merge': (6e-7, 18), 'mergebuffered': (5e-7, 9)},
+}
+KINDS = {'lab': 'ints'} # tool -> what it sorts; every other tool sorts CSV rows
+MIN_SIZE = 500 # smaller runs are mostly fixed overhead and say little about the constant
+NEAREST = 15 # recorded runs used per estimate, the ones closest in size
+SCAN = 2000 # newest runs looked at
+
+MAX_SECONDS = float(os.environ.get('SORTBENCH_MAX_SECONDS', 600))
+MAX_MEMORY_MB = float(os.environ.get('SORTBENCH_MAX_MEMORY_MB', 2048))
+
+# ============================================================================
+# MODEL
+# ============================================================================
+
+def normalize(algorithm):
+    """'MergeBuffered', 'merge_buffered' and 'Merge-Buffered' are the same algorithm"""
+    return algorithm.lower().replace('_', '').replace('-', '').replace(' ', '')
+
+
+def growth(model, n):
+    n = max(n, 2)
+    return n * n if model == 'n^2' else n * math.log2(n)
+
+
+class Estimate:
+    def __init__(self, algorithm, size, seconds, peak_bytes, model, basis):
+        self.algorithm = algorithm
+        self.size = size
+        self.seconds = seconds # one sort
+        self.peak_bytes = peak_bytes # extra memory of one sort, on top of the input
+        self.model = model
+        self.basis = basis # recorded runs it was calibrated from, 0 = built-in constant
+
+    def source(self):
+        return f"from {self.basis} earlier run(s)" if self.basis else "built-in constant, no history yet"
+
+    def summary(self, runs=1):
+        total = f", {format_seconds(self.seconds * runs)} for {runs} runs" if runs > 1 else ""
+        return (f"~{format_seconds(self.seconds)} per sort{total}, peak +{format_bytes(self.peak_bytes)} "
+                f"(O({self.model}), {self.source()})")
+
+
+def format_bytes(size):
+    return f"{size / 1e6:,.1f} MB" if size >= 1e5 else f"{size / 1e3:.0f} KB"
+
+
+def format_seconds(seconds):
+    if seconds < 60:
+        return f"{seconds:.2f}s"
+    if seconds < 3600:
+        return f"{seconds / 60:.1f} min"
+    return f"{seconds / 3600:.1f} h"
+
+
+def _calibration(history, tool, algorithm, size):
+    """(seconds per f(n), bytes per element, runs used) from the runs nearest in size"""
+    name = normalize(algorithm)
+    kind = KINDS.get(tool, 'rows')
+    seconds, per_item = DEFAULTS[kind][name]
+    if history is None:
+        return seconds, per_item, 0
+    try:
+        runs = [r for r in history.runs_by_tools(None, MIN_SIZE, SCAN)
+                if KINDS.get(r['tool'], 'rows') == kind and normalize(r['algorithm']) == name and r['seconds'] > 0]
+    except Exception:
+        return seconds, per_item, 0
+    # Same-tool runs first (each tool adds its own progress overhead), then closest in size
+    runs.sort(key=lambda r: (r['tool'] != tool, abs(math.log(r['size'] / max(size, 1)))))
+    nearest = runs[:NEAREST]
+    if not nearest:
+        return seconds, per_item, 0
+    model = MODELS[name]
+    seconds = statistics.median(r['seconds'] / growth(model, r['size']) for r in nearest)
+    measured = [r['peak_bytes'] / r['size'] for r in nearest if r['peak_bytes'] is not None]
+    if measured:
+        per_item = statistics.median(measured)
+    return seconds, per_item, len(nearest)
+
+
+def estimate(history, tool, algorithm, size):
+    """Estimate for sorting `size` elements with `algorithm` in `tool` ('console', 'gui', 'lab', ...)"""
+    name = normalize(algorithm)
+    if name not in MODELS:
+        raise ValueError(f"no complexity model for {algorithm!r}")
+    per_op, per_item, basis = _calibration(history, tool, algorithm, size)
+    model = MODELS[name]
+    return Estimate(algorithm, size, per_op * growth(model, size), per_item * size, model, basis)
+
+# ============================================================================
+# ADMISSION CONTROL
+# ============================================================================
+
+def over_limits(est, runs=1, max_seconds=None, max_memory_mb=None):
+    """Reasons the planned runs exceed the limits (empty list = within them)"""
+    max_seconds = MAX_SECONDS if max_seconds is None else max_seconds
+    max_memory_mb = MAX_MEMORY_MB if max_memory_mb is None else max_memory_mb
+    problems = []
+    if est.seconds * runs > max_seconds:
+        problems.append(f"estimated time {format_seconds(est.seconds * runs)} is over the "
+                        f"{format_seconds(max_seconds)} limit (SORTBENCH_MAX_SECONDS)")
+    if est.peak_bytes / 1e6 > max_memory_mb:
+        problems.append(f"estimated peak memory {est.peak_bytes / 1e6:,.0f} MB is over the "
+                        f"{max_memory_mb:,.0f} MB limit (SORTBENCH_MAX_MEMORY_MB)")
+    return problems
+
+
+def admit(problems, ask=input):
+    """Terminal admission: ask when someone can answer, refuse when stdin is not a terminal"""
+    if not problems:
+        return True
+    for problem in problems:
+        print(f"   ⚠️  {problem}")
+    if not sys.stdin.isatty():
+        print("   ⛔ Not started: no terminal to confirm on (raise the limit to allow it)")
+        return False
+    return ask("   Run it anyway? (y/N): ").strip().lower() == 'y'
+
+
+def count_records(path):
+    """Data rows in a dataset file without parsing it (the CSV header is not counted)"""
+    lines, last = 0, b'\n'
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            lines += chunk.count(b'\n')
+            last = chunk[-1:]
+    lines += last != b'\n' # final line without a newline
+    return max(0, lines - 1) if str(path).lower().endswith('.csv') else lines
+
+# ============================================================================
+# ACCURACY
+# ============================================================================
+
+def format_check(est, seconds):
+    """One line comparing a finished run with its prediction"""
+    if not est or not est.seconds:
+        return ""
+    ratio = seconds / est.seconds
+    return f"predicted {format_seconds(est.seconds)}, took {format_seconds(seconds)} ({ratio:.2f}x the estimate)"
+
+
+def accuracy(history):
+    """(tool, algorithm, runs, median actual/predicted, share within 2x) for runs that had an estimate"""
+    groups = {}
+    for r in history.runs_by_tools(None, 0, SCAN):
+        if r['predicted_seconds']:
+            groups.setdefault((r['tool'], r['algorithm']), []).append(r['seconds'] / r['predicted_seconds'])
+    return [(tool, algorithm, len(ratios), statistics.median(ratios),
+             sum(0.5 <= x <= 2 for x in ratios) / len(ratios))
+            for (tool, algorithm), ratios in sorted(groups.items())]
+
+
+def format_accuracy(rows):
+    if not rows:
+        return "No runs with an estimate recorded yet."
+    lines = [f"{'TOOL':<9}{'ALGORITHM':<16}{'RUNS':>6}{'ACTUAL/PREDICTED':>19}{'WITHIN 2x':>11}", "-" * 61]
+    for tool, algorithm, count, ratio, within in rows:
+        lines.append(f"{tool:<9}{algorithm:<16}{count:>6}{ratio:>18.2f}x{within:>10.0%}")
+    return "\n".join(lines)
+
+# ============================================================================
+# COMMAND LINE
+# ============================================================================
+
+def main(argv=None):
+    from run_history import RunHistory
+    parser = argparse.ArgumentParser(description="Predict sort time and memory from this machine's run history")
+    sub = parser.add_subparsers(dest='command', required=True)
+    est = sub.add_parser('estimate', help="predict one sort")
+    est.add_argument('algorithm', help="e.g. Bubble, merge_buffered, quick")
+    est.add_argument('size', type=int, help="elements to sort")
+    est.add_argument('--tool', default='console', help="console, gui, server or lab (integer lists)")
+    sub.add_parser('accuracy', help="how close earlier estimates were")
+    args = parser.parse_args(argv)
+
+    history = RunHistory()
+    if args.command == 'accuracy':
+        print(format_accuracy(accuracy(history)))
+        return 0
+    try:
+        prediction = estimate(history, args.tool, args.algorithm, args.size)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 2
+    print(f"{args.algorithm} on {args.size:,} elements ({args.tool}): {prediction.summary()}")
+    for problem in over_limits(prediction):
+        print(f"⚠️  {problem}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
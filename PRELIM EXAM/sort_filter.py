@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+SORT FILTER - sort stdin to stdout, so the sorters can sit in a shell pipeline
+
+Input is read in 1 MB chunks and parsed in one go: integers separated by any
+whitespace, or CSV rows with a header line when a --column is given. The sorted
+result goes out through a single 1 MB buffered writer, tens of thousands of lines
+per write. If the reader downstream goes away early (`| head`), the filter stops
+quietly with the status a SIGPIPE-killed `sort` would have (141). Timings go to
+stderr, so stdout carries nothing but data.
+
+Integers come out largest first, like the lab sorters; CSV rows come out smallest
+first, like the console. --ascending / --descending override either default.
+
+Jobs whose estimate (see sort_estimate.py) is over the limits are refused: a filter
+has no terminal to ask on.
+
+Usage:
+    python sort_filter.py < dataset.txt > sorted.txt
+    python sort_filter.py --algorithm quick --ascending < dataset.txt | head
+    cat generated_data.csv | python sort_filter.py --column LastName > by_name.csv
+    cat generated_data.csv | python sort_filter.py --column ID --descending > newest_first.csv
+    python ../PRELIM-LAB-WORK-2/sorting_appterm.py --filter < dataset.txt
+"""
+
+import argparse
+import csv
+import io
+import os
+import sys
+import time
+from operator import itemgetter
+
+READ_CHUNK = 1 << 20
+WRITE_BUFFER = 1 << 20
+LINES_PER_WRITE = 65536
+EXIT_BROKEN_PIPE = 141 # 128 + SIGPIPE
+
+# ============================================================================
+# INPUT
+# ============================================================================
+
+def read_all(stream, chunk=READ_CHUNK):
+    return b''.join(iter(lambda: stream.read(chunk), b''))
+
+
+def parse_int_bytes(raw):
+    """Integers separated by any whitespace"""
+    try:
+        return [int(x) for x in raw.split()]
+    except ValueError as e:
+        raise ValueError(f"input is not all integers ({e})") from None
+
+
+def parse_csv_bytes(raw):
+    """(header, rows as dicts) - values stripped like dataset_cache.parse_csv does"""
+    reader = csv.reader(io.StringIO(raw.decode('utf-8-sig')))
+    header = [name.strip() for name in next(reader, [])]
+    rows = []
+    for values in reader:
+        if not values:
+            continue
+        if len(values) != len(header):
+            raise ValueError(f"line {reader.line_num}: {len(values)} fields, expected {len(header)}")
+        rows.append(dict(zip(header, (v.strip() for v in values))))
+    return header, rows
+
+# ============================================================================
+# OUTPUT
+# ============================================================================
+
+def write_ints(out, data):
+    for i in range(0, len(data), LINES_PER_WRITE):
+        out.write(("\n".join(map(str, data[i:i + LINES_PER_WRITE])) + "\n").encode())
+
+
+def write_csv(out, header, rows):
+    if not header: # empty input: no header line either (writerow([]) would write a blank line)
+        return
+    text = io.TextIOWrapper(out, encoding='utf-8', newline='', write_through=True)
+    writer = csv.writer(text)
+    writer.writerow(header)
+    values = itemgetter(*header) if len(header) > 1 else (lambda row: (row[header[0]],))
+    for i in range(0, len(rows), LINES_PER_WRITE):
+        writer.writerows(map(values, rows[i:i + LINES_PER_WRITE]))
+    text.detach() # leave `out` open for the caller's flush
+
+# ============================================================================
+# FILTER
+# ============================================================================
+
+def _engine(algorithm, csv_rows):
+    """(display name, name in the run history, sort(data, descending)) from the integer or the CSV engine family"""
+    wanted = algorithm.lower().replace('-', '_')
+    if not csv_rows:
+        from int_sorts import BY_KEY
+        if wanted not in BY_KEY:
+            raise ValueError(f"unknown algorithm {algorithm!r} (choose from {', '.join(BY_KEY)})")
+        name, func = BY_KEY[wanted]
+        return name, wanted, lambda data, descending: func(data, descending=descending) # the lab tools record keys
+    from row_sorts import BY_KEY
+    for name, func in BY_KEY.values():
+        if name.lower() == wanted.replace('_', ''):
+            return name, name, func # the console records display names
+    raise ValueError(f"unknown algorithm {algorithm!r} for CSV rows "
+                     f"(choose from {', '.join(n for n, _ in BY_KEY.values())})")
+
+
+def run_filter(algorithm='merge_buffered', descending=None, column=None, quiet=False,
+               stdin=None, stdout_fd=None):
+    """Sort stdin to stdout; returns the exit status. descending=None: integers descending, CSV ascending"""
+    if descending is None:
+        descending = column is None
+    stdin = stdin or sys.stdin.buffer
+    stdout_fd = sys.stdout.fileno() if stdout_fd is None else stdout_fd
+
+    def log(text):
+        if not quiet:
+            print(text, file=sys.stderr)
+    try:
+        name, recorded_as, sort = _engine(algorithm, column is not None)
+        start = time.perf_counter()
+        raw = read_all(stdin)
+        read_at = time.perf_counter()
+        if column is None:
+            header, data = None, parse_int_bytes(raw)
+        else:
+            header, data = parse_csv_bytes(raw)
+            from sort_keys import check_key
+            check_key(column, data) # a column name or a key expression, e.g. "lower(LastName), -int(ID)"
+        del raw
+        parsed_at = time.perf_counter()
+        from sort_estimate import estimate, format_seconds, over_limits
+        from run_history import RunHistory
+        history = RunHistory()
+        try:
+            prediction = estimate(history, 'lab' if column is None else 'console', recorded_as, len(data))
+        finally:
+            history.close()
+        problems = over_limits(prediction)
+        if problems:
+            log("⛔ sort_filter: not started: " + "; ".join(problems))
+            return 3
+    except (OSError, ValueError) as e:
+        print(f"❌ sort_filter: {e}", file=sys.stderr)
+        return 2
+
+    sort_start = time.perf_counter() # after the estimate, which opens the run history
+    if column is None:
+        result = sort(data, descending)
+    else:
+        from sort_keys import key_for
+        result = sort(data, key_for(column), copy=False, descending=descending)
+    sorted_at = time.perf_counter()
+
+    out = open(stdout_fd, 'wb', buffering=WRITE_BUFFER, closefd=False)
+    try:
+        if column is None:
+            write_ints(out, result)
+        else:
+            write_csv(out, header, result)
+        out.flush()
+    except BrokenPipeError:
+        # The reader went away: send what is left (and the exit-time flush) to devnull
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, stdout_fd)
+        os.close(devnull)
+        log(f"✂️  sort_filter: output closed early after sorting {len(result):,} records with {name}")
+        return EXIT_BROKEN_PIPE
+    finally:
+        try:
+            out.close()
+        except BrokenPipeError:
+            pass
+    done = time.perf_counter()
+    what = "values" if column is None else f"rows by {column}"
+    total = done - start
+    log(f"⏱️  sort_filter: {len(result):,} {what} | read {read_at - start:.3f}s | parse {parsed_at - read_at:.3f}s"
+        f" | sort {sorted_at - sort_start:.3f}s ({name}, {'descending' if descending else 'ascending'})"
+        f" | write {done - sorted_at:.3f}s | total {total:.3f}s"
+        f" ({len(result) / total if total > 0 else 0:,.0f}/s; estimate was {format_seconds(prediction.seconds)})")
+    return 0
+
+# ============================================================================
+# COMMAND LINE
+# ============================================================================
+
+def add_arguments(parser):
+    parser.add_argument('--algorithm', default='merge_buffered', help="sort engine (default: merge_buffered)")
+    parser.add_argument('--column', default=None,
+                        help="read CSV rows with a header and sort by this column or key expression "
+                             "(default: integers)")
+    parser.add_argument('--descending', action='store_true',
+                        help="largest first (the default for integers; CSV rows default to ascending)")
+    parser.add_argument('--quiet', action='store_true', help="no timing line on stderr")
+
+
+def filter_order(parser, args):
+    """run_filter's descending from --ascending/--descending: True, False, or None for the input's default"""
+    if args.ascending and args.descending:
+        parser.error("--ascending and --descending are mutually exclusive")
+    return True if args.descending else False if args.ascending else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sort integers or CSV rows from stdin to stdout")
+    add_arguments(parser)
+    parser.add_argument('--ascending', action='store_true',
+                        help="smallest first (the default for CSV rows; integers default to descending)")
+    args = parser.parse_args(argv)
+    return run_filter(args.algorithm, filter_order(parser, args), args.column, args.quiet)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
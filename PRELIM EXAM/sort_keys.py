@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+SORT KEYS - key expressions, parsed once and compiled into a plain key function
+
+A key is one or more comma-separated terms, compared left to right:
+
+    lower(LastName)                 functions: int, float, len, lower, upper, str
+    lower(LastName), -int(ID)       '-' flips a numeric term against the rest of the key: in an
+                                    ascending sort equal names put the largest ID first, in a
+                                    descending sort (the whole key reversed) the smallest
+    LastName, -ID                   a bare column is its menu key, so this is the line above
+    str(LastName), str(FirstName)   str() compares the raw text
+    len(FirstName), "Last Name"     quote column names that are not identifiers
+
+The expression becomes a single function: operator.itemgetter when every term is
+str(<column>) (no Python frame per row at all), otherwise one generated lambda with
+the column lookups and conversions inlined, e.g. `lambda r: (r['LastName'].lower(),
+-int(r['ID']))`, so nothing about the expression is decided again per row.
+The generated source is registered with linecache and tagged `# phase: key_extract`,
+so tracebacks show it and the phase profiler counts it as key extraction.
+
+The tools' column menus map onto expressions: ID is int(ID), every other column
+lower(<column>), the keys they always used. A bare column name means the same thing
+alone or as a term of a list, anywhere a key is asked for; str(LastName) is its raw text.
+
+Usage:
+    python sort_keys.py "lower(LastName), -int(ID)" generated_data.csv
+"""
+
+import argparse
+import functools
+import linecache
+import re
+import sys
+import time
+from collections import deque
+from operator import itemgetter
+
+# function -> (argument type, result type, code template)
+FUNCTIONS = {
+    'int': ('any', 'number', "int({})"),
+    'float': ('any', 'number', "float({})"),
+    'len': ('text', 'number', "len({})"),
+    'lower': ('text', 'text', "{}.lower()"),
+    'upper': ('text', 'text', "{}.upper()"),
+    'str': ('any', 'text', "str({})"),
+}
+DEFAULT_KEYS = {'ID': 'int(ID)'} # menu column -> expression; other columns sort case-insensitively
+COST_SAMPLE = 20000 # rows timed when reporting a key's cost
+_TOKEN = re.compile(r"\s*(?:(?P<name>[A-Za-z_]\w*)|(?P<quoted>\"[^\"]*\"|'[^']*')|(?P<op>[(),-]))")
+_IDENTIFIER = re.compile(r"[A-Za-z_]\w*")
+
+
+class KeyExpressionError(ValueError):
+    pass
+
+# ============================================================================
+# PARSER
+# ============================================================================
+
+def _tokens(text):
+    pos, tokens = 0, []
+    text = text.rstrip()
+    while pos < len(text):
+        match = _TOKEN.match(text, pos)
+        if not match:
+            raise KeyExpressionError(f"unexpected {text[pos:].strip()[:10]!r} at position {pos + 1}")
+        kind = match.lastgroup
+        value = match.group(kind)
+        tokens.append((kind, value[1:-1] if kind == 'quoted' else value, pos + 1))
+        pos = match.end()
+    return tokens
+
+
+def parse(text):
+    """[(negated, node)] where node is ('column', name) or ('call', function, node)"""
+    tokens = _tokens(text)
+    if not tokens:
+        raise KeyExpressionError("empty key expression")
+    pos = 0
+
+    def peek(value=None):
+        if pos < len(tokens) and (value is None or tokens[pos][1] == value and tokens[pos][0] == 'op'):
+            return tokens[pos]
+        return None
+
+    def expect(value):
+        nonlocal pos
+        if not peek(value):
+            where = f"at position {tokens[pos][2]}" if pos < len(tokens) else "at the end"
+            raise KeyExpressionError(f"expected {value!r} {where}")
+        pos += 1
+
+    def expr():
+        nonlocal pos
+        if pos >= len(tokens):
+            raise KeyExpressionError("expression ends too early")
+        kind, value, at = tokens[pos]
+        if kind == 'op':
+            raise KeyExpressionError(f"unexpected {value!r} at position {at}")
+        pos += 1
+        if kind == 'name' and peek('('):
+            if value not in FUNCTIONS:
+                raise KeyExpressionError(f"unknown function {value!r} (available: {', '.join(FUNCTIONS)})")
+            expect('(')
+            inner = expr()
+            expect(')')
+            return ('call', value, inner)
+        return ('column', value)
+
+    terms = []
+    while True:
+        negated = bool(peek('-'))
+        pos += negated
+        terms.append((negated, expr()))
+        if pos == len(tokens):
+            return terms
+        expect(',')
+
+# ============================================================================
+# COMPILER
+# ============================================================================
+
+def _menu_node(node):
+    """A bare column term stands for its menu key: int(ID), lower(<any other column>)"""
+    if node[0] != 'column':
+        return node
+    if node[1] in DEFAULT_KEYS:
+        return parse(DEFAULT_KEYS[node[1]])[0][1]
+    return ('call', 'lower', node)
+
+
+def _raw_column(node):
+    """Column name if the node is str(<column>), the raw text itemgetter returns"""
+    if node[0] == 'call' and node[1] == 'str' and node[2][0] == 'column':
+        return node[2][1]
+    return None
+
+
+def _code(node):
+    """(python source, type, columns used) of one node"""
+    if node[0] == 'column':
+        return f"r[{node[1]!r}]", 'text', [node[1]]
+    _, function, inner = node
+    code, kind, columns = _code(inner)
+    wants, result, template = FUNCTIONS[function]
+    if wants == 'text' and kind != 'text':
+        raise KeyExpressionError(f"{function}() needs text, not a number")
+    return template.format(code), result, columns
+
+
+def describe(node):
+    if node[0] == 'column':
+        return node[1] if _IDENTIFIER.fullmatch(node[1]) else repr(node[1])
+    return f"{node[1]}({describe(node[2])})"
+
+
+@functools.lru_cache(maxsize=64)
+def compile_key(text):
+    """
+    Key function for an expression, plus the source it was compiled to.
+
+    Returns (key, source, columns); the same expression is only compiled once.
+    """
+    terms = parse(text)
+    nodes = [_menu_node(node) for _, node in terms]
+    names = [_raw_column(node) for node in nodes]
+    if not any(negated for negated, _ in terms) and all(names):
+        return itemgetter(*names), f"itemgetter({', '.join(map(repr, names))})", tuple(names)
+    parts, columns = [], []
+    for (negated, written), node in zip(terms, nodes):
+        code, kind, used = _code(node)
+        if negated:
+            if kind != 'number':
+                raise KeyExpressionError(f"'-' needs a number: use -int({describe(written)}) or -float(...)")
+            code = f"-{code}"
+        parts.append(code)
+        columns.extend(used)
+    body = parts[0] if len(parts) == 1 else f"({', '.join(parts)})"
+    source = f"key = lambda r: {body} # phase: key_extract\n"
+    filename = f"<key {text}>"
+    linecache.cache[filename] = (len(source), None, [source], filename) # tracebacks and the phase profiler
+    namespace = {'__builtins__': {}, 'int': int, 'float': float, 'len': len, 'str': str}
+    exec(compile(source, filename, 'exec'), namespace)
+    return namespace['key'], f"lambda r: {body}", tuple(dict.fromkeys(columns))
+
+
+def column_expression(column):
+    """Expression behind a menu column: int(ID), lower(<anything else>)"""
+    if column in DEFAULT_KEYS:
+        return DEFAULT_KEYS[column]
+    return f"lower({column if _IDENTIFIER.fullmatch(column) else repr(column)})"
+
+
+def expression_for(spec):
+    """A menu column name ('LastName') becomes its expression; expressions pass through"""
+    return column_expression(spec) if _IDENTIFIER.fullmatch(spec) else spec
+
+
+def key_for(spec):
+    """Key function for a menu column name ('LastName') or a key expression ('lower(LastName), -int(ID)')"""
+    return compile_key(expression_for(spec))[0]
+
+
+def check_key(spec, rows):
+    """Raise KeyExpressionError unless the key applies to these rows (unknown column, bad int(), ...)"""
+    spec = expression_for(spec)
+    key, _, columns = compile_key(spec)
+    if not rows:
+        return
+    missing = [c for c in columns if c not in rows[0]]
+    if missing:
+        raise KeyExpressionError(f"no column {missing[0]!r} (columns: {', '.join(rows[0])})")
+    step = max(1, len(rows) // 100)
+    for row in rows[::step]: # a spread sample, so a bad conversion fails now rather than mid-sort
+        try:
+            key(row)
+        except (TypeError, ValueError) as e:
+            raise KeyExpressionError(f"{spec}: {e} (row {row})") from None
+
+
+def key_cost(spec, rows, sample=COST_SAMPLE):
+    """(nanoseconds per row, compiled source) timed over up to `sample` rows"""
+    key, source, _ = compile_key(expression_for(spec))
+    sample = rows[:sample]
+    start = time.perf_counter()
+    deque(map(key, sample), maxlen=0)
+    elapsed = time.perf_counter() - start
+    return (elapsed / len(sample) * 1e9 if sample else 0.0), source
+
+# ============================================================================
+# COMMAND LINE
+# ============================================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile a key expression and time it on a CSV file")
+    parser.add_argument('expression', help="e.g. \"lower(LastName), -int(ID)\"")
+    parser.add_argument('dataset', nargs='?', help="CSV file to check and time the key on")
+    args = parser.parse_args(argv)
+    try:
+        _, source, _ = compile_key(expression_for(args.expression))
+        print(f"{args.expression}  ->  {source}")
+        if args.dataset:
+            from dataset_cache import load_csv
+            rows, _ = load_csv(args.dataset)
+            check_key(args.expression, rows)
+            ns, _ = key_cost(args.expression, rows)
+            print(f"{ns:.0f} ns per row (~{ns * len(rows) / 1e9:.3f}s for one pass over {len(rows):,} rows)")
+    except (OSError, KeyExpressionError) as e:
+        print(f"❌ {e}")
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
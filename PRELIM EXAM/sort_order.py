@@ -0,0 +1,52 @@
+"""
+SORT ORDER - ascending/descending as a parameter of every engine, without a second copy of it
+
+Integer engines sort descending natively; ascending order negates the values, runs
+the same code and negates them back. Key-based engines sort ascending natively and are
+stable; descending order reverses the input, runs the same code and reverses the
+result, which leaves equal keys in their input order. Either way the cost is two O(n)
+passes around the sort and nothing per comparison, and adaptive sorts (bubble,
+insertion) still finish early on input that is already in the requested order.
+"""
+
+import functools
+
+
+def ordered_ints(func):
+    """Add descending=True to an engine that sorts a list of ints in place, largest first"""
+    @functools.wraps(func)
+    def engine(arr, *args, descending=True, **kwargs):
+        if descending:
+            return func(arr, *args, **kwargs)
+        arr[:] = [-x for x in arr]
+        func(arr, *args, **kwargs)
+        arr[:] = [-x for x in arr]
+        return arr
+    return engine
+
+
+def ordered_keys(func):
+    """
+    Add descending=False to a stable engine called as func(data, key_func, ..., copy=True).
+
+    A resumed sort (start=...) continues from a checkpoint that is already reversed, and
+    a paused one (returns None) is saved before the final reversal, so checkpoints of a
+    descending sort must be resumed with descending=True.
+    """
+    @functools.wraps(func)
+    def engine(data, key_func, *args, descending=False, copy=True, **kwargs):
+        if not descending:
+            return func(data, key_func, *args, copy=copy, **kwargs)
+        arr = data.copy() if copy else data
+        if 'start' not in kwargs:
+            arr.reverse()
+        result = func(arr, key_func, *args, copy=False, **kwargs)
+        if result is not None:
+            result.reverse()
+        return result
+    return engine
+
+
+def order_label(column, descending):
+    """Column name as stored in the run history, so each order keeps its own baseline"""
+    return f"{column} desc" if descending else column
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+SORT RACE - several algorithms at once on identical copies of one dataset
+
+Every racer is a separate process pinned to its own core (where the OS allows it).
+Integer datasets are written once to a shared-memory block that each racer copies
+into its own list; CSV racers read the memory-mapped dataset cache snapshot. All
+racers load first and then start on the same signal, so a race takes as long as
+the slowest algorithm instead of the sum of all of them.
+
+Usage:
+    python sort_race.py dataset.txt [--algorithms bubble,quick,merge] [--rows 100000]
+    python sort_race.py generated_data.csv --column LastName [--algorithms merge,mergebuffered]
+"""
+
+import argparse
+import multiprocessing
+import os
+import queue
+import sys
+import time
+from array import array
+from multiprocessing import shared_memory
+
+from sort_verify import verify
+
+# ============================================================================
+# RACER PROCESS
+# ============================================================================
+
+def available_cpus():
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def _pin(cpu):
+    """Pin this process to one core; None when the OS has no affinity API (Windows, macOS)"""
+    if cpu is None or not hasattr(os, 'sched_setaffinity'):
+        return None
+    try:
+        os.sched_setaffinity(0, {cpu})
+        return cpu
+    except OSError:
+        return None
+
+
+def _load(spec):
+    """This racer's private copy of the data, plus run(arr, report), the sort key and direction"""
+    if spec['kind'] == 'ints':
+        from int_sorts import BY_KEY
+        func = BY_KEY[spec['algorithm']][1]
+        descending = spec['descending'] is not False # integer engines default to largest first
+        shm = shared_memory.SharedMemory(name=spec['shm'])
+        try:
+            with shm.buf[:spec['size'] * 8] as raw, raw.cast('q') as view:
+                data = view.tolist()
+        finally:
+            shm.close()
+        return data, lambda arr, report: func(arr, progress=report, descending=descending), None, descending
+
+    from dataset_cache import load_csv
+    from row_sorts import BY_KEY
+    from sort_keys import key_for
+    func = BY_KEY[spec['algorithm']][1]
+    key_func = key_for(spec['column'])
+    descending = bool(spec['descending'])
+    data, _ = load_csv(spec['path'], spec.get('rows'))
+    return data, lambda arr, report: func(arr, key_func, report, copy=False, descending=descending), key_func, descending
+
+
+def _racer(slot, spec, cpu, progress, go, events):
+    try:
+        pinned = _pin(cpu)
+        data, run, key, descending = _load(spec)
+        original = data[:] # the sort may work in place; the verifier needs the input order
+
+        def report(done, total):
+            progress[slot] = done / total if total else 1.0
+        events.put(('ready', slot, os.getpid(), pinned))
+        go.wait()
+        start = time.perf_counter()
+        result = run(data, report)
+        seconds = time.perf_counter() - start
+        finished = time.time()
+        progress[slot] = 1.0
+        ok = verify(original, result, key, descending).ok
+        events.put(('done', slot, seconds, ok, finished))
+    except Exception as e:
+        events.put(('failed', slot, f"{type(e).__name__}: {e}"))
+
+# ============================================================================
+# RACE CONTROLLER
+# ============================================================================
+
+class Race:
+    """
+    algorithms -- list of (key, display name); keys come from int_sorts.BY_KEY for
+                  integer data or from row_sorts.BY_KEY ('merge', 'merge_buffered') for CSV
+    data       -- list of ints, or
+    csv_path   -- CSV dataset (with column and optional rows)
+    descending -- sort order; None keeps each engine's own (integers descending, CSV ascending)
+
+    start() returns at once; call poll() until it returns True (e.g. from a Tk
+    after() loop), or use run() to block. Progress is fractions(), results ranked().
+    """
+
+    def __init__(self, algorithms, data=None, csv_path=None, column='ID', rows=None, pin=True, descending=None,
+                 baselines=None):
+        self.racers = [{'key': key, 'name': name, 'state': 'starting', 'seconds': None, 'ok': None,
+                        'cpu': None, 'pid': None, 'error': None} for key, name in algorithms]
+        self.data = data
+        self.csv_path = csv_path
+        self.column = column
+        self.rows = rows
+        self.pin = pin
+        self.descending = descending
+        self.baselines = baselines or {} # racer key -> key of the algorithm it is a faster variant of
+        self.size = len(data) if data is not None else None
+        self.cpus = available_cpus()
+        self.started = self.finished = None
+        self.last_finish = None # Wall-clock time the last racer finished (reported by the racer)
+        self.shm = None
+        self.procs = []
+
+    def start(self):
+        # Spawned, not forked: a forked racer would inherit the parent's threads (the GUI's Tk
+        # loop, a sort thread) and locks mid-state, and its copy-on-write pages of the parent
+        # heap would be dirtied by refcounts, adding noise to the times
+        ctx = multiprocessing.get_context('spawn')
+        self.progress = ctx.Array('d', len(self.racers), lock=False)
+        self.go = ctx.Event()
+        self.events = ctx.Queue()
+        if self.data is not None:
+            # One shared copy of the input; each racer turns it into its own list before the start
+            self.shm = shared_memory.SharedMemory(create=True, size=max(8, 8 * self.size))
+            self.shm.buf[:8 * self.size] = array('q', self.data).tobytes()
+            base = {'kind': 'ints', 'shm': self.shm.name, 'size': self.size, 'descending': self.descending}
+        else:
+            from dataset_cache import load_csv
+            self.size = len(load_csv(self.csv_path, self.rows)[0]) # Writes the snapshot the racers map
+            base = {'kind': 'csv', 'path': str(self.csv_path), 'rows': self.rows, 'column': self.column,
+                    'descending': self.descending}
+        for slot, racer in enumerate(self.racers):
+            cpu = self.cpus[slot % len(self.cpus)] if self.pin else None
+            proc = ctx.Process(target=_racer, daemon=True,
+                               args=(slot, dict(base, algorithm=racer['key']), cpu, self.progress, self.go, self.events))
+            proc.start()
+            self.procs.append(proc)
+        return self
+
+    def _handle(self, message):
+        kind, racer = message[0], self.racers[message[1]]
+        if kind == 'ready':
+            racer['state'], racer['pid'], racer['cpu'] = 'ready', message[2], message[3]
+        elif kind == 'done':
+            racer['state'], racer['seconds'], racer['ok'] = 'done', message[2], message[3]
+            self.last_finish = max(self.last_finish or 0.0, message[4])
+        else:
+            racer['state'], racer['error'] = 'failed', message[2]
+
+    def _drain(self):
+        while True:
+            try:
+                self._handle(self.events.get_nowait())
+            except queue.Empty:
+                break
+
+    def poll(self):
+        """Handle racer messages without blocking; True once every racer has finished"""
+        self._drain()
+        dead = [(r, p) for r, p in zip(self.racers, self.procs)
+                if r['state'] in ('starting', 'ready', 'running') and not p.is_alive()]
+        if dead:
+            self._drain() # Its last message may have arrived just before it exited
+            for racer, proc in dead:
+                if racer['state'] in ('starting', 'ready', 'running'):
+                    racer['state'], racer['error'] = 'failed', f"racer exited with code {proc.exitcode}"
+        if not self.go.is_set() and all(r['state'] != 'starting' for r in self.racers):
+            for racer in self.racers:
+                if racer['state'] == 'ready':
+                    racer['state'] = 'running'
+            self.started = time.time()
+            self.go.set() # Every copy is loaded: start them all together
+        if self.go.is_set() and all(r['state'] in ('done', 'failed') for r in self.racers):
+            if self.finished is None:
+                self.finished = self.last_finish or time.time()
+                self.close()
+            return True
+        return False
+
+    def fractions(self):
+        return list(self.progress)
+
+    def run(self, on_tick=None, interval=0.2):
+        """Start (if needed) and block until the race is over"""
+        if not self.procs:
+            self.start()
+        try:
+            while not self.poll():
+                if on_tick:
+                    on_tick(self)
+                time.sleep(interval)
+        finally:
+            self.close()
+        if on_tick:
+            on_tick(self)
+        return self.ranked()
+
+    def close(self):
+        for proc in self.procs:
+            proc.join(timeout=0 if self.finished else 1)
+            if proc.is_alive():
+                proc.terminate()
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+    @property
+    def wall_seconds(self):
+        if self.started is None:
+            return None
+        return (self.finished or time.time()) - self.started
+
+    def ranked(self):
+        """Finished racers fastest first, then the failed ones"""
+        done = sorted((r for r in self.racers if r['state'] == 'done'), key=lambda r: r['seconds'])
+        return done + [r for r in self.racers if r['state'] != 'done']
+
+# ============================================================================
+# REPORTING
+# ============================================================================
+
+def format_progress(race, width=30):
+    lines = []
+    for racer, fraction in zip(race.racers, race.fractions()):
+        filled = int(width * fraction)
+        state = f"{racer['seconds']:.4f}s" if racer['state'] == 'done' else racer['state']
+        lines.append(f"  {racer['name']:<18}|{'█' * filled}{'-' * (width - filled)}| {fraction * 100:5.1f}%  {state}")
+    return lines
+
+
+def format_race(race):
+    ranked = race.ranked()
+    finished = [r for r in ranked if r['state'] == 'done']
+    fastest = finished[0]['seconds'] if finished else None
+    slowest = finished[-1]['seconds'] if finished else None
+    lines = [f"{'RANK':<6}{'ALGORITHM':<20}{'TIME':>12}{'SPEEDUP':>10}{'vs FASTEST':>12}{'CORE':>6}  SORTED",
+             "-" * 74]
+    for rank, r in enumerate(ranked, 1):
+        if r['state'] != 'done':
+            lines.append(f"{'-':<6}{r['name']:<20}  ✗ {r['error'] or r['state']}")
+            continue
+        speedup = slowest / r['seconds'] if r['seconds'] > 0 else float('inf')
+        relative = r['seconds'] / fastest if fastest > 0 else 1.0
+        core = '-' if r['cpu'] is None else str(r['cpu'])
+        lines.append(f"{rank:<6}{r['name']:<20}{r['seconds']:>11.4f}s{speedup:>9.2f}x{relative:>11.2f}x"
+                     f"{core:>6}  {'✓' if r['ok'] else '✗'}")
+    lines.append("-" * 74)
+    lines.append("SPEEDUP = slowest time / this time;  vs FASTEST = this time / fastest time")
+    done = {r['key']: r for r in finished}
+    for key, base in race.baselines.items():
+        if key in done and base in done and done[key]['seconds'] > 0:
+            lines.append(f"{done[key]['name']}: {done[base]['seconds'] / done[key]['seconds']:.2f}x faster "
+                         f"than {done[base]['name']}")
+    if finished:
+        total = sum(r['seconds'] for r in finished)
+        lines.append(f"Race wall time {race.wall_seconds:.2f}s for {race.size:,} elements "
+                     f"(running them one after another: {total:.2f}s)")
+    if len(race.racers) > len(race.cpus):
+        lines.append(f"⚠️  {len(race.racers)} racers shared {len(race.cpus)} core(s), so times include CPU contention")
+    return "\n".join(lines)
+
+
+def run_in_terminal(race):
+    """Blocking race with a redrawn multi-line progress display"""
+    drawn = [0]
+
+    def tick(r):
+        lines = format_progress(r)
+        if drawn[0]:
+            sys.stdout.write(f"\033[{drawn[0]}F") # Back to the top of the previous frame
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
+        drawn[0] = len(lines)
+    race.run(on_tick=tick)
+    print()
+    print(format_race(race))
+    return race
+
+# ============================================================================
+# COMMAND LINE
+# ============================================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Race sorting algorithms on one dataset at the same time")
+    parser.add_argument('dataset', help="integers one per line, or a CSV with ID,FirstName,LastName")
+    parser.add_argument('--algorithms', default=None, help="comma-separated list (default: all)")
+    parser.add_argument('--rows', type=int, default=None, help="only the first N rows")
+    parser.add_argument('--column', default='ID', help="CSV column to sort by")
+    parser.add_argument('--no-pin', action='store_true', help="do not pin racers to cores")
+    parser.add_argument('--order', choices=['ascending', 'descending'], default=None,
+                        help="default: descending for integers, ascending for CSV columns")
+    args = parser.parse_args(argv)
+    descending = None if args.order is None else args.order == 'descending'
+
+    wanted = [a.strip().lower().replace('-', '_') for a in args.algorithms.split(',')] if args.algorithms else None
+    if args.dataset.lower().endswith('.csv'):
+        from row_sorts import ALGORITHMS, BASELINES
+        valid = {key.replace('_', ''): key for key, _, _ in ALGORITHMS} # mergebuffered = merge_buffered
+        wanted = [w.replace('_', '') for w in wanted] if wanted else None
+    else:
+        from dataset_cache import load_ints
+        from int_sorts import ALGORITHMS, BASELINES
+        valid = {key: key for key, _, _, _ in ALGORITHMS}
+    unknown = [w for w in wanted or [] if w not in valid]
+    if unknown:
+        parser.error(f"unknown algorithm(s) {', '.join(unknown)}; choose from {', '.join(valid)}")
+    if args.dataset.lower().endswith('.csv'):
+        chosen = [(key, name) for key, name, _ in ALGORITHMS if not wanted or key.replace('_', '') in wanted]
+        race = Race(chosen, csv_path=args.dataset, column=args.column, rows=args.rows, pin=not args.no_pin,
+                    descending=descending, baselines=BASELINES)
+    else:
+        chosen = [(key, name) for key, name, _, _ in ALGORITHMS if not wanted or key in wanted]
+        data, _ = load_ints(args.dataset, args.rows)
+        race = Race(chosen, data=data, pin=not args.no_pin, descending=descending, baselines=BASELINES)
+    print(f"🏁 Racing {len(chosen)} algorithm(s) on {args.dataset} across {min(len(chosen), len(race.cpus))} core(s)")
+    run_in_terminal(race)
+    return 0 if all(r['state'] == 'done' and r['ok'] for r in race.racers) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
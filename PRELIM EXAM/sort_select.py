@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+SORT SELECT - median, percentiles and the k-th value without sorting everything
+
+Reading one value at a known rank does not need a sort, only selection (introselect):
+
+  pivots   a random sample of the part being searched is sorted, and the pivot is taken
+           from it just outside the wanted ranks (Floyd-Rivest), so one pass throws
+           away everything on the far side of it. Only the side that holds a wanted
+           rank is ever built. Expected O(n), about 1.5 passes over the data for a median.
+  fallback after a few partitions that go wrong (a misleading sample, or one side
+           keeping more than 3/4 of the values), pivots come from the median of
+           medians of five instead, which guarantees O(n) whatever the input.
+  ranks    every rank asked for is answered by the same partitioning: a pivot between
+           two wanted ranks splits the work, a pivot outside all of them discards,
+           so several percentiles together still cost a fraction of a sort.
+
+A pass is a list comprehension of the values strictly below (or above) the pivot; how
+many equal the pivot follows from the lengths, so heavily duplicated data such as the
+lab's 1-9998 ints needs no extra counting pass. The input list is never modified.
+
+Percentiles interpolate linearly between the two nearest ranks for numbers (the usual
+definition, so the 50th percentile of an even count is the mean of the middle two);
+for text they take the lower of the two. CSV columns are read through their sort key
+(see sort_keys.py): ID as a number, names case-insensitively, or any key expression.
+
+Usage:
+    python sort_select.py ../PRELIM-LAB-WORK-1/dataset.txt --percentiles 50,90,99
+    python sort_select.py generated_data.csv --column "len(LastName)" --rank 1 --rank -1 --compare
+"""
+
+import argparse
+import math
+import random
+import sys
+import time
+from pathlib import Path
+
+DEFAULT_PERCENTILES = (50, 90, 99)
+SMALL = 1024 # below this a part is sorted instead of partitioned
+BAD_SPLITS = 3 # partitions gone wrong before switching to median-of-medians
+
+# ============================================================================
+# SELECTION
+# ============================================================================
+
+def median_of_medians(values):
+    """Pivot with at least ~30% of the values on either side, found in O(n)"""
+    medians = [sorted(values[i:i + 5])[2] for i in range(0, len(values) - 4, 5)]
+    middle = len(medians) // 2
+    return select_ranks(medians, [middle], BAD_SPLITS)[0][middle]
+
+
+def _sample_pivot(part, wanted):
+    """(pivot, side to build: 'lower', 'upper' or 'both') for the local ranks `wanted`, from a sorted sample"""
+    size = len(part)
+    s = min(size, max(SMALL, int(size ** (2 / 3))))
+    sample = sorted(random.sample(part, s))
+    margin = int(2 * s ** 0.5) + 1 # about 4 standard deviations of a sample rank
+    at = [k * (s - 1) // (size - 1) for k in wanted]
+    # The widest stretch without a wanted rank: below them all, above them all, or between two
+    cuts = []
+    if at[0] - margin >= 0:
+        cuts.append((wanted[0], sample[at[0] - margin], 'upper'))
+    if at[-1] + margin < s:
+        cuts.append((size - 1 - wanted[-1], sample[at[-1] + margin], 'lower'))
+    for (k1, a1), (k2, a2) in zip(zip(wanted, at), zip(wanted[1:], at[1:])):
+        if a2 - a1 >= 2:
+            cuts.append((k2 - k1, sample[(a1 + a2) // 2], 'both'))
+    if not cuts:
+        return sample[s // 2], 'both'
+    _, pivot, build = max(cuts, key=lambda cut: cut[0])
+    return pivot, build
+
+
+def select_ranks(values, ranks, bad_splits=0):
+    """
+    Values at 0-based ranks of `values` in ascending order, without sorting them all.
+
+    Returns ({rank: value}, partition passes made); `values` is left as it was.
+    """
+    n = len(values)
+    for k in ranks:
+        if not 0 <= k < n:
+            raise IndexError(f"rank {k} is outside 0..{n - 1}")
+    found, passes = {}, 0
+    pending = [(values, 0, sorted(set(ranks)), bad_splits)] # (part, rank of its first value, ranks in it, ...)
+    while pending:
+        part, offset, wanted, bad = pending.pop()
+        size = len(part)
+        if size <= SMALL:
+            ordered = sorted(part)
+            for k in wanted:
+                found[k] = ordered[k - offset]
+            continue
+        if bad >= BAD_SPLITS:
+            pivot, build = median_of_medians(part), 'both'
+        else:
+            pivot, build = _sample_pivot(part, [k - offset for k in wanted])
+        lower = [x for x in part if x < pivot] if build != 'upper' else None
+        upper = [x for x in part if x > pivot] if build != 'lower' else None
+        # Ranks past the built side are equal to the pivot, or there if the sample misled us
+        if upper is None and wanted[-1] >= offset + len(lower):
+            upper = [x for x in part if x > pivot]
+        if lower is None and wanted[0] < offset + size - len(upper):
+            lower = [x for x in part if x < pivot]
+        passes += (lower is not None) + (upper is not None)
+        lower_end = offset + len(lower) if lower is not None else offset
+        upper_start = offset + size - len(upper) if upper is not None else offset + size
+        left = [k for k in wanted if k < lower_end]
+        right = [k for k in wanted if k >= upper_start]
+        bad += (build == 'upper' and bool(left)) or (build == 'lower' and bool(right))
+        for k in wanted:
+            if lower_end <= k < upper_start:
+                found[k] = pivot
+        if right:
+            pending.append((upper, upper_start, right, bad + (len(upper) > size * 3 // 4)))
+        if left:
+            pending.append((lower, offset, left, bad + (len(lower) > size * 3 // 4)))
+    return found, passes
+
+
+def select(values, k):
+    """The k-th smallest value (0-based) in expected O(n)"""
+    return select_ranks(values, [k])[0][k]
+
+# ============================================================================
+# PERCENTILES AND RANKS
+# ============================================================================
+
+class OrderStatistics:
+    def __init__(self, size, label, seconds, passes):
+        self.size = size
+        self.label = label
+        self.seconds = seconds
+        self.passes = passes
+        self.percentiles = [] # (percent, value)
+        self.ranks = [] # (rank as asked: 1 = smallest, -1 = largest, value)
+
+    def values(self):
+        """Every answer, in the order asked"""
+        return [v for _, v in self.percentiles] + [v for _, v in self.ranks]
+
+    def format(self):
+        asked = len(self.percentiles) + len(self.ranks)
+        lines = [f"  Values             : {self.size:,}",
+                 f"  Selected in        : {self.seconds:.4f}s ({asked} answer(s) from {self.passes} "
+                 f"partition pass(es), no full sort)"]
+        if self.percentiles:
+            lines.append(f"\n  {'PERCENTILE':>12}  {self.label.upper()}")
+            lines.extend(f"  {_percent(p):>12}  {_show(v)}" for p, v in self.percentiles)
+        if self.ranks:
+            lines.append(f"\n  {'RANK':>12}  {self.label.upper()}")
+            lines.extend(f"  {_rank(k):>12}  {_show(v)}" for k, v in self.ranks)
+        return "\n".join(lines)
+
+
+def _percent(p):
+    return f"{p:g}%" + (" (median)" if p == 50 else "")
+
+
+def _rank(k):
+    return {1: "1 (min)", -1: "-1 (max)"}.get(k, f"{k:,}")
+
+
+def _show(value):
+    if isinstance(value, float):
+        return f"{value:,.10g}"
+    return f"{value:,}" if isinstance(value, int) else str(value)
+
+
+def rank_index(k, n):
+    """1-based rank (negative counts from the largest, -1 = max) -> 0-based index"""
+    index = k - 1 if k > 0 else n + k
+    if k == 0 or not 0 <= index < n:
+        raise ValueError(f"rank {k} is outside 1..{n:,} (or -1..-{n:,} from the largest)")
+    return index
+
+
+def parse_percentiles(text):
+    """'50, 90, 99.9' or 'median' -> [50.0, 90.0, 99.9]"""
+    percentiles = []
+    for part in text.replace(' ', '').split(','):
+        if not part:
+            continue
+        try:
+            value = 50.0 if part.lower() == 'median' else float(part.rstrip('%'))
+        except ValueError:
+            raise ValueError(f"percentile {part!r} is not a number") from None
+        if not 0 <= value <= 100:
+            raise ValueError(f"percentile {part} is outside 0-100")
+        percentiles.append(value)
+    return percentiles
+
+
+def order_statistics(values, percentiles=DEFAULT_PERCENTILES, ranks=(), label='value'):
+    """Percentiles (0-100) and 1-based ranks of `values`, all from one multi-rank selection"""
+    n = len(values)
+    if not n:
+        raise ValueError("no values to select from")
+    numeric = isinstance(values[0], (int, float))
+    positions = [p / 100 * (n - 1) for p in percentiles]
+    wanted = {math.floor(h) for h in positions}
+    if numeric:
+        wanted.update(math.ceil(h) for h in positions)
+    indexes = [rank_index(k, n) for k in ranks]
+    start = time.perf_counter()
+    found, passes = select_ranks(values, wanted | set(indexes))
+    result = OrderStatistics(n, label, time.perf_counter() - start, passes)
+    for p, h in zip(percentiles, positions):
+        low = found[math.floor(h)]
+        if numeric and h != math.floor(h):
+            low += (found[math.ceil(h)] - low) * (h - math.floor(h))
+        result.percentiles.append((p, low))
+    result.ranks = [(k, found[i]) for k, i in zip(ranks, indexes)]
+    return result
+
+
+def compare_with_sort(values, result, percentiles=(), ranks=()):
+    """(seconds sorted() takes, whether it gives the same answers) - C Timsort, the fastest full sort here"""
+    start = time.perf_counter()
+    ordered = sorted(values)
+    seconds = time.perf_counter() - start
+    check = order_statistics(ordered, percentiles, ranks, result.label)
+    return seconds, check.values() == result.values()
+
+
+def key_values(rows, column):
+    """A CSV column (or key expression) as the values its sort key compares"""
+    from sort_keys import check_key, key_for
+    check_key(column, rows)
+    return list(map(key_for(column), rows))
+
+# ============================================================================
+# COMMAND LINE
+# ============================================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Median, percentiles and rank-k values without a full sort")
+    parser.add_argument('dataset', help="integers one per line, or a CSV with a header")
+    parser.add_argument('--column', default='ID', help="CSV column or key expression (default: ID)")
+    parser.add_argument('--percentiles', default=None,
+                        help=f"comma-separated, e.g. 50,90,99.9 (default: {','.join(map(str, DEFAULT_PERCENTILES))}, "
+                             f"or none when --rank is given)")
+    parser.add_argument('--rank', type=int, action='append', default=[],
+                        help="value at this 1-based rank, negative from the largest (repeatable)")
+    parser.add_argument('--compare', action='store_true', help="also time a full sorted() and check the answers")
+    args = parser.parse_args(argv)
+
+    from dataset_cache import load_csv, load_ints
+    try:
+        if args.percentiles is not None:
+            percentiles = parse_percentiles(args.percentiles)
+        else:
+            percentiles = [] if args.rank else list(DEFAULT_PERCENTILES)
+        if Path(args.dataset).suffix.lower() == '.csv':
+            rows, _ = load_csv(args.dataset)
+            values, label = key_values(rows, args.column), args.column
+        else:
+            (values, _), label = load_ints(args.dataset), 'value'
+        result = order_statistics(values, percentiles, args.rank, label)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 2
+    print(f"📏 {args.dataset}")
+    print(result.format())
+    if args.compare:
+        seconds, same = compare_with_sort(values, result, percentiles, args.rank)
+        print(f"\n  sorted() of all {len(values):,} values: {seconds:.4f}s "
+              f"({seconds / max(result.seconds, 1e-9):.1f}x the selection), "
+              f"{'same answers' if same else 'DIFFERENT answers'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,432 @@
+#!/usr/bin/env python3
+"""
+SORT JOB SERVICE - asyncio job server and CLI client for shared sort hosts
+
+Jobs (dataset, column, algorithm) are queued by the server and run on a bounded
+process pool using the row sort engines from row_sorts.py. Status, progress
+and results stream back to the client as newline-delimited JSON.
+
+Usage:
+    python sort_service.py serve [--workers 4] [--queue 16] [--port 8765]
+    python sort_service.py submit generated_data.csv --column LastName --algorithm merge [--rows N] [--wait]
+    python sort_service.py status
+    python sort_service.py watch JOB_ID
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+from dataset_cache import load_csv
+from row_sorts import BY_KEY
+from run_history import STATE_DIR, RunHistory
+from sort_estimate import count_records, estimate, format_bytes, format_seconds, over_limits
+from sort_keys import key_for
+from sort_order import order_label
+from sort_verify import verify
+from timing_harness import measure
+
+DEFAULT_SOCKET = STATE_DIR / "sortd.sock"
+DEFAULT_PORT = 8765
+JOB_OUTPUT_DIR = STATE_DIR / "jobs"
+USE_UNIX_SOCKET = hasattr(socket, 'AF_UNIX') and os.name != 'nt'
+
+# ============================================================================
+# WORKER PROCESS SIDE
+# ============================================================================
+
+_progress_queue = None
+
+
+def _init_worker(progress_queue):
+    global _progress_queue
+    _progress_queue = progress_queue
+
+
+def algorithm_by_name(name):
+    """Case-insensitive lookup in the row engine table"""
+    for algo_name, func in BY_KEY.values():
+        if algo_name.lower() == name.lower().replace('_', '').replace('-', ''):
+            return algo_name, func
+    raise ValueError(f"unknown algorithm {name!r} (choose from "
+                     f"{', '.join(n for n, _ in BY_KEY.values())})")
+
+
+def run_job(job_id, spec):
+    """Load, sort and export one job inside a pool process; returns a result dict"""
+    name, func = algorithm_by_name(spec['algorithm'])
+    column = spec['column']
+    last_report = [0.0]
+
+    def report(done, total):
+        # The engine's progress hook feeds the job's stream, at most 5 updates a second
+        now = time.monotonic()
+        if done == total or now - last_report[0] >= 0.2:
+            last_report[0] = now
+            _progress_queue.put((job_id, round(100.0 * done / max(1, total), 1)))
+
+    load_start = time.perf_counter()
+    rows, _ = load_csv(spec['dataset'], spec.get('rows')) # Repeat jobs on a dataset skip the parse
+    load_seconds = time.perf_counter() - load_start
+    if rows and column not in rows[0]:
+        raise ValueError(f"column {column!r} not in dataset")
+
+    key_func = key_for(column)
+    descending = bool(spec.get('descending'))
+    stats, result = measure(lambda arr: func(arr, key_func, report, copy=False, descending=descending), setup=rows.copy,
+                            repeats=1, warmup=0)
+    check = verify(rows, result, key_func, descending, stability=True)
+    if not check.ok:
+        raise RuntimeError(f"{name} produced a wrong result: {check.summary()}")
+
+    # Job ids restart at 1 with every server, so the start time keeps old results from being overwritten
+    stamp = time.strftime('%Y%m%d-%H%M%S')
+    output = Path(spec.get('output') or JOB_OUTPUT_DIR / f"job-{stamp}-{job_id}-{name.lower()}-{column.lower()}.txt")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        for row in result:
+            f.write(f"{row['ID']}, {row['FirstName']}, {row['LastName']}\n")
+    return {'algorithm': name, 'rows': len(result), 'seconds': stats.median,
+            'load_seconds': load_seconds, 'output': str(output), 'pid': os.getpid(),
+            'verified': check.summary()}
+
+# ============================================================================
+# SERVER
+# ============================================================================
+
+SPEC_FIELDS = {'dataset': str, 'column': str, 'algorithm': str} # required, non-empty
+
+
+def validate_spec(spec):
+    """Raise ValueError unless the submitted spec has the fields and types a job needs"""
+    if not isinstance(spec, dict):
+        raise ValueError("spec must be a JSON object")
+    for field, kind in SPEC_FIELDS.items():
+        if not spec.get(field):
+            raise ValueError(f"missing field {field!r}")
+        if not isinstance(spec[field], kind):
+            raise ValueError(f"field {field!r} must be a string")
+    rows = spec.get('rows')
+    if rows is not None and (isinstance(rows, bool) or not isinstance(rows, int) or rows < 1):
+        raise ValueError("field 'rows' must be a positive integer")
+    if not isinstance(spec.get('descending', False), bool):
+        raise ValueError("field 'descending' must be true or false")
+    if spec.get('output') is not None and not isinstance(spec['output'], str):
+        raise ValueError("field 'output' must be a file name")
+
+
+def output_path(name):
+    """Where a job may write: client-chosen names are only allowed inside JOB_OUTPUT_DIR"""
+    root = JOB_OUTPUT_DIR.resolve()
+    path = (root / name).resolve()
+    try:
+        path.relative_to(root)
+    except ValueError:
+        raise ValueError(f"output must be inside {root}") from None
+    if path == root:
+        raise ValueError("output must name a file")
+    return str(path)
+
+
+class Job:
+    def __init__(self, job_id, spec):
+        self.id = job_id
+        self.spec = spec
+        self.state = 'queued'
+        self.progress = 0.0
+        self.result = None
+        self.error = None
+        self.submitted = time.time()
+        self.estimate = None # Predicted time and memory, checked against the limits on submit
+        self.watchers = set()
+
+    def summary(self):
+        return {'job': self.id, 'state': self.state, 'progress': self.progress,
+                'algorithm': self.spec['algorithm'], 'column': self.spec['column'],
+                'dataset': self.spec['dataset'], 'result': self.result, 'error': self.error}
+
+
+class SortServer:
+    def __init__(self, workers=None, queue_size=16, max_seconds=None, max_memory_mb=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_seconds = max_seconds # None = SORTBENCH_MAX_SECONDS / SORTBENCH_MAX_MEMORY_MB
+        self.max_memory_mb = max_memory_mb
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.jobs = {}
+        self.next_id = 1
+        self.manager = multiprocessing.Manager()
+        self.progress_queue = self.manager.Queue()
+        # Spawned (not forked) workers, so they never inherit open client sockets
+        self.pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'),
+                                        initializer=_init_worker, initargs=(self.progress_queue,))
+        self.history = RunHistory()
+        # One thread for the history database (file hashing, SQLite), keeping it off the event loop
+        self.history_pool = ThreadPoolExecutor(1)
+
+    # -- event fan-out ------------------------------------------------------
+
+    def publish(self, job, event):
+        event = dict(event, job=job.id)
+        for watcher in list(job.watchers):
+            watcher.put_nowait(event)
+
+    def _relay_progress(self, loop):
+        """Thread: move (job_id, pct) tuples from the worker processes onto the event loop"""
+        while True:
+            item = self.progress_queue.get()
+            if item is None:
+                return
+            loop.call_soon_threadsafe(self._on_progress, *item)
+
+    def _on_progress(self, job_id, pct):
+        job = self.jobs.get(job_id)
+        if job and job.state == 'running':
+            job.progress = pct
+            self.publish(job, {'event': 'progress', 'pct': pct})
+
+    # -- scheduling ---------------------------------------------------------
+
+    async def dispatcher(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self.queue.get()
+            job.state = 'running'
+            self.publish(job, {'event': 'started'})
+            try:
+                job.result = await loop.run_in_executor(self.pool, run_job, job.id, job.spec)
+                job.state, job.progress = 'done', 100.0
+                self.publish(job, {'event': 'done', **job.result})
+                await loop.run_in_executor(self.history_pool, self._record, job)
+            except Exception as e:
+                job.state, job.error = 'failed', str(e)
+                self.publish(job, {'event': 'failed', 'error': str(e)})
+            finally:
+                self.queue.task_done()
+
+    def _record(self, job):
+        try:
+            self.history.record('server', job.spec['dataset'], job.result['rows'], job.result['algorithm'],
+                                job.result['seconds'], column=order_label(job.spec['column'], job.spec.get('descending')),
+                                predicted_seconds=job.estimate.seconds, predicted_bytes=int(job.estimate.peak_bytes))
+        except Exception as e:
+            print(f"⚠️  Could not record run history: {e}", file=sys.stderr)
+
+    async def submit(self, spec, wait):
+        validate_spec(spec)
+        if spec.get('output'):
+            spec['output'] = output_path(spec['output']) # never a path of the client's choosing elsewhere
+        spec['algorithm'], _ = algorithm_by_name(spec['algorithm'])
+        spec['dataset'] = str(Path(spec['dataset']).expanduser().resolve())
+        if not Path(spec['dataset']).exists():
+            raise ValueError(f"dataset not found: {spec['dataset']}")
+        # Admission control: nobody is there to confirm, so jobs over the limits are refused
+        loop = asyncio.get_running_loop()
+        rows = await loop.run_in_executor(None, count_records, spec['dataset'])
+        prediction = await loop.run_in_executor(self.history_pool, estimate, self.history, 'server',
+                                                spec['algorithm'], min(rows, spec.get('rows') or rows))
+        problems = over_limits(prediction, max_seconds=self.max_seconds, max_memory_mb=self.max_memory_mb)
+        if problems:
+            raise ValueError("; ".join(problems))
+        if self.queue.full() and not wait:
+            raise OverflowError(f"queue full ({self.queue.maxsize} jobs waiting); retry later or use --wait")
+        job = Job(self.next_id, spec)
+        job.estimate = prediction
+        self.next_id += 1
+        self.jobs[job.id] = job
+        await self.queue.put(job) # Backpressure: with --wait the client blocks until a slot frees up
+        return job
+
+    # -- connections ----------------------------------------------------------
+
+    async def handle(self, reader, writer):
+        async def send(obj):
+            writer.write((json.dumps(obj) + "\n").encode())
+            await writer.drain()
+        try:
+            line = await reader.readline()
+            if not line:
+                return
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                await send({'event': 'rejected', 'error': "request must be a JSON object"})
+                return
+            op = request.get('op')
+            if op == 'submit':
+                try:
+                    job = await self.submit(request.get('spec', {}), request.get('wait') is True)
+                except (ValueError, OverflowError) as e:
+                    await send({'event': 'rejected', 'error': str(e)})
+                    return
+                await send({'event': 'queued', 'job': job.id, 'position': self.queue.qsize(),
+                            'estimate': job.estimate.seconds, 'estimate_bytes': job.estimate.peak_bytes})
+                if request.get('watch'):
+                    await self.stream(job, send)
+            elif op == 'watch':
+                job_id = request.get('job')
+                job = self.jobs.get(job_id) if isinstance(job_id, int) else None
+                if not job:
+                    await send({'event': 'rejected', 'error': f"no such job {request.get('job')}"})
+                    return
+                await self.stream(job, send)
+            elif op == 'status':
+                await send({'event': 'status', 'workers': self.workers, 'queued': self.queue.qsize(),
+                            'jobs': [j.summary() for j in self.jobs.values()]})
+            else:
+                await send({'event': 'rejected', 'error': f"unknown op {op!r}"})
+        except (ConnectionError, json.JSONDecodeError):
+            pass
+        finally:
+            writer.close()
+
+    async def stream(self, job, send):
+        """Send the job's events until it finishes (starting with its current state)"""
+        events = asyncio.Queue()
+        job.watchers.add(events)
+        try:
+            await send({'event': 'state', **job.summary()})
+            while job.state not in ('done', 'failed'):
+                event = await events.get()
+                await send(event)
+            while not events.empty():
+                await send(events.get_nowait())
+        finally:
+            job.watchers.discard(events)
+
+    async def serve(self, port=None, path=None):
+        loop = asyncio.get_running_loop()
+        threading.Thread(target=self._relay_progress, args=(loop,), daemon=True).start()
+        dispatchers = [asyncio.create_task(self.dispatcher()) for _ in range(self.workers)]
+        if port is None and USE_UNIX_SOCKET:
+            path = Path(path or DEFAULT_SOCKET)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            if path.exists():
+                path.unlink()
+            umask = os.umask(0o177) # the socket is created 0600: only this user can submit jobs
+            try:
+                server = await asyncio.start_unix_server(self.handle, path=str(path))
+            finally:
+                os.umask(umask)
+            os.chmod(path, 0o600)
+            where = str(path)
+        else:
+            server = await asyncio.start_server(self.handle, '127.0.0.1', port or DEFAULT_PORT)
+            where = f"127.0.0.1:{port or DEFAULT_PORT}"
+        print(f"🖥️  Sort service listening on {where} with {self.workers} worker process(es), "
+              f"queue limit {self.queue.maxsize}", flush=True)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            for task in dispatchers:
+                task.cancel()
+            self.progress_queue.put(None)
+            self.pool.shutdown(cancel_futures=True)
+            self.history_pool.shutdown()
+            self.manager.shutdown()
+
+# ============================================================================
+# CLIENT
+# ============================================================================
+
+def request(message, port=None, path=None):
+    """Send one request and yield the JSON events the server streams back"""
+    if port is None and USE_UNIX_SOCKET:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(str(path or DEFAULT_SOCKET))
+    else:
+        sock = socket.create_connection(('127.0.0.1', port or DEFAULT_PORT))
+    with sock, sock.makefile('rwb') as stream:
+        stream.write((json.dumps(message) + "\n").encode())
+        stream.flush()
+        for line in stream:
+            yield json.loads(line)
+
+
+def print_event(event):
+    kind = event.get('event')
+    if kind == 'progress':
+        sys.stdout.write(f"\r   job {event['job']}: {event['pct']:5.1f}%")
+        sys.stdout.flush()
+    elif kind == 'queued':
+        print(f"📥 job {event['job']} queued (position {event['position']}, estimated "
+              f"{format_seconds(event['estimate'])}, +{format_bytes(event['estimate_bytes'])})")
+    elif kind == 'state':
+        print(f"ℹ️  job {event['job']} is {event['state']} ({event['progress']:.0f}%)")
+    elif kind == 'started':
+        print(f"🚀 job {event['job']} started")
+    elif kind == 'done':
+        print(f"\n✅ job {event['job']}: {event['algorithm']} sorted {event['rows']:,} rows in "
+              f"{event['seconds']:.4f}s (load {event['load_seconds']:.2f}s) -> {event['output']}")
+        print(f"   {event['verified']}")
+    elif kind == 'failed':
+        print(f"\n❌ job {event['job']} failed: {event['error']}")
+    elif kind == 'rejected':
+        print(f"❌ rejected: {event['error']}")
+    elif kind == 'status':
+        print(f"{event['workers']} worker(s), {event['queued']} queued")
+        for j in event['jobs']:
+            print(f"  #{j['job']:<4} {j['state']:<8} {j['progress']:5.1f}%  {j['algorithm']:<10} "
+                  f"{j['column']:<10} {Path(j['dataset']).name}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Shared sort job service")
+    parser.add_argument('--port', type=int, default=None, help="use TCP on localhost instead of the Unix socket")
+    parser.add_argument('--socket', default=None, help=f"Unix socket path (default: {DEFAULT_SOCKET})")
+    sub = parser.add_subparsers(dest='command', required=True)
+    serve = sub.add_parser('serve')
+    serve.add_argument('--workers', type=int, default=None, help="process pool size (default: CPU count)")
+    serve.add_argument('--queue', type=int, default=16, help="max queued jobs before submissions are refused")
+    serve.add_argument('--max-seconds', type=float, default=None,
+                       help="refuse jobs estimated to take longer (default: SORTBENCH_MAX_SECONDS or 600)")
+    serve.add_argument('--max-memory', type=float, default=None,
+                       help="refuse jobs estimated to need more MB (default: SORTBENCH_MAX_MEMORY_MB or 2048)")
+    submit = sub.add_parser('submit')
+    submit.add_argument('dataset')
+    submit.add_argument('--column', default='ID', choices=['ID', 'FirstName', 'LastName'])
+    submit.add_argument('--descending', action='store_true', help="largest first")
+    submit.add_argument('--algorithm', default='merge')
+    submit.add_argument('--rows', type=int, default=None)
+    submit.add_argument('--output', default=None, help=f"file name for the sorted rows, inside {JOB_OUTPUT_DIR}")
+    submit.add_argument('--wait', action='store_true', help="wait for queue space instead of being refused")
+    submit.add_argument('--detach', action='store_true', help="return after queueing instead of streaming")
+    sub.add_parser('status')
+    watch = sub.add_parser('watch')
+    watch.add_argument('job', type=int)
+    args = parser.parse_args(argv)
+
+    if args.command == 'serve':
+        try:
+            asyncio.run(SortServer(args.workers, args.queue, args.max_seconds, args.max_memory)
+                        .serve(args.port, args.socket))
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    if args.command == 'submit':
+        spec = {'dataset': str(Path(args.dataset).resolve()), 'column': args.column,
+                'algorithm': args.algorithm, 'rows': args.rows, 'descending': args.descending,
+                'output': args.output}
+        message = {'op': 'submit', 'spec': spec, 'wait': args.wait, 'watch': not args.detach}
+    elif args.command == 'watch':
+        message = {'op': 'watch', 'job': args.job}
+    else:
+        message = {'op': 'status'}
+    status = 0
+    for event in request(message, args.port, args.socket):
+        print_event(event)
+        if event.get('event') in ('failed', 'rejected'):
+            status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+SORT TUNING - per-machine cutoffs for the hybrid sorts
+
+Quick and merge sorts hand partitions of up to `cutoff` elements to insertion sort
+(binary insertion for rows), where Python's per-call and per-loop overhead makes the
+divide-and-conquer machinery slower than a simple loop. The best cutoff depends on the
+machine, the interpreter and what is compared (plain ints vs a key function over CSV
+rows), so `calibrate` times each engine over a range of cutoffs and saves the fastest
+to ~/.sortbench/tuning.json. The engines read that file once, when they are imported;
+without it they use the built-in defaults below.
+
+Usage:
+    python sort_tuning.py calibrate [--ints 20000] [--rows 10000] [--repeats 5]
+    python sort_tuning.py show
+    python sort_tuning.py reset
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+# Same folder as run_history.STATE_DIR; not imported from there because the engines
+# load this module at startup and the GUIs keep sqlite & co. off their launch path
+TUNING_FILE = Path(os.environ.get("SORTBENCH_HOME", Path.home() / ".sortbench")) / "tuning.json"
+
+# kind -> engine -> cutoff used when nothing has been calibrated
+DEFAULTS = {
+    'ints': {'quick': 16, 'merge': 16, 'merge_buffered': 16},
+    'rows': {'merge': 128, 'merge_buffered': 128},
+}
+# 1 = no hybrid (plain quick/merge sort). Binary insertion moves items with C-level
+# inserts, so it stays ahead of merging on much longer runs than the int loop does.
+CANDIDATES = {
+    'ints': (1, 4, 8, 12, 16, 24, 32, 48, 64),
+    'rows': (1, 8, 16, 32, 64, 96, 128, 192, 256),
+}
+ROW_COLUMN = 'LastName' # rows are calibrated on the string key, the usual sort column
+
+_saved = None
+
+# ============================================================================
+# CONFIG
+# ============================================================================
+
+def load_tuning(path=TUNING_FILE):
+    """The saved calibration, or {} when there is none (or it cannot be read)"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            tuning = json.load(f)
+        return tuning if isinstance(tuning.get('cutoffs'), dict) else {}
+    except (OSError, ValueError, AttributeError):
+        return {}
+
+
+def cutoff_for(kind, engine):
+    """Calibrated cutoff for an engine ('ints'/'rows', 'quick'/'merge'/...), else the default"""
+    global _saved
+    if _saved is None:
+        _saved = load_tuning().get('cutoffs', {})
+    return _valid(_saved.get(kind, {}).get(engine)) or DEFAULTS[kind][engine]
+
+
+def _valid(value):
+    return value if isinstance(value, int) and value >= 1 else None
+
+
+def save_tuning(tuning, path=TUNING_FILE):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix('.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(tuning, f, indent=2)
+    os.replace(tmp, path)
+    return path
+
+# ============================================================================
+# CALIBRATION
+# ============================================================================
+
+def _engines(kind):
+    """engine -> sort(arr, cutoff) working on the list it is given"""
+    if kind == 'ints':
+        import int_sorts
+        return {engine: (lambda func: lambda arr, c: func(arr, cutoff=c))(int_sorts.BY_KEY[engine][1])
+                for engine in DEFAULTS['ints']}
+    import row_sorts
+    from sort_keys import key_for
+    key = key_for(ROW_COLUMN)
+    return {engine: (lambda func: lambda arr, c: func(arr, key, copy=False, cutoff=c))(row_sorts.BY_KEY[engine][1])
+            for engine in DEFAULTS['rows']}
+
+
+def _dataset(kind, size, seed=20240101):
+    import random
+    import tempfile
+    import datagen
+    from dataset_cache import parse_csv
+    if kind == 'ints':
+        rng = random.Random(seed)
+        return [rng.randint(1, 9998) for _ in range(size)] # the lab datasets' range
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "calibration.csv"
+        datagen.write_csv(path, size, seed=seed)
+        return parse_csv(path)
+
+
+def calibrate(sizes, repeats=5, report=print):
+    """Time every engine at every cutoff; returns the tuning dict (not yet saved)"""
+    import platform
+    import time
+    from timing_harness import measure
+    tuning = {'calibrated': time.strftime("%Y-%m-%d %H:%M:%S"), 'host': platform.node(),
+              'python': platform.python_version(), 'sizes': sizes, 'cutoffs': {}, 'timings': {}}
+    for kind, size in sizes.items():
+        data = _dataset(kind, size)
+        report(f"\n{kind} ({size:,} {'values' if kind == 'ints' else 'rows, key ' + ROW_COLUMN}):")
+        for engine, sort in _engines(kind).items():
+            medians = {}
+            for c in CANDIDATES[kind]:
+                stats, _ = measure(lambda arr: sort(arr, c), setup=data.copy, repeats=repeats, warmup=1)
+                medians[c] = stats.median
+            best = min(medians, key=medians.get)
+            tuning['cutoffs'].setdefault(kind, {})[engine] = best
+            tuning['timings'].setdefault(kind, {})[engine] = {str(c): t for c, t in medians.items()}
+            plain = medians.get(1)
+            gain = f", {plain / medians[best]:.2f}x vs no cutoff" if plain else ""
+            report(f"  {engine:<15} best cutoff {best:>3} ({medians[best] * 1000:.1f} ms{gain})  "
+                   + " ".join(f"{c}:{t * 1000:.0f}" for c, t in medians.items()))
+    return tuning
+
+
+def format_tuning(tuning):
+    lines = []
+    if tuning:
+        lines.append(f"Calibrated {tuning.get('calibrated')} on {tuning.get('host')} (Python {tuning.get('python')})")
+    else:
+        lines.append("Not calibrated: using the built-in defaults")
+    saved = tuning.get('cutoffs', {})
+    for kind, engines in DEFAULTS.items():
+        for engine, default in engines.items():
+            value = _valid(saved.get(kind, {}).get(engine))
+            source = "calibrated" if value is not None else "default"
+            lines.append(f"  {kind:<5} {engine:<15} {value if value is not None else default:>3}  ({source})")
+    return "\n".join(lines)
+
+# ============================================================================
+# COMMAND LINE
+# ============================================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Calibrate the hybrid sort cutoffs for this machine")
+    sub = parser.add_subparsers(dest='command', required=True)
+    cal = sub.add_parser('calibrate', help="time each engine over a range of cutoffs and save the fastest")
+    cal.add_argument('--ints', type=int, default=20000, help="integers per timing run (default: 20000)")
+    cal.add_argument('--rows', type=int, default=10000, help="CSV rows per timing run (default: 10000)")
+    cal.add_argument('--repeats', type=int, default=5, help="timed runs per cutoff (default: 5)")
+    sub.add_parser('show', help="print the cutoffs the engines will use")
+    sub.add_parser('reset', help="delete the calibration and go back to the defaults")
+    args = parser.parse_args(argv)
+
+    if args.command == 'show':
+        print(TUNING_FILE)
+        print(format_tuning(load_tuning()))
+    elif args.command == 'reset':
+        if TUNING_FILE.exists():
+            TUNING_FILE.unlink()
+            print(f"Removed {TUNING_FILE}")
+        else:
+            print("Nothing to reset")
+    else:
+        sizes = {kind: size for kind, size in (('ints', args.ints), ('rows', args.rows)) if size > 0}
+        print(f"⏱️  Calibrating cutoffs ({args.repeats} runs each)...")
+        tuning = calibrate(sizes, max(1, args.repeats))
+        previous = load_tuning()
+        for kind in DEFAULTS.keys() - sizes.keys(): # skipped kinds keep their last calibration
+            for part in ('cutoffs', 'timings'):
+                if kind in previous.get(part, {}):
+                    tuning[part][kind] = previous[part][kind]
+        print(f"\n💾 Saved to {save_tuning(tuning)} - the tools pick it up on their next start")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
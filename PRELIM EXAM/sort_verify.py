@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+SORT VERIFIER - linear-time correctness checks for sort results and exported files
+
+  order       -- every neighbour pair is in order (one pass, reports the first break)
+  permutation -- the output holds exactly the input's items: compares an
+                 order-independent multiset hash of both (count + two 64-bit sums)
+  stability   -- items with equal keys keep their input order (rows only)
+
+Checks are timed on their own so they never count towards the sort time. Exported
+result files are verified by streaming them line by line.
+
+Usage:
+    python sort_verify.py sorted_1700000000.txt --input generated_data.csv --column LastName
+    python sort_verify.py sorted_ints.txt --input dataset.txt --descending
+"""
+
+import argparse
+import sys
+import time
+from itertools import chain, islice, repeat
+from operator import itemgetter
+
+_MASK = (1 << 64) - 1
+_SALT = 0x9E3779B97F4A7C15
+_CHUNK = 65536
+ROW_FIELDS = ('ID', 'FirstName', 'LastName')
+
+# ============================================================================
+# CHECKS
+# ============================================================================
+
+class MultisetHash:
+    """Order-independent fingerprint that can be fed in chunks"""
+
+    def __init__(self):
+        self.count = self.a = self.b = 0
+
+    def update(self, items):
+        # hash((x,)) and hash((x, SALT)) run the tuple hash's mixing rounds in C,
+        # so plain sums of them do not collide the way sums of raw ints would
+        self.count += len(items)
+        self.a = (self.a + sum(map(hash, zip(items)))) & _MASK
+        self.b = (self.b + sum(map(hash, zip(items, repeat(_SALT))))) & _MASK
+        return self
+
+    def digest(self):
+        return (self.count, self.a, self.b)
+
+
+def multiset_hash(items):
+    """(count, sum a, sum b) of ints, or of rows taken as (ID, FirstName, LastName) tuples"""
+    h = MultisetHash()
+    if items and isinstance(items[0], dict):
+        items = map(itemgetter(*ROW_FIELDS), items)
+    it = iter(items)
+    while True:
+        chunk = list(islice(it, _CHUNK))
+        if not chunk:
+            return h.digest()
+        h.update(chunk)
+
+
+def first_out_of_order(result, key=None, descending=False):
+    """Index i of the first pair with result[i] > result[i + 1] (or < when descending); -1 if sorted"""
+    keys = map(key, result) if key else iter(result)
+    try:
+        previous = next(keys)
+    except StopIteration:
+        return -1
+    for i, current in enumerate(keys):
+        if (current > previous) if descending else (current < previous):
+            return i
+        previous = current
+    return -1
+
+
+def first_unstable(original, result, key, ident=id):
+    """Index in `result` of the first equal-key pair that swapped input order; -1 if stable.
+    `ident` maps an item to something unique per input item (object identity by default)."""
+    positions = {ident(item): i for i, item in enumerate(original)}
+    previous_key = previous_pos = None
+    for i, item in enumerate(result):
+        k, pos = key(item), positions.get(ident(item), -1)
+        if i and k == previous_key and pos < previous_pos:
+            return i - 1
+        previous_key, previous_pos = k, pos
+    return -1
+
+# ============================================================================
+# REPORT
+# ============================================================================
+
+class Verification:
+    """Outcome of the checks that ran (None = not checked) and how long each took"""
+
+    def __init__(self, items):
+        self.items = items
+        self.order_index = None
+        self.permutation = None
+        self.unstable_index = None
+        self.notes = []
+        self.seconds = {}
+
+    @property
+    def sorted(self):
+        return self.order_index is not None and self.order_index < 0
+
+    @property
+    def stable(self):
+        return None if self.unstable_index is None else self.unstable_index < 0
+
+    @property
+    def ok(self):
+        """Correctly sorted; stability is reported but not required (not every algorithm is stable)"""
+        return self.sorted and self.permutation is not False
+
+    @property
+    def total_seconds(self):
+        return sum(self.seconds.values())
+
+    def summary(self):
+        """One-line result, e.g. '✓ order ✓ permutation ✓ stable (verified in 0.0123s)'"""
+        parts = []
+        if self.order_index is not None:
+            parts.append("✓ order" if self.sorted else f"✗ order (breaks after index {self.order_index})")
+        if self.permutation is not None:
+            parts.append("✓ permutation" if self.permutation else "✗ permutation (items lost or changed)")
+        if self.unstable_index is not None:
+            parts.append("✓ stable" if self.stable else f"✗ stable (equal keys swapped at index {self.unstable_index})")
+        parts += self.notes
+        return " ".join(parts) + f" (verified in {self.total_seconds:.4f}s)"
+
+
+def _timed(report, name, func, *args):
+    start = time.perf_counter()
+    value = func(*args)
+    report.seconds[name] = time.perf_counter() - start
+    return value
+
+
+def verify(original, result, key=None, descending=False, stability=False, expected=None):
+    """
+    Check `result` against `original` in O(n).
+
+    key        -- the sort key (None for plain values)
+    stability  -- also check equal keys kept their input order (needs distinct objects, i.e. rows)
+    expected   -- a multiset_hash() of the input taken earlier; used when `original`
+                  has since been sorted in place (pass original=None)
+    """
+    report = Verification(len(result))
+    report.order_index = _timed(report, 'order', first_out_of_order, result, key, descending)
+    if expected is None and original is not None:
+        expected = _timed(report, 'input hash', multiset_hash, original)
+    if expected is not None:
+        report.permutation = _timed(report, 'permutation', multiset_hash, result) == expected
+    if stability and report.permutation and original is not None and key is not None:
+        report.unstable_index = _timed(report, 'stability', first_unstable, original, result, key)
+    return report
+
+# ============================================================================
+# STREAMING EXPORT CHECK
+# ============================================================================
+
+def _export_records(path):
+    """Yield each exported record from any of the tools' formats:
+    'ID, First, Last' (console, service), fixed-width rows after a 3-line header (GUI),
+    CSV with an ID,FirstName,LastName header (batch) or one integer per line (lab tools)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        first = f.readline()
+        lines = chain([first], f)
+        if first.startswith("SORTED DATA EXPORT"):
+            f.readline(), f.readline() # 'Column: ... | Rows: ...' and the ==== rule
+            lines = f
+        elif tuple(p.strip() for p in first.split(',')) == ROW_FIELDS:
+            lines = f
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            fields = [p.strip() for p in line.split(',')] if ',' in line else line.split()
+            yield int(fields[0]) if len(fields) == 1 else tuple(fields)
+
+
+def _record_key(column):
+    if column is None:
+        return None
+    index = ROW_FIELDS.index(column)
+    return (lambda r: int(r[0])) if column == 'ID' else (lambda r: r[index].lower())
+
+
+def verify_export(path, column=None, descending=False, original=None):
+    """
+    Stream an exported result file and check it without loading it into memory.
+
+    column   -- row column the file was sorted by (None for integer files)
+    original -- the input (list of ints or row dicts) for the permutation and
+                stability checks; stability uses the ID column to match rows
+    """
+    key = _record_key(column)
+    report = Verification(0)
+    start = time.perf_counter()
+    expected = multiset_hash(original) if original is not None else None
+    if expected is not None:
+        report.seconds['input hash'] = time.perf_counter() - start
+    positions = None
+    if original is not None and column is not None:
+        positions = {row['ID']: i for i, row in enumerate(original)}
+        if len(positions) < len(original):
+            positions = None
+            report.notes.append("- stable (IDs are not unique)")
+
+    start = time.perf_counter()
+    digest = MultisetHash()
+    order_index = unstable_index = -1
+    previous_key = previous_pos = None
+    count = 0
+    chunk = []
+    for record in _export_records(path):
+        k = key(record) if key else record
+        if count and order_index < 0 and ((k > previous_key) if descending else (k < previous_key)):
+            order_index = count - 1
+        if positions is not None:
+            pos = positions.get(record[0], -1)
+            if count and unstable_index < 0 and k == previous_key and pos < previous_pos:
+                unstable_index = count - 1
+            previous_pos = pos
+        previous_key = k
+        count += 1
+        if expected is not None:
+            chunk.append(record)
+            if len(chunk) == _CHUNK:
+                digest.update(chunk)
+                chunk = []
+    if chunk:
+        digest.update(chunk)
+    report.seconds['stream'] = time.perf_counter() - start
+    report.items = count
+    report.order_index = order_index
+    if expected is not None:
+        report.permutation = digest.digest() == expected
+    if positions is not None:
+        report.unstable_index = unstable_index
+    return report
+
+# ============================================================================
+# COMMAND LINE
+# ============================================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verify an exported sort result by streaming it")
+    parser.add_argument('export', help="file written by one of the tools (rows or one integer per line)")
+    parser.add_argument('--input', default=None, help="original dataset, for the permutation and stability checks")
+    parser.add_argument('--column', default=None, choices=ROW_FIELDS, help="column the rows were sorted by")
+    parser.add_argument('--rows', type=int, default=None, help="the export covers only the first N input rows")
+    parser.add_argument('--descending', action='store_true', help="largest first (the lab tools' order)")
+    args = parser.parse_args(argv)
+
+    original = None
+    if args.input:
+        from dataset_cache import load_csv, load_ints
+        loader = load_csv if args.input.lower().endswith('.csv') else load_ints
+        original, _ = loader(args.input, args.rows)
+    report = verify_export(args.export, args.column, args.descending, original)
+    print(f"{args.export}: {report.items:,} records")
+    print(report.summary())
+    return 0 if report.ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
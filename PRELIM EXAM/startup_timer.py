@@ -0,0 +1,34 @@
+"""
+STARTUP TIMER - cold-start report for the GUI tools
+
+Launch a GUI with --startup-report to print how long each phase took, from the
+first line of the script to the first idle main loop (the window is interactive).
+For a per-module breakdown of the import phase use:
+    python -X importtime benchmarkguiv2.py 2> imports.log
+"""
+
+import sys
+import time
+
+
+class StartupTimer:
+    def __init__(self, started=None, enabled=None):
+        self.started = started if started is not None else time.perf_counter()
+        self.enabled = ('--startup-report' in sys.argv) if enabled is None else enabled
+        self.marks = []
+
+    def mark(self, label):
+        """Close the current phase under `label`"""
+        if self.enabled:
+            self.marks.append((label, time.perf_counter()))
+
+    def report(self, out=None):
+        if not self.enabled or not self.marks:
+            return
+        out = out or sys.stderr
+        print(f"{'STARTUP PHASE':<28}{'PHASE':>10}{'TOTAL':>10}", file=out)
+        previous = self.started
+        for label, at in self.marks:
+            print(f"{label:<28}{(at - previous) * 1000:>8.1f}ms{(at - self.started) * 1000:>8.1f}ms", file=out)
+            previous = at
+        out.flush()
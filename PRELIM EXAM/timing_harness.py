@@ -0,0 +1,171 @@
+"""
+TIMING HARNESS - repeated, GC-controlled measurements with summary statistics
+
+Setup (e.g. copying the input) runs outside the timed region, warmup runs are
+discarded, and every measured repeat is summarised as mean / median / stddev /
+95% confidence interval with Tukey-fence outlier detection.
+"""
+
+import gc
+import math
+import statistics
+import time
+import tracemalloc
+
+# Two-sided 95% critical values of Student's t for 1..30 degrees of freedom
+_T95 = [12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+        2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+        2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042]
+
+
+def t_critical(df):
+    if df < 1:
+        return float('nan')
+    return _T95[df - 1] if df <= len(_T95) else 1.96
+
+
+class TimingStats:
+    """Summary of the measured repeats (all values in seconds)"""
+
+    def __init__(self, samples, warmup=0, gc_disabled=True, gc_collections=0, memory=None):
+        self.samples = list(samples)
+        self.memory = memory
+        self.warmup = warmup
+        self.gc_disabled = gc_disabled
+        self.gc_collections = gc_collections
+        n = len(self.samples)
+        self.n = n
+        self.mean = statistics.fmean(self.samples)
+        self.median = statistics.median(self.samples)
+        self.min = min(self.samples)
+        self.max = max(self.samples)
+        self.stdev = statistics.stdev(self.samples) if n > 1 else 0.0
+        half = t_critical(n - 1) * self.stdev / math.sqrt(n) if n > 1 else float('nan')
+        self.ci95 = (self.mean - half, self.mean + half)
+        self.ci95_half = half
+        self.outliers = self._outliers()
+
+    def _outliers(self):
+        """Indexes of samples outside the 1.5 * IQR Tukey fences"""
+        if self.n < 4:
+            return []
+        q1, _, q3 = statistics.quantiles(self.samples, n=4, method='inclusive')
+        iqr = q3 - q1
+        lo, hi = q1 - 1.5 * iqr, q3 + 1.5 * iqr
+        return [i for i, s in enumerate(self.samples) if s < lo or s > hi]
+
+    @property
+    def relative_ci(self):
+        """CI half-width as a fraction of the mean (nan for a single sample)"""
+        return self.ci95_half / self.mean if self.n > 1 and self.mean > 0 else float('nan')
+
+    def summary(self):
+        """One-line human readable summary"""
+        if self.n == 1:
+            return f"{self.median:.6f}s (single run)"
+        text = (f"median {self.median:.6f}s | mean {self.mean:.6f}s ± {self.ci95_half:.6f}s (95% CI) "
+                f"| stdev {self.stdev:.6f}s | n={self.n}")
+        if self.outliers:
+            text += f" | {len(self.outliers)} outlier(s)"
+        return text
+
+    def memory_summary(self):
+        """One-line peak memory summary (empty when memory was not profiled)"""
+        if not self.memory:
+            return ""
+        m = self.memory
+        text = f"peak +{m['peak_bytes'] / 1e6:.2f} MB"
+        if m.get('list_allocations') is not None:
+            text += f" | {m['list_allocations']:,} list allocations"
+        return text
+
+    def as_dict(self):
+        return {
+            'samples': self.samples, 'n': self.n, 'warmup': self.warmup,
+            'mean': self.mean, 'median': self.median, 'stdev': self.stdev,
+            'ci95': list(self.ci95), 'min': self.min, 'max': self.max,
+            'outliers': self.outliers, 'gc_disabled': self.gc_disabled,
+            'gc_collections': self.gc_collections, 'memory': self.memory,
+        }
+
+
+def _start_memory_profile(alloc_stats):
+    gc.collect()
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    base, _ = tracemalloc.get_traced_memory()
+    return was_tracing, base, dict(alloc_stats) if alloc_stats is not None else None
+
+
+def _stop_memory_profile(token, alloc_stats):
+    was_tracing, base, allocs_before = token
+    _, peak = tracemalloc.get_traced_memory()
+    if not was_tracing:
+        tracemalloc.stop()
+    return {
+        'peak_bytes': max(0, peak - base),
+        'list_allocations': (alloc_stats['lists'] - allocs_before['lists']) if allocs_before else None,
+    }
+
+
+def measure(run, setup=None, repeats=5, warmup=1, disable_gc=True, on_repeat=None,
+            warmup_run=None, should_stop=None, memory=False, alloc_stats=None):
+    """
+    Time `run(setup())` `repeats` times after `warmup` discarded runs.
+
+    setup       -- builds the input for one run; never timed (default: no argument)
+    warmup_run  -- optional replacement for `run` during warmup (e.g. an
+                   instrumented variant that counts operations)
+    on_repeat   -- called as on_repeat(index, total, phase) between runs, outside
+                   the timed region, for progress reporting
+    should_stop -- polled between runs; measuring ends early when it returns True
+    memory      -- run the first warmup under tracemalloc and attach its peak
+                   bytes to the stats as `.memory`
+    alloc_stats -- an engine's {'lists': n} counter; its change during the
+                   memory-profiled run is reported as the list allocation count
+                   (engines add their count once per sort, not per merge)
+
+    Returns (TimingStats or None, result of the last run).
+    """
+    samples = []
+    result = None
+    gc_collections = 0
+    mem = None
+    was_enabled = gc.isenabled()
+    total = warmup + repeats
+    try:
+        for i in range(total):
+            if should_stop and should_stop():
+                break
+            is_warmup = i < warmup
+            if on_repeat:
+                on_repeat(i, total, 'warmup' if is_warmup else 'measure')
+            arg = setup() if setup else None
+            func = warmup_run if (is_warmup and warmup_run) else run
+            if memory and i == 0 and is_warmup:
+                token = _start_memory_profile(alloc_stats)
+                result = func(arg) if setup else func()
+                mem = _stop_memory_profile(token, alloc_stats)
+                continue
+            gc.collect()
+            if disable_gc:
+                gc.disable()
+            before = sum(s['collections'] for s in gc.get_stats())
+            start = time.perf_counter()
+            result = func(arg) if setup else func()
+            elapsed = time.perf_counter() - start
+            if was_enabled:
+                gc.enable()
+            if should_stop and should_stop():
+                break
+            if not is_warmup:
+                gc_collections += sum(s['collections'] for s in gc.get_stats()) - before
+                samples.append(elapsed)
+    finally:
+        if was_enabled:
+            gc.enable()
+    if not samples:
+        return None, result
+    return TimingStats(samples, warmup, disable_gc, gc_collections, mem), result
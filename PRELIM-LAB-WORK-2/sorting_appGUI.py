@@ -1,6 +1,16 @@
-import tkinter as tk
-from tkinter import filedialog, messagebox, ttk
 import time
+_LAUNCHED = time.perf_counter()
+
+import tkinter as tk
+from tkinter import messagebox
+import sys
+from pathlib import Path
+
+# Shared sort engines and benchmarking helpers live with the PRELIM EXAM tools
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "PRELIM EXAM"))
+from int_sorts import ALGORITHMS, ALLOC_STATS, BASELINES, BY_KEY
+from startup_timer import StartupTimer
+# filedialog, dataset_cache, timing_harness and run_history are imported on first use to keep startup fast
 
 class SortingApp:
     def __init__(self, root):
@@ -11,6 +21,8 @@ class SortingApp:
         
         self.data = []
         self.sorted_data = []
+        self.dataset_path = None
+        self._history = None # Run database, opened on the first sort
         
         title_frame = tk.Frame(root, bg="#2563eb", pady=20)
         title_frame.pack(fill=tk.X)
@@ -19,7 +31,7 @@ class SortingApp:
                               font=("Arial", 24, "bold"), bg="#2563eb", fg="white")
         title_label.pack()
         
-        subtitle_label = tk.Label(title_frame, text="Choose your algorithm and sort data in descending order", 
+        subtitle_label = tk.Label(title_frame, text="Choose your algorithm and sort data in either order", 
                                  font=("Arial", 11), bg="#2563eb", fg="#dbeafe")
         subtitle_label.pack()
         
@@ -44,14 +56,14 @@ class SortingApp:
         algo_frame.grid(row=0, column=1, padx=10, sticky="ew")
         
         self.algo_var = tk.StringVar(value="bubble")
-        algorithms = [("Bubble Sort", "bubble"), ("Selection Sort", "selection"), 
-                     ("Insertion Sort", "insertion"), ("Quick Sort", "quick"), 
-                     ("Merge Sort", "merge")]
         
-        for text, value in algorithms:
+        for value, text, _, _ in ALGORITHMS:
             tk.Radiobutton(algo_frame, text=text, variable=self.algo_var, value=value,
                          font=("Arial", 9), bg="#f0f4f8", fg="#374151", 
                          selectcolor="#dbeafe", cursor="hand2").pack(anchor=tk.W)
+        self.ascending_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(algo_frame, text="Ascending order", variable=self.ascending_var,
+                      font=("Arial", 9), bg="#f0f4f8", fg="#374151", cursor="hand2").pack(anchor=tk.W, pady=(5, 0))
         
         action_frame = tk.LabelFrame(control_frame, text="  Actions  ", 
                                     font=("Arial", 10, "bold"), bg="#f0f4f8", fg="#1e40af", padx=10, pady=10)
@@ -67,6 +79,24 @@ class SortingApp:
                                   cursor="hand2", padx=30, pady=8, state=tk.DISABLED)
         self.reset_btn.pack(pady=5)
         
+        self.race_btn = tk.Button(action_frame, text="🏁 Race All", command=self.race_all,
+                                 font=("Arial", 10, "bold"), bg="#9333ea", fg="white",
+                                 cursor="hand2", padx=30, pady=8, state=tk.DISABLED)
+        self.race_btn.pack(pady=5)
+        
+        self.stats_btn = tk.Button(action_frame, text="📏 Percentiles", command=self.show_percentiles,
+                                  font=("Arial", 10, "bold"), bg="#0891b2", fg="white",
+                                  cursor="hand2", padx=30, pady=8, state=tk.DISABLED)
+        self.stats_btn.pack(pady=5)
+        
+        repeats_frame = tk.Frame(action_frame, bg="#f0f4f8")
+        repeats_frame.pack(pady=5)
+        tk.Label(repeats_frame, text="Timed runs:", font=("Arial", 9),
+                bg="#f0f4f8", fg="#374151").pack(side=tk.LEFT)
+        self.repeats_var = tk.StringVar(value="3")
+        tk.Spinbox(repeats_frame, from_=1, to=50, width=4, textvariable=self.repeats_var,
+                  font=("Arial", 9)).pack(side=tk.LEFT, padx=5)
+        
         control_frame.columnconfigure(0, weight=1)
         control_frame.columnconfigure(1, weight=1)
         control_frame.columnconfigure(2, weight=1)
@@ -94,15 +124,19 @@ class SortingApp:
         self.result_text.config(state=tk.DISABLED)
     
     def load_file(self):
+        from tkinter import filedialog
         filename = filedialog.askopenfilename(title="Select Dataset File",
                                              filetypes=[("Text files", "*.txt"), ("All files", "*.*")])
         if filename:
             try:
-                with open(filename, 'r') as f:
-                    self.data = [int(line.strip()) for line in f if line.strip()]
+                from dataset_cache import load_ints
+                self.data, _ = load_ints(filename)
+                self.dataset_path = filename
                 
                 self.file_status.config(text=f"✓ {len(self.data)} elements loaded", fg="#16a34a")
                 self.sort_btn.config(state=tk.NORMAL)
+                self.race_btn.config(state=tk.NORMAL)
+                self.stats_btn.config(state=tk.NORMAL)
                 self.sorted_data = []
                 
                 self.result_text.config(state=tk.NORMAL)
@@ -111,7 +145,7 @@ class SortingApp:
                 self.result_text.insert(tk.END, "=" * 80 + "\n\n")
                 self.result_text.insert(tk.END, f"First 20: {self.data[:20]}\n")
                 self.result_text.insert(tk.END, f"Last 20: {self.data[-20:]}\n\n")
-                self.result_text.insert(tk.END, "Click 'Sort' to sort the data in descending order")
+                self.result_text.insert(tk.END, "Click 'Sort' to sort the data in the chosen order")
                 self.result_text.config(state=tk.DISABLED)
                 
             except Exception as e:
@@ -121,106 +155,57 @@ class SortingApp:
         if not self.data:
             return
         
+        algorithm = self.algo_var.get()
+        algorithm_name, sort_func = BY_KEY[algorithm]
+        repeats = int(self.repeats_var.get()) if self.repeats_var.get().isdigit() else 3
+        descending = not self.ascending_var.get()
+        
+        # Predicted time and memory from earlier runs on this machine; over the limits needs a yes
+        from run_history import RunHistory
+        from sort_estimate import estimate, format_check, over_limits
+        if self._history is None:
+            self._history = RunHistory()
+        runs = max(1, repeats) + 1
+        prediction = estimate(self._history, 'lab', algorithm, len(self.data))
+        problems = over_limits(prediction, runs)
+        if problems and not messagebox.askyesno("Over the limits", "\n\n".join(problems) + "\n\nSort anyway?"):
+            return
+        
         self.sort_btn.config(state=tk.DISABLED, text="Sorting...")
         self.root.update()
         
-        arr = self.data.copy()
-        algorithm = self.algo_var.get()
-        start_time = time.time()
-        
-        if algorithm == "bubble":
-            n = len(arr)
-            for i in range(n):
-                swapped = False
-                for j in range(0, n - i - 1):
-                    if arr[j] < arr[j + 1]:
-                        arr[j], arr[j + 1] = arr[j + 1], arr[j]
-                        swapped = True
-                if not swapped:
-                    break
-        
-        elif algorithm == "selection":
-            n = len(arr)
-            for i in range(n - 1):
-                max_idx = i
-                for j in range(i + 1, n):
-                    if arr[j] > arr[max_idx]:
-                        max_idx = j
-                if max_idx != i:
-                    arr[i], arr[max_idx] = arr[max_idx], arr[i]
-        
-        elif algorithm == "insertion":
-            n = len(arr)
-            for i in range(1, n):
-                key = arr[i]
-                j = i - 1
-                while j >= 0 and arr[j] < key:
-                    arr[j + 1] = arr[j]
-                    j -= 1
-                arr[j + 1] = key
-        
-        elif algorithm == "quick":
-            stack = [(0, len(arr) - 1)]
-            while stack:
-                low, high = stack.pop()
-                if low < high:
-                    pivot = arr[high]
-                    i = low - 1
-                    for j in range(low, high):
-                        if arr[j] > pivot:
-                            i += 1
-                            arr[i], arr[j] = arr[j], arr[i]
-                    arr[i + 1], arr[high] = arr[high], arr[i + 1]
-                    pi = i + 1
-                    stack.append((low, pi - 1))
-                    stack.append((pi + 1, high))
-        
-        elif algorithm == "merge":
-            width = 1
-            n = len(arr)
-            while width < n:
-                for i in range(0, n, width * 2):
-                    left = i
-                    mid = min(i + width, n)
-                    right = min(i + width * 2, n)
-                    L = arr[left:mid]
-                    R = arr[mid:right]
-                    l_idx = r_idx = 0
-                    k = left
-                    while l_idx < len(L) and r_idx < len(R):
-                        if L[l_idx] >= R[r_idx]:
-                            arr[k] = L[l_idx]
-                            l_idx += 1
-                        else:
-                            arr[k] = R[r_idx]
-                            r_idx += 1
-                        k += 1
-                    while l_idx < len(L):
-                        arr[k] = L[l_idx]
-                        l_idx += 1
-                        k += 1
-                    while r_idx < len(R):
-                        arr[k] = R[r_idx]
-                        r_idx += 1
-                        k += 1
-                width *= 2
-        
-        end_time = time.time()
-        time_taken = end_time - start_time
+        # One warmup run (it also measures peak memory); the copy is made outside the timed region
+        from sort_verify import verify
+        from timing_harness import measure
+        stats, arr = measure(lambda a: sort_func(a, descending=descending), setup=self.data.copy, repeats=max(1, repeats),
+                             warmup=1, memory=True, alloc_stats=ALLOC_STATS)
+        time_taken = stats.median
         
         self.sorted_data = arr
         
-        algo_names = {"bubble": "Bubble Sort", "selection": "Selection Sort", 
-                     "insertion": "Insertion Sort", "quick": "Quick Sort", "merge": "Merge Sort"}
-        
         self.result_text.config(state=tk.NORMAL)
         self.result_text.delete(1.0, tk.END)
         self.result_text.insert(tk.END, "✓ SORTING COMPLETE\n")
         self.result_text.insert(tk.END, "=" * 80 + "\n\n")
-        self.result_text.insert(tk.END, f"Algorithm: {algo_names[algorithm]}\n")
+        self.result_text.insert(tk.END, f"Algorithm: {algorithm_name}\n")
         self.result_text.insert(tk.END, f"Elements: {len(arr)}\n")
         self.result_text.insert(tk.END, f"Time: {time_taken:.6f} seconds\n")
-        self.result_text.insert(tk.END, f"Order: Descending (Largest to Smallest)\n\n")
+        if stats.n > 1:
+            self.result_text.insert(tk.END, f"Timing: {stats.summary()}\n")
+        if stats.memory:
+            self.result_text.insert(tk.END, f"Memory (warmup): {stats.memory_summary()}\n")
+        order = "Descending (Largest to Smallest)" if descending else "Ascending (Smallest to Largest)"
+        self.result_text.insert(tk.END, f"Order: {order}\n")
+        self.result_text.insert(tk.END, f"Verified: {verify(self.data, arr, descending=descending).summary()}\n")
+        self.result_text.insert(tk.END, f"Estimate: {format_check(prediction, time_taken)}\n\n")
+        try:
+            from sort_order import order_label
+            self._history.record('lab', self.dataset_path, len(arr), algorithm, time_taken,
+                                 column=order_label('value', descending), timings=stats.samples,
+                                 peak_bytes=stats.memory['peak_bytes'] if stats.memory else None,
+                                 predicted_seconds=prediction.seconds, predicted_bytes=int(prediction.peak_bytes))
+        except Exception as e:
+            self.result_text.insert(tk.END, f"⚠️ Could not record run history: {e}\n\n")
         self.result_text.insert(tk.END, "SORTED DATA:\n")
         self.result_text.insert(tk.END, "-" * 80 + "\n")
         
@@ -235,6 +220,71 @@ class SortingApp:
         self.sort_btn.config(state=tk.NORMAL, text="▶ Sort")
         self.reset_btn.config(state=tk.NORMAL)
     
+    def race_all(self):
+        """Run every algorithm at once in separate processes, each on its own copy of the data"""
+        from tkinter import ttk
+        from sort_race import Race
+        self.race = Race([(key, name) for key, name, _, _ in ALGORITHMS], data=self.data,
+                         descending=not self.ascending_var.get(), baselines=BASELINES).start()
+        self.race_window = tk.Toplevel(self.root)
+        self.race_window.title("🏁 Race Mode")
+        self.race_window.configure(bg="#f0f4f8")
+        self.race_rows = []
+        for racer in self.race.racers:
+            row = tk.Frame(self.race_window, bg="#f0f4f8")
+            row.pack(fill=tk.X, padx=15, pady=4)
+            tk.Label(row, text=racer['name'], width=18, anchor=tk.W, font=("Arial", 10),
+                    bg="#f0f4f8").pack(side=tk.LEFT)
+            bar = ttk.Progressbar(row, length=320, maximum=100, mode='determinate')
+            bar.pack(side=tk.LEFT, padx=5)
+            status = tk.Label(row, text="starting", width=12, anchor=tk.W, font=("Courier", 10), bg="#f0f4f8")
+            status.pack(side=tk.LEFT)
+            self.race_rows.append((bar, status))
+        self.race_btn.config(state=tk.DISABLED, text="Racing...")
+        self.sort_btn.config(state=tk.DISABLED)
+        self._poll_race()
+    
+    def _poll_race(self):
+        from sort_race import format_race
+        finished = self.race.poll()
+        if self.race_window.winfo_exists():
+            for (bar, status), racer, fraction in zip(self.race_rows, self.race.racers, self.race.fractions()):
+                bar['value'] = fraction * 100
+                status.config(text=f"{racer['seconds']:.4f}s" if racer['state'] == 'done' else racer['state'])
+        if not finished:
+            self.root.after(200, self._poll_race)
+            return
+        self.result_text.config(state=tk.NORMAL)
+        self.result_text.delete(1.0, tk.END)
+        self.result_text.insert(tk.END, "🏁 RACE RESULTS\n")
+        self.result_text.insert(tk.END, "=" * 80 + "\n\n")
+        self.result_text.insert(tk.END, format_race(self.race) + "\n")
+        self.result_text.config(state=tk.DISABLED)
+        self.race_btn.config(state=tk.NORMAL, text="🏁 Race All")
+        self.sort_btn.config(state=tk.NORMAL)
+        self.reset_btn.config(state=tk.NORMAL)
+    
+    def show_percentiles(self):
+        """Median, percentiles, min and max by selection: no sort of the whole dataset"""
+        from tkinter import simpledialog
+        from sort_select import DEFAULT_PERCENTILES, order_statistics, parse_percentiles
+        text = simpledialog.askstring("Percentiles", "Percentiles (comma-separated):",
+                                      initialvalue=", ".join(map(str, DEFAULT_PERCENTILES)), parent=self.root)
+        if text is None:
+            return
+        try:
+            stats = order_statistics(self.data, parse_percentiles(text), (1, -1))
+        except ValueError as e:
+            messagebox.showerror("Percentiles", str(e))
+            return
+        self.result_text.config(state=tk.NORMAL)
+        self.result_text.delete(1.0, tk.END)
+        self.result_text.insert(tk.END, f"📏 ORDER STATISTICS ({len(self.data)} elements)\n")
+        self.result_text.insert(tk.END, "=" * 80 + "\n\n")
+        self.result_text.insert(tk.END, stats.format() + "\n")
+        self.result_text.config(state=tk.DISABLED)
+        self.reset_btn.config(state=tk.NORMAL)
+    
     def reset_data(self):
         self.sorted_data = []
         self.result_text.config(state=tk.NORMAL)
@@ -243,11 +293,16 @@ class SortingApp:
         self.result_text.insert(tk.END, "=" * 80 + "\n\n")
         self.result_text.insert(tk.END, f"First 20: {self.data[:20]}\n")
         self.result_text.insert(tk.END, f"Last 20: {self.data[-20:]}\n\n")
-        self.result_text.insert(tk.END, "Click 'Sort' to sort the data in descending order")
+        self.result_text.insert(tk.END, "Click 'Sort' to sort the data in the chosen order")
         self.result_text.config(state=tk.DISABLED)
         self.reset_btn.config(state=tk.DISABLED)
 
 if __name__ == "__main__":
+    startup = StartupTimer(_LAUNCHED)
+    startup.mark("imports")
     root = tk.Tk()
+    startup.mark("Tk root window")
     app = SortingApp(root)
+    startup.mark("widgets")
+    root.after_idle(lambda: (startup.mark("window interactive"), startup.report()))
     root.mainloop()
\ No newline at end of file
@@ -1,7 +1,40 @@
-import time
+import argparse
 import os
+import sys
+from pathlib import Path
+
+# Shared sort engines and benchmarking helpers live with the PRELIM EXAM tools
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "PRELIM EXAM"))
+from dataset_cache import load_ints
+from int_sorts import ALGORITHMS, ALLOC_STATS, BASELINES
+from phase_profiler import profile_call
+from run_history import RunHistory
+from sort_aggregate import aggregate
+from sort_estimate import admit, estimate, format_check, over_limits
+from sort_filter import add_arguments, filter_order, run_filter
+from sort_order import order_label
+from sort_race import Race, run_in_terminal
+from sort_select import DEFAULT_PERCENTILES, order_statistics, parse_percentiles
+from sort_verify import verify
+from timing_harness import measure
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Interactive sorting selector (descending order by default)")
+    parser.add_argument('--repeats', type=int, default=3, help="timed runs per sort (default: 3)")
+    parser.add_argument('--warmup', type=int, default=1,
+                        help="discarded runs before timing; the first one reports peak memory (default: 1)")
+    parser.add_argument('--ascending', action='store_true', help="sort smallest first instead")
+    parser.add_argument('--profile', action='store_true',
+                        help="after timing, sort once more under the sampling profiler and save the phase stacks")
+    parser.add_argument('--filter', action='store_true',
+                        help="no menus: sort stdin to stdout (integers, or CSV rows with --column) and exit")
+    add_arguments(parser)
+    args = parser.parse_args()
+    descending = not args.ascending
+    if args.filter:
+        sys.exit(run_filter(args.algorithm, filter_order(parser, args), args.column, args.quiet))
+    history = RunHistory() # Past runs calibrate the estimates; every run adds to them
+
     os.system('cls' if os.name == 'nt' else 'clear')
     
     print("=" * 80)
@@ -15,10 +48,9 @@ if __name__ == "__main__":
     
     try:
         print(f"\n📂 Reading dataset from '{dataset_file}'...")
-        with open(dataset_file, 'r') as f:
-            data = [int(line.strip()) for line in f if line.strip()]
+        data, source = load_ints(dataset_file)
         
-        print(f"✓ Dataset loaded successfully!")
+        print(f"✓ Dataset loaded successfully!" + (" (from cache)" if source == 'cache' else ""))
         print(f"   Total elements: {len(data)}")
         print(f"   First 10: {data[:10]}")
         print(f"   Last 10: {data[-10:]}")
@@ -51,19 +83,20 @@ if __name__ == "__main__":
         print("SELECT A SORTING ALGORITHM:")
         print("-" * 80)
         print()
-        print("   1. Bubble Sort       - Simple comparison-based sorting")
-        print("   2. Selection Sort    - Finds minimum/maximum iteratively")
-        print("   3. Insertion Sort    - Builds sorted array one item at a time")
-        print("   4. Quick Sort        - Efficient divide-and-conquer algorithm")
-        print("   5. Merge Sort        - Stable divide-and-conquer algorithm")
+        for number, (_, name, description, _) in enumerate(ALGORITHMS, 1):
+            print(f"   {number}. {name:<17} - {description}")
+        exit_choice = str(len(ALGORITHMS) + 1)
         print()
-        print("   6. Exit              - Close the program")
+        print(f"   R. {'Race':<17} - Run several algorithms at once and rank them")
+        print(f"   A. {'Count values':<17} - Distinct values, duplicate groups and counts per value")
+        print(f"   M. {'Percentiles':<17} - Median, percentiles and k-th values without sorting")
+        print(f"   {exit_choice}. {'Exit':<17} - Close the program")
         print()
         print("-" * 80)
         
-        choice = input("\n👉 Enter your choice (1-6): ").strip()
+        choice = input(f"\n👉 Enter your choice (1-{exit_choice}, R to race, A to count, M for percentiles): ").strip()
         
-        if choice == '6':
+        if choice == exit_choice:
             os.system('cls' if os.name == 'nt' else 'clear')
             print("\n" + "=" * 80)
             print(" " * 25 + "Thank you for using the")
@@ -72,13 +105,65 @@ if __name__ == "__main__":
             print()
             break
         
-        if choice not in ['1', '2', '3', '4', '5']:
-            print("\n✗ Invalid choice! Please enter a number between 1 and 6.")
+        if choice.upper() == 'R':
+            picks = input("\n👉 Algorithms to race (e.g. 1,4,5; Enter for all): ").replace(' ', '')
+            numbers = [int(p) for p in picks.split(',') if p.isdigit() and 1 <= int(p) <= len(ALGORITHMS)] \
+                if picks else range(1, len(ALGORITHMS) + 1)
+            racers = [ALGORITHMS[i - 1][:2] for i in dict.fromkeys(numbers)]
+            if not racers:
+                print(f"\n✗ Invalid choice! Please enter numbers between 1 and {len(ALGORITHMS)}.")
+                input("\nPress Enter to try again...")
+                continue
+            os.system('cls' if os.name == 'nt' else 'clear')
+            print("=" * 80)
+            print(" " * 33 + "🏁 RACE MODE")
+            print("=" * 80)
+            print()
+            # Every racer sorts its own copy of the shared data in its own process
+            run_in_terminal(Race(racers, data=data, descending=descending, baselines=BASELINES))
+            input("\nPress Enter to return to menu...")
+            continue
+        
+        if choice.upper() == 'A':
+            os.system('cls' if os.name == 'nt' else 'clear')
+            print("=" * 80)
+            print(" " * 31 + "📊 VALUE COUNTS")
+            print("=" * 80)
+            print()
+            counts = aggregate(data)
+            print(counts.format(top=15))
+            target = input("\n💾 Save every count to a file (press Enter to skip): ").strip()
+            if target:
+                try:
+                    print(f"✓ Saved {counts.distinct:,} counts to {counts.write(target)}")
+                except OSError as e:
+                    print(f"✗ ERROR: {e}")
+            input("\nPress Enter to return to menu...")
+            continue
+        
+        if choice.upper() == 'M':
+            default = ", ".join(map(str, DEFAULT_PERCENTILES))
+            percentiles = input(f"\n👉 Percentiles (press Enter for {default}): ").strip() or default
+            ranks = input("👉 k-th values too, 1 = smallest, -1 = largest (e.g. 1,-1; press Enter for none): ")
+            os.system('cls' if os.name == 'nt' else 'clear')
+            print("=" * 80)
+            print(" " * 30 + "📏 ORDER STATISTICS")
+            print("=" * 80)
+            print()
+            try:
+                ranks = [int(k) for k in ranks.replace(' ', '').split(',') if k]
+                print(order_statistics(data, parse_percentiles(percentiles), ranks).format())
+            except ValueError as e:
+                print(f"✗ ERROR: {e}")
+            input("\nPress Enter to return to menu...")
+            continue
+        
+        if not choice.isdigit() or not 1 <= int(choice) <= len(ALGORITHMS):
+            print(f"\n✗ Invalid choice! Please enter a number between 1 and {exit_choice}.")
             input("\nPress Enter to try again...")
             continue
         
-        arr = data.copy()
-        algorithm_name = ""
+        algorithm_key, algorithm_name, _, sort_func = ALGORITHMS[int(choice) - 1]
         
         os.system('cls' if os.name == 'nt' else 'clear')
         
@@ -87,97 +172,18 @@ if __name__ == "__main__":
         print("=" * 80)
         print()
         
-        start_time = time.time()
-        
-        if choice == '1':
-            algorithm_name = "Bubble Sort"
-            print(f"🔄 Running {algorithm_name}...")
-            n = len(arr)
-            for i in range(n - 1):
-                swapped = False
-                for j in range(0, n - i - 1):
-                    if arr[j] < arr[j + 1]:
-                        arr[j], arr[j + 1] = arr[j + 1], arr[j]
-                        swapped = True
-                if not swapped:
-                    break
-        
-        elif choice == '2':
-            algorithm_name = "Selection Sort"
-            print(f"🔄 Running {algorithm_name}...")
-            n = len(arr)
-            for i in range(n - 1):
-                max_idx = i
-                for j in range(i + 1, n):
-                    if arr[j] > arr[max_idx]:
-                        max_idx = j
-                if max_idx != i:
-                    arr[i], arr[max_idx] = arr[max_idx], arr[i]
-        
-        elif choice == '3':
-            algorithm_name = "Insertion Sort"
-            print(f"🔄 Running {algorithm_name}...")
-            n = len(arr)
-            for i in range(1, n):
-                key = arr[i]
-                j = i - 1
-                while j >= 0 and arr[j] < key:
-                    arr[j + 1] = arr[j]
-                    j -= 1
-                arr[j + 1] = key
-        
-        elif choice == '4':
-            algorithm_name = "Quick Sort"
-            print(f"🔄 Running {algorithm_name}...")
-            stack = [(0, len(arr) - 1)]
-            while stack:
-                low, high = stack.pop()
-                if low < high:
-                    pivot = arr[high]
-                    i = low - 1
-                    for j in range(low, high):
-                        if arr[j] > pivot:
-                            i += 1
-                            arr[i], arr[j] = arr[j], arr[i]
-                    arr[i + 1], arr[high] = arr[high], arr[i + 1]
-                    pi = i + 1
-                    stack.append((low, pi - 1))
-                    stack.append((pi + 1, high))
-        
-        elif choice == '5':
-            algorithm_name = "Merge Sort"
-            print(f"🔄 Running {algorithm_name}...")
-            width = 1
-            n = len(arr)
-            while width < n:
-                for i in range(0, n, width * 2):
-                    left = i
-                    mid = min(i + width, n)
-                    right = min(i + width * 2, n)
-                    L = arr[left:mid]
-                    R = arr[mid:right]
-                    l_idx = r_idx = 0
-                    k = left
-                    while l_idx < len(L) and r_idx < len(R):
-                        if L[l_idx] >= R[r_idx]:
-                            arr[k] = L[l_idx]
-                            l_idx += 1
-                        else:
-                            arr[k] = R[r_idx]
-                            r_idx += 1
-                        k += 1
-                    while l_idx < len(L):
-                        arr[k] = L[l_idx]
-                        l_idx += 1
-                        k += 1
-                    while r_idx < len(R):
-                        arr[k] = R[r_idx]
-                        r_idx += 1
-                        k += 1
-                width *= 2
-        
-        end_time = time.time()
-        time_taken = end_time - start_time
+        runs = max(1, args.repeats) + max(0, args.warmup)
+        prediction = estimate(history, 'lab', algorithm_key, len(data))
+        print(f"📐 Estimate: {prediction.summary(runs)}")
+        if not admit(over_limits(prediction, runs)):
+            input("\nPress Enter to return to menu...")
+            continue
+        
+        print(f"🔄 Running {algorithm_name}...")
+        # The copy is made by the harness outside the timed region
+        stats, arr = measure(lambda a: sort_func(a, descending=descending), setup=data.copy, repeats=max(1, args.repeats), warmup=max(0, args.warmup),
+                             memory=args.warmup > 0, alloc_stats=ALLOC_STATS)
+        time_taken = stats.median
         
         os.system('cls' if os.name == 'nt' else 'clear')
         
@@ -188,12 +194,30 @@ if __name__ == "__main__":
         print(f"  Algorithm Used     : {algorithm_name}")
         print(f"  Total Elements     : {len(arr)}")
         print(f"  Time Taken         : {time_taken:.6f} seconds")
-        print(f"  Sorting Order      : Descending (Largest → Smallest)")
+        if stats.n > 1:
+            print(f"  Timing Statistics  : {stats.summary()}")
+        if stats.memory:
+            print(f"  Memory (warmup)    : {stats.memory_summary()}")
+        print(f"  Sorting Order      : {'Descending (Largest → Smallest)' if descending else 'Ascending (Smallest → Largest)'}")
         print()
         
-        is_sorted = all(arr[i] >= arr[i+1] for i in range(len(arr)-1))
-        status = "✓ YES" if is_sorted else "✗ NO"
+        # Order and permutation checks, timed separately from the sort
+        check = verify(data, arr, descending=descending)
+        status = "✓ YES" if check.ok else "✗ NO"
         print(f"  Correctly Sorted   : {status}")
+        print(f"  Verification       : {check.summary()}")
+        print(f"  Estimate           : {format_check(prediction, time_taken)}")
+        try:
+            history.record('lab', dataset_file, len(arr), algorithm_key, time_taken,
+                           column=order_label('value', descending), timings=stats.samples,
+                           peak_bytes=stats.memory['peak_bytes'] if stats.memory else None,
+                           predicted_seconds=prediction.seconds, predicted_bytes=int(prediction.peak_bytes))
+        except Exception as e:
+            print(f"  ⚠️  Could not record run history: {e}")
+        if args.profile:
+            _, profiler = profile_call(sort_func, data.copy(), descending=descending)
+            print(f"  Phases (extra run) : {profiler.summary()}")
+            print(f"  Flame graph stacks : {profiler.save('lab', algorithm_name, 'desc' if descending else 'asc')}")
         print()
         print("=" * 80)
         print(" " * 33 + "SORTED DATA")